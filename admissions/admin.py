@@ -2,11 +2,102 @@
 Admin configuration for admission applications.
 Includes approval workflow and detailed views.
 """
-from django.contrib import admin
-from django.utils.html import format_html
-from django.urls import reverse
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.utils.html import format_html, format_html_join
+from django.urls import path, reverse
 from django.utils import timezone
-from .models import AdmissionApplication
+from .api import issue_key
+from .changelist import KeysetChangeList, is_large_table
+from .exports import streaming_documents_response, streaming_export_response
+from .forms import ApplicationAdminForm
+from .profiling import hot_functions
+from .renditions import rendition_url
+from .search import search_applications
+from .statistics import intake_summary
+from .models import (
+    REVIEWABLE_STATUSES,
+    AdmissionApplication,
+    ApiToken,
+    ApplicationDocument,
+    ApplicationStatusChange,
+    BackgroundJob,
+    BulkReviewJob,
+    ConcurrentUpdateError,
+    ProfiledRequest,
+)
+
+
+def progress_bar(percentage):
+    """Render a Bootstrap progress bar for a percentage."""
+    color = 'success' if percentage == 100 else 'warning' if percentage >= 50 else 'danger'
+    return format_html(
+        '<div class="progress" style="width: 100px;">'
+        '<div class="progress-bar bg-{}" role="progressbar" style="width: {}%">{}%</div>'
+        '</div>',
+        color,
+        percentage,
+        percentage
+    )
+
+
+class CompletionProgressFilter(admin.SimpleListFilter):
+    """
+    Filter applications by SQL-computed completion percentage.
+    """
+    title = 'progress'
+    parameter_name = 'progress'
+    
+    def lookups(self, request, model_admin):
+        return [
+            ('0', 'Not started (0%)'),
+            ('33', '1 of 3 steps (33%)'),
+            ('66', '2 of 3 steps (66%)'),
+            ('100', 'Complete (100%)'),
+        ]
+    
+    def queryset(self, request, queryset):
+        if self.value() in ('0', '33', '66', '100'):
+            return queryset.filter(completion_percentage=int(self.value()))
+        return queryset
+
+
+class ApplicationDocumentInline(admin.TabularInline):
+    """
+    Read-only background processing results for each document.
+    """
+    model = ApplicationDocument
+    extra = 0
+    can_delete = False
+    fields = [
+        'field_name',
+        'status',
+        'content_type',
+        'size',
+        'width',
+        'height',
+        'page_count',
+        'thumbnail_preview',
+        'error',
+        'processed_at',
+    ]
+    readonly_fields = fields
+    
+    def thumbnail_preview(self, obj):
+        """Display the generated thumbnail."""
+        if not obj.thumbnail:
+            return '-'
+        return format_html('<img src="{}" alt="" style="max-height: 80px;">', obj.thumbnail.url)
+    thumbnail_preview.short_description = 'Thumbnail'
+    
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(AdmissionApplication)
@@ -15,7 +106,10 @@ class AdmissionApplicationAdmin(admin.ModelAdmin):
     Custom admin interface for admission applications with approval workflow.
     """
     
+    form = ApplicationAdminForm
+    
     list_display = [
+        'photo_thumbnail',
         'registration_number',
         'user_full_name',
         'user_email',
@@ -26,21 +120,27 @@ class AdmissionApplicationAdmin(admin.ModelAdmin):
         'created_at',
     ]
     
+    list_display_links = ['registration_number']
+    
     list_filter = [
         'status',
         'program_choice',
+        CompletionProgressFilter,
         'gender',
         'created_at',
         'submitted_at',
     ]
     
+    list_select_related = ['user', 'reviewed_by']
+    
+    # A select of every user grows with the applicant table
+    raw_id_fields = ['reviewed_by']
+    
+    # Matched through the indexed search document, see get_search_results()
     search_fields = [
-        'registration_number',
-        'user__email',
-        'user__first_name',
-        'user__last_name',
-        'course_of_study',
+        'search_document',
     ]
+    search_help_text = 'Search by registration number, name, email or course'
     
     readonly_fields = [
         'registration_number',
@@ -49,6 +149,7 @@ class AdmissionApplicationAdmin(admin.ModelAdmin):
         'updated_at',
         'submitted_at',
         'completion_progress',
+        'passport_photo_preview',
     ]
     
     fieldsets = (
@@ -58,6 +159,7 @@ class AdmissionApplicationAdmin(admin.ModelAdmin):
                 'user',
                 'status',
                 'completion_progress',
+                'expected_version',
             )
         }),
         ('Personal Information', {
@@ -79,6 +181,7 @@ class AdmissionApplicationAdmin(admin.ModelAdmin):
         }),
         ('Documents', {
             'fields': (
+                'passport_photo_preview',
                 'passport_photo',
                 'olevel_result',
                 'birth_certificate',
@@ -103,12 +206,120 @@ class AdmissionApplicationAdmin(admin.ModelAdmin):
         }),
     )
     
+    inlines = [ApplicationDocumentInline]
+    
     actions = [
         'approve_applications',
         'reject_applications',
         'mark_under_review',
+        'export_as_csv',
+        'export_as_xlsx',
+        'download_documents',
     ]
     
+    def get_urls(self):
+        return [
+            path(
+                'statistics/',
+                self.admin_site.admin_view(self.statistics_view),
+                name='admissions_admissionapplication_statistics',
+            ),
+        ] + super().get_urls()
+    
+    def statistics_view(self, request):
+        """
+        Intake statistics, read from the ApplicationStatistic rollup only.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            intake_year = int(request.GET['year'])
+        except (KeyError, ValueError):
+            intake_year = None
+        summary = intake_summary(intake_year)
+        
+        statuses = AdmissionApplication.STATUS_CHOICES
+        programs = dict(AdmissionApplication.PROGRAM_CHOICES)
+        program_rows = [
+            (
+                programs.get(program, program or 'Not chosen'),
+                [counts.get(status, 0) for status, _ in statuses],
+                sum(counts.values()),
+            )
+            for program, counts in sorted(summary['by_program'].items())
+        ]
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f"Intake {summary['intake_year']} statistics",
+            'summary': summary,
+            'statuses': [
+                (label, summary['by_status'].get(status, 0)) for status, label in statuses
+            ],
+            'program_rows': program_rows,
+        }
+        return TemplateResponse(
+            request, 'admin/admissions/admissionapplication/statistics.html', context
+        )
+    
+    def get_queryset(self, request):
+        """
+        Annotate completion percentage and prefetch passport photo records
+        so the changelist needs no per-row work.
+        """
+        return super().get_queryset(request).with_completion_percentage().prefetch_related(
+            Prefetch(
+                'documents',
+                queryset=ApplicationDocument.objects.filter(field_name='passport_photo'),
+            )
+        )
+    
+    def is_large_table(self, request):
+        """
+        Decide on large-table mode once per request, see admissions.changelist.
+        """
+        if not hasattr(request, '_admissions_large_table'):
+            request._admissions_large_table = is_large_table(self.model)
+        return request._admissions_large_table
+    
+    def get_changelist(self, request, **kwargs):
+        if self.is_large_table(request):
+            return KeysetChangeList
+        return super().get_changelist(request, **kwargs)
+    
+    def get_sortable_by(self, request):
+        # Keyset pages follow the default ordering only
+        if self.is_large_table(request):
+            return ()
+        return super().get_sortable_by(request)
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Use the indexed applicant search instead of multi-join icontains.
+        """
+        return search_applications(queryset, search_term), False
+    
+    def photo_thumbnail(self, obj):
+        """Display the passport photo thumbnail rendition."""
+        if not obj.passport_photo:
+            return '-'
+        return format_html(
+            '<img src="{}" alt="" width="48" loading="lazy">',
+            rendition_url(obj, 'thumbnail', 'webp'),
+        )
+    photo_thumbnail.short_description = 'Photo'
+    
+    def passport_photo_preview(self, obj):
+        """Display the review-size passport photo rendition."""
+        if not obj.passport_photo:
+            return '-'
+        return format_html(
+            '<a href="{}" target="_blank"><img src="{}" alt="" style="max-height: 320px;"></a>',
+            rendition_url(obj, 'print'),
+            rendition_url(obj, 'review', 'webp'),
+        )
+    passport_photo_preview.short_description = 'Passport Photo'
+    
     def user_full_name(self, obj):
         """Display user's full name."""
         return obj.user.get_full_name()
@@ -131,67 +342,359 @@ class AdmissionApplicationAdmin(admin.ModelAdmin):
     
     def completion_progress(self, obj):
         """Display completion progress bar."""
-        percentage = obj.get_completion_percentage()
-        color = 'success' if percentage == 100 else 'warning' if percentage >= 50 else 'danger'
-        return format_html(
-            '<div class="progress" style="width: 100px;">'
-            '<div class="progress-bar bg-{}" role="progressbar" style="width: {}%">{}%</div>'
-            '</div>',
-            color,
-            percentage,
-            percentage
-        )
+        percentage = getattr(obj, 'completion_percentage', None)
+        if percentage is None:
+            percentage = obj.get_completion_percentage()
+        return progress_bar(percentage)
     completion_progress.short_description = 'Progress'
+    completion_progress.admin_order_field = 'completion_percentage'
     
-    def approve_applications(self, request, queryset):
-        """Bulk approve applications."""
-        count = 0
-        for application in queryset:
-            if application.status in ['submitted', 'under_review']:
-                application.approve(request.user, 'Approved via bulk action')
-                count += 1
+    def review_selected(self, request, queryset, status, notes, message,
+                        from_statuses=None):
+        """
+        Apply a status to the selected applications with set-based UPDATEs.
+        
+        Selections larger than ADMISSIONS_BULK_REVIEW_SYNC_LIMIT are handed to
+        a BulkReviewJob run by the background job workers, whose progress is
+        shown on its admin page.
+        """
+        from_statuses = from_statuses or REVIEWABLE_STATUSES
+        sync_limit = getattr(settings, 'ADMISSIONS_BULK_REVIEW_SYNC_LIMIT', 1000)
+        
+        application_ids = list(
+            queryset.filter(status__in=from_statuses)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        
+        if len(application_ids) <= sync_limit:
+            count = AdmissionApplication.objects.filter(
+                pk__in=application_ids
+            ).bulk_review(status, request.user, notes, from_statuses=from_statuses)
+            self.message_user(request, message.format(count))
+            return
+        
+        # The job and its queue entry commit together
+        with transaction.atomic():
+            job = BulkReviewJob.objects.create(
+                target_status=status,
+                from_statuses=from_statuses,
+                notes=notes,
+                application_ids=application_ids,
+                total=len(application_ids),
+                created_by=request.user,
+            )
+            job.start()
         
         self.message_user(
             request,
-            f'{count} application(s) approved successfully.'
+            format_html(
+                '{} application(s) are being processed in the background. '
+                '<a href="{}">Track progress</a>.',
+                job.total,
+                reverse('admin:admissions_bulkreviewjob_change', args=[job.pk])
+            )
+        )
+    
+    def approve_applications(self, request, queryset):
+        """Bulk approve applications."""
+        self.review_selected(
+            request,
+            queryset,
+            'approved',
+            'Approved via bulk action',
+            '{} application(s) approved successfully.'
         )
     approve_applications.short_description = 'Approve selected applications'
     
     def reject_applications(self, request, queryset):
         """Bulk reject applications."""
-        count = 0
-        for application in queryset:
-            if application.status in ['submitted', 'under_review']:
-                application.reject(request.user, 'Rejected via bulk action')
-                count += 1
-        
-        self.message_user(
+        self.review_selected(
             request,
-            f'{count} application(s) rejected.'
+            queryset,
+            'rejected',
+            'Rejected via bulk action',
+            '{} application(s) rejected.'
         )
     reject_applications.short_description = 'Reject selected applications'
     
     def mark_under_review(self, request, queryset):
         """Mark applications as under review."""
-        count = queryset.filter(status='submitted').update(
-            status='under_review',
-            reviewed_by=request.user,
-            reviewed_at=timezone.now()
-        )
-        
-        self.message_user(
+        self.review_selected(
             request,
-            f'{count} application(s) marked as under review.'
+            queryset,
+            'under_review',
+            '',
+            '{} application(s) marked as under review.',
+            from_statuses=['submitted']
         )
     mark_under_review.short_description = 'Mark as under review'
     
+    def export_as_csv(self, request, queryset):
+        """Stream selected applications as CSV."""
+        return streaming_export_response(queryset, 'csv')
+    export_as_csv.short_description = 'Export selected applications (CSV)'
+    
+    def export_as_xlsx(self, request, queryset):
+        """Stream selected applications as XLSX."""
+        return streaming_export_response(queryset, 'xlsx')
+    export_as_xlsx.short_description = 'Export selected applications (XLSX)'
+    
+    def download_documents(self, request, queryset):
+        """Stream a ZIP of the selected applications' documents."""
+        return streaming_documents_response(queryset)
+    download_documents.short_description = 'Download documents of selected applications (ZIP)'
+    
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        """
+        Send the reviewer back to the current data when a save lost the
+        compare-and-swap race to another change.
+        """
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except ConcurrentUpdateError as exc:
+            self.message_user(request, str(exc), messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+    
     def save_model(self, request, obj, form, change):
         """
-        Auto-set reviewed_by and reviewed_at when status changes.
+        Save only the changed fields, compared against the version the
+        form was opened with. Auto-set reviewed_by and reviewed_at when
+        status changes.
         """
-        if change and 'status' in form.changed_data:
+        if not change:
+            return super().save_model(request, obj, form, change)
+        
+        update_fields = [field for field in form.changed_data if field != 'expected_version']
+        status_changed = 'status' in update_fields
+        if status_changed:
             if obj.status in ['approved', 'rejected', 'under_review']:
                 obj.reviewed_by = request.user
                 obj.reviewed_at = timezone.now()
+                update_fields += ['reviewed_by', 'reviewed_at']
+        if not update_fields:
+            return
+        
+        if form.cleaned_data.get('expected_version') is not None:
+            obj.version = form.cleaned_data['expected_version']
+        obj.save(update_fields=update_fields)
         
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        if status_changed:
+            obj.record_status_change(
+                form.initial.get('status', ''), request.user, obj.review_notes
+            )
+
+
+@admin.register(BulkReviewJob)
+class BulkReviewJobAdmin(admin.ModelAdmin):
+    """
+    Progress of background bulk approve/reject jobs.
+    """
+    
+    list_display = [
+        '__str__',
+        'status',
+        'job_progress',
+        'updated',
+        'created_by',
+        'created_at',
+        'finished_at',
+    ]
+    
+    list_filter = ['status', 'target_status']
+    list_select_related = ['created_by']
+    
+    fields = [
+        'target_status',
+        'notes',
+        'status',
+        'job_progress',
+        'total',
+        'processed',
+        'updated',
+        'error',
+        'created_by',
+        'created_at',
+        'started_at',
+        'finished_at',
+    ]
+    readonly_fields = fields
+    
+    def job_progress(self, obj):
+        """Display job progress bar."""
+        return progress_bar(obj.get_progress_percentage())
+    job_progress.short_description = 'Progress'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ApplicationStatusChange)
+class ApplicationStatusChangeAdmin(admin.ModelAdmin):
+    """
+    Read-only audit trail of status transitions.
+    """
+    
+    list_display = ['application', 'from_status', 'to_status', 'changed_by', 'created_at']
+    list_filter = ['to_status', 'created_at']
+    list_select_related = ['application__user', 'changed_by']
+    search_fields = ['application__registration_number']
+    raw_id_fields = ['application', 'changed_by']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    """
+    Monitor the background job queue.
+    """
+    
+    list_display = ['__str__', 'task_name', 'status', 'attempts', 'locked_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'task_name']
+    readonly_fields = [
+        'task_name',
+        'payload',
+        'status',
+        'attempts',
+        'max_attempts',
+        'run_after',
+        'locked_by',
+        'locked_at',
+        'result',
+        'error',
+        'created_at',
+        'finished_at',
+    ]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ProfiledRequest)
+class ProfiledRequestAdmin(admin.ModelAdmin):
+    """
+    Browse stored request profiles and download them as folded stacks
+    for flamegraph.pl, inferno or speedscope.
+    """
+    
+    list_display = [
+        'created_at',
+        'method',
+        'path',
+        'view_name',
+        'user',
+        'status_code',
+        'duration_ms',
+        'samples',
+        'trigger',
+        'download_link',
+    ]
+    list_filter = ['trigger', 'method', 'created_at']
+    list_select_related = ['user']
+    search_fields = ['path', 'view_name']
+    
+    fields = [
+        'method',
+        'path',
+        'view_name',
+        'user',
+        'status_code',
+        'duration_ms',
+        'samples',
+        'interval_ms',
+        'trigger',
+        'created_at',
+        'download_link',
+        'hot_function_table',
+    ]
+    readonly_fields = fields
+    
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/folded/',
+                self.admin_site.admin_view(self.folded_view),
+                name='admissions_profiledrequest_folded',
+            ),
+        ] + super().get_urls()
+    
+    def folded_view(self, request, pk):
+        """
+        Download a profile as folded stacks.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        profile = get_object_or_404(ProfiledRequest, pk=pk)
+        response = HttpResponse(profile.folded_stacks, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile.pk}.folded"'
+        return response
+    
+    def download_link(self, obj):
+        """Link to the folded stacks."""
+        return format_html(
+            '<a href="{}">Folded stacks</a>',
+            reverse('admin:admissions_profiledrequest_folded', args=[obj.pk]),
+        )
+    download_link.short_description = 'Download'
+    
+    def hot_function_table(self, obj):
+        """Functions with the most samples."""
+        rows = hot_functions(obj.folded_stacks)
+        if not rows:
+            return 'No samples; the request finished within one sampling interval.'
+        return format_html(
+            '<table><thead><tr><th>Function</th><th>Self</th><th>Total</th></tr></thead>'
+            '<tbody>{}</tbody></table>',
+            format_html_join(
+                '',
+                '<tr><td><code>{}</code></td><td>{}</td><td>{}</td></tr>',
+                rows,
+            ),
+        )
+    hot_function_table.short_description = 'Hot functions (samples)'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    """
+    Tokens of downstream systems using the read API. The key is shown
+    once, when the token is created.
+    """
+    
+    list_display = ['name', 'key_prefix', 'is_active', 'created_by', 'created_at', 'last_used_at']
+    list_filter = ['is_active']
+    list_select_related = ['created_by']
+    readonly_fields = ['key_prefix', 'created_by', 'created_at', 'last_used_at']
+    
+    def save_model(self, request, obj, form, change):
+        if change:
+            return super().save_model(request, obj, form, change)
+        key = issue_key(obj)
+        obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+        self.message_user(
+            request,
+            format_html(
+                'Token key for {}: <code>{}</code> Copy it now; it cannot be shown again.',
+                obj.name,
+                key,
+            ),
+            messages.WARNING,
+        )
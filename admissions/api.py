@@ -0,0 +1,250 @@
+"""
+Read API for systems that sync admission applications.
+
+Clients send ``Authorization: Token <key>`` and page through
+applications in ``(updated_at, id)`` order. Each page ends with a cursor
+of its last row, and the next page starts strictly after it using the
+admission_sync_idx index (admission_status_sync_idx or
+admission_program_sync_idx when filtered), so a late page costs the same
+as the first.
+Storing the last cursor and asking again later returns only the
+applications changed since.
+
+updated_at is stamped before the saving transaction commits, so a slow
+transaction can commit a row behind a cursor that has already moved on.
+Pages therefore stop at rows older than ADMISSIONS_API_SETTLE_SECONDS;
+newer changes are returned once they have settled.
+
+Rows are read with ``.values()`` into plain dicts; only the requested
+fields are selected.
+"""
+import base64
+import binascii
+import hashlib
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AdmissionApplication, ApiToken
+
+
+# Public field names and the columns they are read from
+API_FIELDS = {
+    'id': 'id',
+    'registration_number': 'registration_number',
+    'status': 'status',
+    'program_choice': 'program_choice',
+    'course_of_study': 'course_of_study',
+    'first_name': 'user__first_name',
+    'middle_name': 'user__middle_name',
+    'last_name': 'user__last_name',
+    'email': 'user__email',
+    'date_of_birth': 'date_of_birth',
+    'gender': 'gender',
+    'nationality': 'nationality',
+    'address': 'address',
+    'city': 'city',
+    'state': 'state',
+    'postal_code': 'postal_code',
+    'submitted_at': 'submitted_at',
+    'reviewed_at': 'reviewed_at',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'version': 'version',
+}
+
+DEFAULT_FIELDS = [
+    'id',
+    'registration_number',
+    'status',
+    'program_choice',
+    'course_of_study',
+    'first_name',
+    'last_name',
+    'email',
+    'submitted_at',
+    'updated_at',
+]
+
+# last_used_at is written at most this often per token
+TOKEN_TOUCH_INTERVAL = timedelta(minutes=5)
+
+
+class ApiError(Exception):
+    """
+    A request the API cannot answer, with its HTTP status.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def hash_key(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def issue_key(token):
+    """
+    Give an unsaved token a new key and return the key, which is not stored.
+    """
+    key = secrets.token_urlsafe(32)
+    token.key_prefix = key[:8]
+    token.key_hash = hash_key(key)
+    return key
+
+
+def create_token(name, created_by=None):
+    """
+    Create a token and return ``(token, key)``.
+    """
+    token = ApiToken(name=name, created_by=created_by)
+    key = issue_key(token)
+    token.save()
+    return token, key
+
+
+def authenticate(request):
+    """
+    Return the active ApiToken of the Authorization header or raise ApiError.
+    """
+    scheme, _, key = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() not in ('token', 'bearer') or not key.strip():
+        raise ApiError("Authentication credentials were not provided.", status=401)
+    try:
+        token = ApiToken.objects.get(key_hash=hash_key(key.strip()), is_active=True)
+    except ApiToken.DoesNotExist:
+        raise ApiError("Invalid token.", status=401)
+
+    now = timezone.now()
+    if token.last_used_at is None or token.last_used_at < now - TOKEN_TOUCH_INTERVAL:
+        ApiToken.objects.filter(pk=token.pk).update(last_used_at=now)
+    return token
+
+
+def encode_cursor(updated_at, pk):
+    return base64.urlsafe_b64encode(f'{updated_at.isoformat()}|{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Return the ``(updated_at, id)`` position of a cursor.
+    """
+    try:
+        updated_at, _, pk = base64.urlsafe_b64decode(cursor.encode()).decode().partition('|')
+        position = parse_datetime(updated_at), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ApiError("Invalid cursor.")
+    if position[0] is None:
+        raise ApiError("Invalid cursor.")
+    return position
+
+
+def parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def get_fields(params):
+    if 'fields' not in params:
+        return DEFAULT_FIELDS
+    fields = parse_list(params['fields'])
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown or not fields:
+        raise ApiError(f"Unknown fields: {', '.join(unknown) or '(none)'}. "
+                       f"Available: {', '.join(API_FIELDS)}.")
+    return fields
+
+
+def get_limit(params):
+    default = getattr(settings, 'ADMISSIONS_API_PAGE_SIZE', 100)
+    maximum = getattr(settings, 'ADMISSIONS_API_MAX_PAGE_SIZE', 1000)
+    try:
+        limit = int(params.get('limit', default))
+    except ValueError:
+        raise ApiError("limit must be a number.")
+    if not 1 <= limit <= maximum:
+        raise ApiError(f"limit must be between 1 and {maximum}.")
+    return limit
+
+
+def parse_choices(params, name, choices):
+    """
+    The comma-separated values of parameter ``name``, each one of ``choices``.
+    """
+    values = parse_list(params[name])
+    valid = dict(choices)
+    if any(value not in valid for value in values):
+        raise ApiError(f"{name} must be one of {', '.join(valid)}.")
+    return values
+
+
+def filter_applications(params):
+    """
+    Settled applications after the cursor in keyset order, filtered by the
+    query parameters ``status`` and ``program`` (comma-separated),
+    ``since`` (ISO datetime) and ``cursor``.
+    """
+    settle = getattr(settings, 'ADMISSIONS_API_SETTLE_SECONDS', 60)
+    queryset = AdmissionApplication.objects.filter(
+        updated_at__lte=timezone.now() - timedelta(seconds=settle)
+    ).order_by('updated_at', 'id')
+    if params.get('status'):
+        queryset = queryset.filter(
+            status__in=parse_choices(params, 'status', AdmissionApplication.STATUS_CHOICES)
+        )
+    if params.get('program'):
+        queryset = queryset.filter(
+            program_choice__in=parse_choices(params, 'program', AdmissionApplication.PROGRAM_CHOICES)
+        )
+    if params.get('since'):
+        since = parse_datetime(params['since'])
+        if since is None:
+            raise ApiError("since must be an ISO 8601 datetime.")
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        queryset = queryset.filter(updated_at__gte=since)
+    if params.get('cursor'):
+        updated_at, pk = decode_cursor(params['cursor'])
+        # The range on updated_at lets the index seek to the cursor
+        queryset = queryset.filter(
+            Q(updated_at__gt=updated_at) | Q(id__gt=pk), updated_at__gte=updated_at
+        )
+    return queryset
+
+
+def list_applications(params):
+    """
+    One page of applications for the query parameters of
+    filter_applications plus ``fields`` and ``limit``. Returns the
+    response dict.
+    """
+    fields = get_fields(params)
+    limit = get_limit(params)
+    queryset = filter_applications(params)
+
+    # The cursor needs updated_at and id even if they were not asked for
+    columns = {field: API_FIELDS[field] for field in fields}
+    columns.setdefault('updated_at', 'updated_at')
+    columns.setdefault('id', 'id')
+    rows = list(
+        queryset.values(
+            *[field for field, column in columns.items() if field == column],
+            **{field: F(column) for field, column in columns.items() if field != column},
+        )[:limit + 1]
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        next_cursor = encode_cursor(rows[-1]['updated_at'], rows[-1]['id'])
+    else:
+        next_cursor = params.get('cursor') or None
+    return {
+        'results': [{field: row[field] for field in fields} for row in rows],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+    }
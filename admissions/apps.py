@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class AdmissionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'admissions'
-    verbose_name = 'Admission Applications'
\ No newline at end of file
+    verbose_name = 'Admission Applications'
+    
+    def ready(self):
+        from . import documents, signals  # noqa: F401
@@ -0,0 +1,446 @@
+"""
+View benchmarks with query and latency budgets.
+
+Every scenario requests one view through the test client against a
+seeded dataset and records the number of SQL queries, time spent in the
+database, time spent rendering templates and wall time. Datasets of
+different sizes show whether a view's cost grows with the tables: query
+counts should not.
+
+Budgets live in BUDGET_FILE as ``{scenario: {"queries": n, "wall_ms": n}}``
+and apply to every dataset size. See the run_benchmarks management command.
+"""
+import base64
+import itertools
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from . import uploads
+from .api import create_token
+from .instrumentation import RequestProfile, profiling
+from .loadtest import make_pdf, make_photo, unique
+from .models import AdmissionApplication
+from .statistics import reconcile_statistics
+
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), 'benchmark_budgets.json')
+
+# Applications seeded for each dataset
+DATASET_SIZES = {
+    'small': 50,
+    'large': 2000,
+}
+
+PASSWORD = 'Bench-mark-2026'
+
+SEED_STATUSES = ['draft', 'submitted', 'under_review', 'approved', 'rejected']
+SEED_PROGRAMS = ['undergraduate', 'postgraduate', 'diploma', 'certificate']
+
+PERSONAL_INFO = {
+    'date_of_birth': '2006-03-14',
+    'gender': 'F',
+    'nationality': 'Nigerian',
+    'address': '12 University Road',
+    'city': 'Enugu',
+    'state': 'Enugu',
+    'postal_code': '400001',
+}
+
+# Small documents; the benchmarks measure the views, not the disk
+PHOTO = make_photo((300, 400))
+PDF = make_pdf(20000)
+
+
+class Scenario:
+    """
+    One request to benchmark: ``client`` is 'anonymous', 'applicant' or
+    'staff'. Scenarios that change the session, like logging in or out,
+    use a new client for every request, logged in as that user.
+
+    Requests that cannot simply be repeated, like registering or
+    submitting, give a ``prepare`` callable instead of a fixed url and
+    data. It runs before every request, outside the measurement, and
+    returns the ``(url, data)`` to send.
+    """
+
+    def __init__(self, name, url=None, client='applicant', method='get', data=None, expect=200,
+                 fresh_client=False, content_type=None, headers=None, prepare=None):
+        self.name = name
+        self.url = url
+        self.client = client
+        self.method = method
+        self.data = data
+        self.expect = expect
+        self.fresh_client = fresh_client
+        self.content_type = content_type
+        self.headers = headers
+        self.prepare = prepare
+
+    def request(self):
+        if self.prepare is not None:
+            return self.prepare()
+        return self.url, self.data
+
+
+def get_scenarios(dataset):
+    """
+    Scenarios covering the accounts, admissions, admin, search, API,
+    upload, protected media and metrics views.
+    """
+    applicant = dataset['applicant_application']
+    sequence = itertools.count()
+
+    def register():
+        n = next(sequence)
+        return reverse('accounts:register'), {
+            'first_name': 'Bench',
+            'last_name': 'Registrant',
+            'email': f'bench-register{n}@example.invalid',
+            'password1': PASSWORD,
+            'password2': PASSWORD,
+        }
+
+    def personal_info():
+        applicant.refresh_from_db(fields=['version'])
+        return reverse('admissions:personal_info'), {
+            **PERSONAL_INFO, 'expected_version': applicant.version,
+        }
+
+    def documents():
+        return reverse('admissions:document_upload'), {
+            'passport_photo': SimpleUploadedFile('photo.jpg', unique(PHOTO), 'image/jpeg'),
+            'olevel_result': SimpleUploadedFile('olevel.pdf', unique(PDF), 'application/pdf'),
+            'birth_certificate': SimpleUploadedFile('birth.pdf', unique(PDF), 'application/pdf'),
+        }
+
+    def autosave():
+        body = {'fields': {'city': f'Enugu {next(sequence)}'}}
+        return reverse('admissions:autosave', args=['personal-info']), json.dumps(body)
+
+    def upload_chunk():
+        data = unique(PDF)
+        session = uploads.create_session(applicant, 'olevel_result', 'olevel.pdf', len(data))
+        return reverse('admissions:upload_detail', args=[session.pk]), data
+
+    def password_reset_link():
+        # Logging in invalidates earlier tokens, so make one per request
+        user = get_user_model().objects.get(pk=applicant.user_id)
+        uid = urlsafe_base64_encode(force_bytes(user.pk))
+        token = default_token_generator.make_token(user)
+        return reverse('accounts:password_reset_confirm', args=[uid, token]), None
+
+    def protected_document():
+        applicant.refresh_from_db()
+        if not applicant.olevel_result:
+            applicant.olevel_result.save('olevel.pdf', ContentFile(PDF))
+        return reverse('admissions:protected_document', args=[applicant.olevel_result.name]), None
+
+    def photo_rendition():
+        applicant.refresh_from_db()
+        if not applicant.passport_photo:
+            applicant.passport_photo.save('photo.jpg', ContentFile(PHOTO))
+        return reverse('admissions:photo_rendition', args=[applicant.pk, 'review', 'webp']), None
+
+    def submit():
+        # Back to a complete draft, so every request really submits
+        AdmissionApplication.objects.filter(pk=applicant.pk).update(
+            status='draft', submitted_at=None, documents_uploaded=True
+        )
+        return reverse('admissions:submit_application'), {}
+
+    upload_metadata = ','.join(
+        f'{key} {base64.b64encode(value.encode()).decode()}'
+        for key, value in {'field': 'olevel_result', 'filename': 'olevel.pdf'}.items()
+    )
+
+    return [
+        Scenario('accounts.register', reverse('accounts:register'), 'anonymous'),
+        Scenario(
+            'accounts.register_post',
+            client='anonymous',
+            method='post',
+            expect=302,
+            fresh_client=True,
+            prepare=register,
+        ),
+        Scenario('accounts.login', reverse('accounts:login'), 'anonymous'),
+        Scenario(
+            'accounts.login_post',
+            reverse('accounts:login'),
+            'anonymous',
+            'post',
+            {'username': applicant.user.email, 'password': PASSWORD},
+            expect=302,
+            fresh_client=True,
+        ),
+        Scenario(
+            'accounts.logout',
+            reverse('accounts:logout'),
+            method='post',
+            expect=302,
+            fresh_client=True,
+        ),
+        Scenario('accounts.password_reset', reverse('accounts:password_reset'), 'anonymous'),
+        Scenario(
+            'accounts.password_reset_confirm',
+            client='anonymous',
+            expect=302,
+            fresh_client=True,
+            prepare=password_reset_link,
+        ),
+        Scenario('accounts.profile_update', reverse('accounts:profile_update')),
+        Scenario('admissions.dashboard', reverse('admissions:dashboard')),
+        Scenario('admissions.personal_info', reverse('admissions:personal_info')),
+        Scenario(
+            'admissions.personal_info_post',
+            method='post',
+            expect=302,
+            prepare=personal_info,
+        ),
+        Scenario('admissions.program_info', reverse('admissions:program_info')),
+        Scenario(
+            'admissions.program_info_post',
+            reverse('admissions:program_info'),
+            method='post',
+            data={'program_choice': 'diploma', 'course_of_study': 'Computer Science'},
+            expect=302,
+        ),
+        Scenario(
+            'admissions.autosave',
+            method='patch',
+            content_type='application/json',
+            prepare=autosave,
+        ),
+        Scenario('admissions.document_upload', reverse('admissions:document_upload')),
+        Scenario(
+            'admissions.document_upload_post',
+            method='post',
+            expect=302,
+            prepare=documents,
+        ),
+        Scenario(
+            'admissions.upload_create',
+            reverse('admissions:upload_create'),
+            method='post',
+            expect=201,
+            headers={
+                'Tus-Resumable': uploads.TUS_VERSION,
+                'Upload-Length': str(len(PDF)),
+                'Upload-Metadata': upload_metadata,
+            },
+        ),
+        Scenario(
+            'admissions.upload_patch',
+            method='patch',
+            expect=204,
+            content_type='application/offset+octet-stream',
+            headers={'Tus-Resumable': uploads.TUS_VERSION, 'Upload-Offset': '0'},
+            prepare=upload_chunk,
+        ),
+        Scenario('admissions.protected_document', prepare=protected_document),
+        Scenario('admissions.photo_rendition', prepare=photo_rendition),
+        Scenario('admissions.application_detail', reverse('admissions:application_detail')),
+        Scenario('admissions.submit_application', reverse('admissions:submit_application')),
+        Scenario(
+            'admissions.submit_application_post',
+            method='post',
+            expect=302,
+            prepare=submit,
+        ),
+        Scenario(
+            'admin.changelist',
+            reverse('admin:admissions_admissionapplication_changelist'),
+            'staff',
+        ),
+        Scenario(
+            'admin.changelist_filtered',
+            reverse('admin:admissions_admissionapplication_changelist') + '?status__exact=submitted',
+            'staff',
+        ),
+        Scenario(
+            'admin.changelist_search',
+            reverse('admin:admissions_admissionapplication_changelist') + '?q=seed1',
+            'staff',
+        ),
+        Scenario(
+            'admin.change',
+            reverse('admin:admissions_admissionapplication_change', args=[applicant.pk]),
+            'staff',
+        ),
+        Scenario(
+            'admin.statistics',
+            reverse('admin:admissions_admissionapplication_statistics'),
+            'staff',
+        ),
+        Scenario('search', reverse('search') + '?query=admission', 'anonymous'),
+        Scenario(
+            'api.applications',
+            reverse('admissions:api_applications') + '?limit=100',
+            'anonymous',
+            headers={'Authorization': f"Token {dataset['api_key']}"},
+        ),
+        Scenario('metrics', reverse('metrics'), 'staff'),
+    ]
+
+
+def seed_dataset(size):
+    """
+    Create ``size`` applications with applicants, one logged-in applicant
+    with a complete application, and a staff user.
+    """
+    User = get_user_model()
+    users = User.objects.bulk_create([
+        User(
+            username=f'seed{i}',
+            email=f'seed{i}@example.invalid',
+            first_name=f'Seed{i}',
+            last_name='Applicant',
+        )
+        for i in range(size)
+    ])
+    applications = [
+        AdmissionApplication(
+            user=user,
+            status=SEED_STATUSES[i % len(SEED_STATUSES)],
+            program_choice=SEED_PROGRAMS[i % len(SEED_PROGRAMS)],
+            course_of_study='Computer Science',
+            personal_info_completed=True,
+            program_info_completed=True,
+        )
+        for i, user in enumerate(users)
+    ]
+    for application in applications:
+        application.refresh_search_document()
+    AdmissionApplication.objects.bulk_create(applications, batch_size=500)
+    # Changed a day ago, so the read API has settled rows to page through
+    AdmissionApplication.objects.update(updated_at=timezone.now() - timedelta(days=1))
+
+    applicant = User.objects.create_user(
+        username='bench-applicant',
+        email='bench-applicant@example.invalid',
+        password=PASSWORD,
+        first_name='Bench',
+        last_name='Applicant',
+    )
+    application = AdmissionApplication.objects.create(
+        user=applicant,
+        personal_info_completed=True,
+        program_info_completed=True,
+        program_choice='undergraduate',
+        course_of_study='Computer Science',
+        gender='F',
+        nationality='Nigerian',
+    )
+    staff = User.objects.create_superuser(
+        username='bench-staff', email='bench-staff@example.invalid', password=PASSWORD
+    )
+    reconcile_statistics()
+    _, api_key = create_token('benchmarks', created_by=staff)
+    return {'applicant_application': application, 'staff': staff, 'api_key': api_key}
+
+
+def make_client(user=None):
+    client = Client()
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+def measure(client, scenario, iterations, user=None):
+    """
+    Request a scenario ``iterations`` times after one warm-up request.
+    Returns medians of each metric and the largest query count.
+    """
+    def prepare():
+        request_client = make_client(user) if scenario.fresh_client else client
+        return (request_client, *scenario.request())
+
+    def send(request_client, url, data):
+        kwargs = {'headers': scenario.headers}
+        if scenario.content_type:
+            kwargs['content_type'] = scenario.content_type
+        response = getattr(request_client, scenario.method)(url, data, **kwargs)
+        response.close()
+        if response.status_code != scenario.expect:
+            raise AssertionError(
+                f"{scenario.name} returned {response.status_code}, expected {scenario.expect}"
+            )
+
+    send(*prepare())
+    samples = []
+    for _ in range(iterations):
+        request = prepare()
+        with profiling(RequestProfile()) as profile:
+            start = time.perf_counter()
+            send(*request)
+            wall = time.perf_counter() - start
+        samples.append((len(profile.queries), profile.db_seconds, profile.render_seconds, wall))
+
+    return {
+        'queries': max(sample[0] for sample in samples),
+        'db_ms': round(statistics.median(sample[1] for sample in samples) * 1000, 2),
+        'render_ms': round(statistics.median(sample[2] for sample in samples) * 1000, 2),
+        'wall_ms': round(statistics.median(sample[3] for sample in samples) * 1000, 2),
+    }
+
+
+def run_dataset(size, iterations, only=None):
+    """
+    Seed a dataset and measure every scenario. Everything runs in a
+    transaction that is rolled back, and uploaded files go to a temporary
+    MEDIA_ROOT. Returns ``{scenario: metrics}``.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as media_root, override_settings(
+        ALLOWED_HOSTS=['testserver'], MEDIA_ROOT=media_root
+    ), transaction.atomic():
+        dataset = seed_dataset(size)
+        users = {
+            'anonymous': None,
+            'applicant': dataset['applicant_application'].user,
+            'staff': dataset['staff'],
+        }
+        clients = {name: make_client(user) for name, user in users.items()}
+
+        for scenario in get_scenarios(dataset):
+            if only and scenario.name not in only:
+                continue
+            results[scenario.name] = measure(
+                clients[scenario.client], scenario, iterations, users[scenario.client]
+            )
+        transaction.set_rollback(True)
+    return results
+
+
+def check_budgets(results, budgets, metrics=('queries', 'wall_ms')):
+    """
+    Return a list of budget violations in ``{dataset: {scenario: metrics}}``.
+    """
+    violations = []
+    for dataset, scenarios in results.items():
+        for name, measured in scenarios.items():
+            budget = budgets.get(name)
+            if budget is None:
+                violations.append(f"{dataset} {name}: no budget")
+                continue
+            for metric in metrics:
+                if metric in budget and measured[metric] > budget[metric]:
+                    violations.append(
+                        f"{dataset} {name}: {metric} {measured[metric]} > {budget[metric]}"
+                    )
+    return violations
@@ -0,0 +1,189 @@
+"""
+Large-table mode for the application changelist.
+
+The stock changelist counts the filtered and the unfiltered table with
+COUNT(*) and pages with OFFSET, which both grow with the table. Once the
+table passes ADMISSIONS_ADMIN_LARGE_TABLE_ROWS (estimated from planner
+statistics), KeysetChangeList takes over:
+
+- the result count is exact up to ADMISSIONS_ADMIN_EXACT_COUNT_LIMIT
+  rows and a planner estimate beyond that, and the unfiltered total is
+  not counted at all
+- facet counts are cached per filter and query string for
+  ADMISSIONS_ADMIN_FACET_CACHE_TIMEOUT seconds
+- pages follow (created_at, id) from the last or first row shown,
+  newest first, instead of an OFFSET
+"""
+import hashlib
+import json
+from functools import partial
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Max, Q
+
+from .api import ApiError, decode_cursor, encode_cursor
+
+
+# Query string parameters of keyset pages
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+
+
+def estimate_table_rows(model):
+    """
+    Approximate number of rows in a model's table without scanning it:
+    the planner statistics on PostgreSQL, the largest primary key elsewhere.
+    """
+    connection = connections[model.objects.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1 until the table is first analyzed
+        if row and row[0] >= 0:
+            return row[0]
+    return model.objects.aggregate(rows=Max('pk'))['rows'] or 0
+
+
+def planner_estimate(queryset):
+    """
+    Rows the PostgreSQL planner expects a queryset to return, or None
+    on other databases.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.values('pk').explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_count(queryset, exact_limit):
+    """
+    Return ``(count, qualifier)``: an exact count ('') up to
+    ``exact_limit`` rows, then the planner estimate ('about') or, where
+    there is none, the limit itself ('more than').
+    """
+    queryset = queryset.order_by()
+    counted = queryset.values('pk')[:exact_limit + 1].count()
+    if counted <= exact_limit:
+        return counted, ''
+    estimate = planner_estimate(queryset)
+    if estimate is None:
+        return exact_limit, 'more than'
+    return max(estimate, counted), 'about'
+
+
+def is_large_table(model):
+    """
+    Whether the changelist of ``model`` should run in large-table mode.
+    ADMISSIONS_ADMIN_LARGE_TABLE forces it on or off; 'auto' compares the
+    estimated table size with ADMISSIONS_ADMIN_LARGE_TABLE_ROWS.
+    """
+    mode = getattr(settings, 'ADMISSIONS_ADMIN_LARGE_TABLE', 'auto')
+    if mode != 'auto':
+        return bool(mode)
+    threshold = getattr(settings, 'ADMISSIONS_ADMIN_LARGE_TABLE_ROWS', 100_000)
+    return estimate_table_rows(model) >= threshold
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist with estimated counts, cached facets and keyset paging.
+    """
+
+    keyset = True
+    ordering = ['-created_at', '-pk']
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        lookup_params.pop(BEFORE_VAR, None)
+        return lookup_params
+
+    def get_filters(self, request):
+        filters = super().get_filters(request)
+        for spec in filters[0]:
+            if hasattr(spec, 'get_facet_queryset'):
+                spec.get_facet_queryset = partial(
+                    self.get_cached_facets, spec, spec.get_facet_queryset
+                )
+        return filters
+
+    def get_cached_facets(self, spec, get_facet_queryset, changelist):
+        """
+        Facet counts of one filter, cached for the other active filters
+        and the search term.
+        """
+        expected = spec.expected_parameters()
+        other_params = sorted(
+            (name, value) for name, value in self.get_filters_params().items()
+            if name not in expected
+        )
+        key = 'admissions:facets:' + hashlib.sha1(json.dumps(
+            [self.opts.label, type(spec).__name__, expected, other_params, self.query]
+        ).encode()).hexdigest()
+        counts = cache.get(key)
+        if counts is None:
+            counts = get_facet_queryset(changelist)
+            cache.set(
+                key, counts, getattr(settings, 'ADMISSIONS_ADMIN_FACET_CACHE_TIMEOUT', 300)
+            )
+        return counts
+
+    def get_ordering(self, request, queryset):
+        return self.ordering
+
+    def get_results(self, request):
+        per_page = self.list_per_page
+        try:
+            if BEFORE_VAR in request.GET:
+                created_at, pk = decode_cursor(request.GET[BEFORE_VAR])
+                rows = list(
+                    self.queryset.filter(
+                        Q(created_at__gt=created_at) | Q(pk__gt=pk), created_at__gte=created_at
+                    ).order_by('created_at', 'pk')[:per_page + 1]
+                )
+                self.has_newer = len(rows) > per_page
+                self.has_older = True
+                rows = rows[:per_page][::-1]
+            else:
+                queryset = self.queryset
+                if AFTER_VAR in request.GET:
+                    created_at, pk = decode_cursor(request.GET[AFTER_VAR])
+                    queryset = queryset.filter(
+                        Q(created_at__lt=created_at) | Q(pk__lt=pk), created_at__lte=created_at
+                    )
+                rows = list(queryset[:per_page + 1])
+                self.has_newer = AFTER_VAR in request.GET
+                self.has_older = len(rows) > per_page
+                rows = rows[:per_page]
+        except ApiError:
+            raise IncorrectLookupParameters
+
+        self.result_count, self.count_qualifier = estimate_count(
+            self.queryset,
+            getattr(settings, 'ADMISSIONS_ADMIN_EXACT_COUNT_LIMIT', 10_000),
+        )
+        self.result_list = rows
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = self.has_newer or self.has_older
+        self.paginator = None
+        self.newest_url = self.get_query_string(remove=[AFTER_VAR, BEFORE_VAR])
+        self.newer_url = self.older_url = None
+        if rows and self.has_newer:
+            self.newer_url = self.get_query_string(
+                {BEFORE_VAR: encode_cursor(rows[0].created_at, rows[0].pk)}, remove=[AFTER_VAR]
+            )
+        if rows and self.has_older:
+            self.older_url = self.get_query_string(
+                {AFTER_VAR: encode_cursor(rows[-1].created_at, rows[-1].pk)}, remove=[BEFORE_VAR]
+            )
@@ -0,0 +1,156 @@
+"""
+Background processing of uploaded admission documents.
+Validates file contents, renders thumbnails/previews and counts PDF pages.
+"""
+import io
+import os
+import re
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .files import SNIFF_LENGTH, extension_content_type, sniff_content_type
+from .jobs import enqueue_many, task
+from .renditions import content_hash, generate_renditions, release_renditions
+
+
+THUMBNAIL_SIZE = (200, 200)
+PREVIEW_SIZE = (1024, 1024)
+
+# Content types accepted for each document field
+ALLOWED_CONTENT_TYPES = {
+    'passport_photo': {'image/jpeg', 'image/png'},
+    'olevel_result': {'application/pdf', 'image/jpeg', 'image/png'},
+    'birth_certificate': {'application/pdf', 'image/jpeg', 'image/png'},
+    'additional_document_1': {
+        'application/pdf',
+        'application/msword',
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    },
+}
+ALLOWED_CONTENT_TYPES['additional_document_2'] = ALLOWED_CONTENT_TYPES['additional_document_1']
+
+PDF_PAGE_RE = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+
+
+def accepted_content_type(field, name, header):
+    """
+    Return the content type identified by a file's leading bytes when it
+    is allowed for ``field`` and matches the extension of ``name``,
+    otherwise None.
+    """
+    content_type = sniff_content_type(header)
+    if content_type in ALLOWED_CONTENT_TYPES[field] and extension_content_type(name) == content_type:
+        return content_type
+    return None
+
+
+def enqueue_document_processing(application, fields):
+    """
+    Queue processing of the given document fields of an application.
+    """
+    return enqueue_many('admissions.process_document', [
+        {'application_id': application.pk, 'field': field}
+        for field in fields
+    ])
+
+
+def render_jpeg(image, size):
+    """
+    Return a size-bounded, orientation-corrected JPEG of an image.
+    """
+    rendition = ImageOps.exif_transpose(image).convert('RGB')
+    rendition.thumbnail(size)
+    output = io.BytesIO()
+    rendition.save(output, format='JPEG', quality=80, optimize=True)
+    return output.getvalue()
+
+
+def count_pdf_pages(data):
+    """
+    Count the pages of a PDF. Uses pypdf when installed, otherwise counts
+    page objects (which misses pages stored in compressed object streams).
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return len(PDF_PAGE_RE.findall(data)) or None
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+@task('admissions.process_document')
+def process_document(application_id, field):
+    """
+    Inspect one uploaded document and record the results.
+    """
+    from .models import AdmissionApplication, ApplicationDocument
+
+    try:
+        application = AdmissionApplication.objects.get(pk=application_id)
+    except AdmissionApplication.DoesNotExist:
+        return {'skipped': 'application deleted'}
+
+    upload = getattr(application, field)
+    if not upload:
+        ApplicationDocument.objects.filter(application=application, field_name=field).delete()
+        return {'skipped': 'no file'}
+
+    document, _ = ApplicationDocument.objects.get_or_create(
+        application=application,
+        field_name=field,
+        defaults={'source_name': upload.name},
+    )
+    if document.thumbnail:
+        document.thumbnail.delete(save=False)
+    if document.preview:
+        document.preview.delete(save=False)
+
+    with upload.open('rb') as stream:
+        data = stream.read()
+
+    digest = content_hash(data)
+    if document.content_hash != digest:
+        release_renditions(document)
+    document.content_hash = digest
+    document.source_name = upload.name
+    document.size = len(data)
+    document.content_type = sniff_content_type(data[:SNIFF_LENGTH]) or ''
+    document.width = document.height = document.page_count = None
+    document.error = ''
+    document.status = 'valid'
+
+    if document.content_type not in ALLOWED_CONTENT_TYPES[field]:
+        document.status = 'invalid'
+        document.error = "File contents are not an accepted document type."
+    elif document.content_type != extension_content_type(upload.name):
+        document.status = 'invalid'
+        document.error = "File extension does not match its contents."
+    elif document.content_type.startswith('image/'):
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.verify()
+            with Image.open(io.BytesIO(data)) as image:
+                document.width, document.height = image.size
+                base = os.path.splitext(os.path.basename(upload.name))[0]
+                document.thumbnail.save(
+                    f'{base}_thumb.jpg', ContentFile(render_jpeg(image, THUMBNAIL_SIZE)), save=False
+                )
+                document.preview.save(
+                    f'{base}_preview.jpg', ContentFile(render_jpeg(image, PREVIEW_SIZE)), save=False
+                )
+                if field == 'passport_photo':
+                    generate_renditions(document, image)
+        except (UnidentifiedImageError, OSError, SyntaxError) as exc:
+            document.status = 'invalid'
+            document.error = f"Image could not be read: {exc}"
+    elif document.content_type == 'application/pdf':
+        try:
+            document.page_count = count_pdf_pages(data)
+        except Exception as exc:
+            document.status = 'invalid'
+            document.error = f"PDF could not be read: {exc}"
+
+    document.processed_at = timezone.now()
+    document.save()
+    return {'status': document.status, 'content_type': document.content_type}
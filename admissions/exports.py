@@ -0,0 +1,317 @@
+"""
+Streaming exports of admission applications.
+Rows are read with a .values() projection over a chunked iterator and
+written out as they arrive, so memory stays flat at any table size.
+"""
+import csv
+import datetime
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import DOCUMENT_FIELDS
+from .storage import document_storage
+
+
+# (column header, .values() lookup)
+EXPORT_COLUMNS = [
+    ('Registration Number', 'registration_number'),
+    ('Status', 'status'),
+    ('First Name', 'user__first_name'),
+    ('Middle Name', 'user__middle_name'),
+    ('Last Name', 'user__last_name'),
+    ('Email', 'user__email'),
+    ('Phone Number', 'user__phone_number'),
+    ('Date of Birth', 'date_of_birth'),
+    ('Gender', 'gender'),
+    ('Nationality', 'nationality'),
+    ('Address', 'address'),
+    ('City', 'city'),
+    ('State', 'state'),
+    ('Postal Code', 'postal_code'),
+    ('Program', 'program_choice'),
+    ('Course of Study', 'course_of_study'),
+    ('Personal Info Completed', 'personal_info_completed'),
+    ('Program Info Completed', 'program_info_completed'),
+    ('Documents Uploaded', 'documents_uploaded'),
+    ('Review Notes', 'review_notes'),
+    ('Reviewed At', 'reviewed_at'),
+    ('Submitted At', 'submitted_at'),
+    ('Created At', 'created_at'),
+]
+
+EXPORT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Characters that make spreadsheet apps treat a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Control characters that are not allowed in XML 1.0
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one tuple per application, in EXPORT_COLUMNS order.
+    Uses a server-side cursor where the database supports it.
+    """
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    rows = queryset.order_by('pk').values_list(*lookups).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield tuple(format_value(value) for value in row)
+
+
+def format_value(value):
+    """
+    Convert a database value into an export cell.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.isoformat(sep=' ', timespec='seconds')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+class Echo:
+    """
+    File-like object that returns what is written, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """
+    Yield CSV lines: the header first, then one line per row.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow([
+            f"'{value}" if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) else value
+            for value in row
+        ])
+
+
+class ZipStreamBuffer:
+    """
+    Write-only, non-seekable buffer for building zip files on the fly.
+    ``zipfile`` falls back to data descriptors when it cannot seek, so
+    each entry can be yielded as soon as it is written.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        """Return and clear everything written since the last call."""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Applications" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def xlsx_row(values):
+    """
+    Render one worksheet row with inline string and number cells.
+    """
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c t="n"><v>{value}</v></c>')
+        else:
+            text = escape(ILLEGAL_XML_CHARS.sub('', str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'
+
+
+def iter_xlsx(rows, flush_every=500):
+    """
+    Yield an XLSX workbook as bytes, flushing every ``flush_every`` rows.
+    """
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        yield buffer.pop()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(xlsx_row([header for header, _ in EXPORT_COLUMNS]).encode())
+            for count, row in enumerate(rows, start=1):
+                sheet.write(xlsx_row(row).encode())
+                if count % flush_every == 0:
+                    yield buffer.pop()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.pop()
+
+
+def iter_export(queryset, file_format):
+    """
+    Return a byte/str iterator for the given export format.
+    """
+    rows = export_rows(queryset)
+    if file_format == 'xlsx':
+        return iter_xlsx(rows)
+    return iter_csv(rows)
+
+
+def export_filename(file_format):
+    return f"applications-{timezone.now():%Y%m%d-%H%M%S}.{file_format}"
+
+
+def streaming_export_response(queryset, file_format='csv'):
+    """
+    Stream the queryset to the browser as a CSV or XLSX download.
+    """
+    response = StreamingHttpResponse(
+        iter_export(queryset, file_format),
+        content_type=CONTENT_TYPES[file_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(file_format)}"'
+    return response
+
+
+# Already-compressed formats are stored as-is rather than deflated again
+STORED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.pdf', '.docx'}
+
+# Bytes read from storage per write into the archive
+DOCUMENT_CHUNK_SIZE = 64 * 1024
+
+
+def document_entries(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield (archive name, storage name) for every uploaded document,
+    laid out as <registration_number>/<field><ext>.
+    """
+    rows = (
+        queryset.order_by('registration_number')
+        .values_list('registration_number', *DOCUMENT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    for registration_number, *names in rows:
+        for field, name in zip(DOCUMENT_FIELDS, names):
+            if name:
+                ext = os.path.splitext(name)[1].lower()
+                yield f'{registration_number}/{field}{ext}', name
+
+
+def iter_documents_zip(queryset):
+    """
+    Yield a ZIP of the applications' documents as it is built.
+
+    Each file is copied into the archive in DOCUMENT_CHUNK_SIZE pieces and
+    every piece is yielded straight away, so only the archive's central
+    directory (one small record per file) grows with the batch size.
+    Files missing from storage are listed in MISSING.txt.
+    """
+    storage = document_storage()
+    buffer = ZipStreamBuffer()
+    date_time = timezone.localtime().timetuple()[:6]
+    missing = []
+
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for arcname, name in document_entries(queryset):
+            try:
+                source = storage.open(name, 'rb')
+            except FileNotFoundError:
+                missing.append(arcname)
+                continue
+
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            if os.path.splitext(arcname)[1] in STORED_EXTENSIONS:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            with source, archive.open(info, 'w', force_zip64=True) as entry:
+                for chunk in source.chunks(DOCUMENT_CHUNK_SIZE):
+                    entry.write(chunk)
+                    data = buffer.pop()
+                    if data:
+                        yield data
+            yield buffer.pop()
+
+        if missing:
+            archive.writestr('MISSING.txt', '\n'.join(missing) + '\n')
+    yield buffer.pop()
+
+
+def streaming_documents_response(queryset):
+    """
+    Stream the applications' documents to the browser as a ZIP download.
+    """
+    response = StreamingHttpResponse(iter_documents_zip(queryset), content_type='application/zip')
+    filename = f"documents-{timezone.now():%Y%m%d-%H%M%S}.zip"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
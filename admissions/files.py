@@ -0,0 +1,46 @@
+"""
+File type helpers for uploaded admission documents.
+"""
+
+
+# Leading bytes of each accepted document type
+SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'%PDF-', 'application/pdf'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/msword'),
+    (b'PK\x03\x04', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+]
+
+EXTENSION_CONTENT_TYPES = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'pdf': 'application/pdf',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+# Enough leading bytes for every signature above
+SNIFF_LENGTH = 16
+
+# Largest accepted document upload
+MAX_DOCUMENT_SIZE = 5 * 1024 * 1024
+
+
+def sniff_content_type(header):
+    """
+    Return the content type identified by a file's leading bytes, or None.
+    """
+    for signature, content_type in SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    return None
+
+
+def extension_content_type(name):
+    """
+    Return the content type implied by a file name's extension, or None.
+    """
+    ext = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return EXTENSION_CONTENT_TYPES.get(ext)
@@ -4,10 +4,42 @@ Step-by-step forms with validation.
 """
 from django import forms
 from django.core.exceptions import ValidationError
+from django.utils.functional import cached_property
 from .models import AdmissionApplication
 
 
-class PersonalInfoForm(forms.ModelForm):
+class VersionedApplicationForm(forms.ModelForm):
+    """
+    Form carrying the application version it was rendered from, so a
+    save cannot overwrite changes made since the page was opened.
+    """
+    
+    expected_version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+    
+    conflict_message = (
+        "Your application was changed elsewhere after this page was opened. "
+        "Reload the page to see the changes."
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['expected_version'].initial = self.instance.version
+    
+    @cached_property
+    def changed_data(self):
+        # Only model fields count as changes
+        return [name for name in super().changed_data if name != 'expected_version']
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        version = cleaned_data.get('expected_version')
+        if self.instance.pk and version is not None and version != self.instance.version:
+            raise ValidationError(self.conflict_message)
+        return cleaned_data
+
+
+class PersonalInfoForm(VersionedApplicationForm):
     """
     Step 1: Personal Information Form
     """
@@ -75,7 +107,7 @@ class PersonalInfoForm(forms.ModelForm):
         return dob
 
 
-class ProgramInfoForm(forms.ModelForm):
+class ProgramInfoForm(VersionedApplicationForm):
     """
     Step 2: Program Information Form
     """
@@ -108,7 +140,7 @@ class ProgramInfoForm(forms.ModelForm):
         return course
 
 
-class DocumentUploadForm(forms.ModelForm):
+class DocumentUploadForm(VersionedApplicationForm):
     """
     Step 3: Document Upload Form
     """
@@ -145,6 +177,20 @@ class DocumentUploadForm(forms.ModelForm):
             }),
         }
     
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        """
+        ``upload_errors`` holds files rejected by DocumentUploadHandler
+        while the request was being received.
+        """
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        for field, message in self.upload_errors.items():
+            self.add_error(field if field in self.fields else None, message)
+        return cleaned_data
+    
     def clean_passport_photo(self):
         """
         Validate passport photo size and format.
@@ -217,4 +263,32 @@ class ApplicationReviewForm(forms.ModelForm):
                 'rows': 5,
                 'placeholder': 'Enter review notes and comments...'
             }),
-        }
\ No newline at end of file
+        }
+
+
+class ApplicationAdminForm(VersionedApplicationForm):
+    """
+    Admin change form carrying the version the reviewer started from,
+    so saves cannot overwrite changes made in the meantime.
+    """
+    
+    conflict_message = (
+        "This application was changed by someone else after you opened it. "
+        "Reload the page to see the changes."
+    )
+    
+    class Meta:
+        model = AdmissionApplication
+        fields = '__all__'
+    
+    def clean_status(self):
+        """
+        Only allow transitions permitted by the status state machine.
+        """
+        status = self.cleaned_data['status']
+        if self.instance.pk and status != self.instance.status and not self.instance.can_transition(status):
+            raise ValidationError(
+                f"Cannot change status from {self.instance.get_status_display()} "
+                f"to {dict(AdmissionApplication.STATUS_CHOICES)[status]}."
+            )
+        return status
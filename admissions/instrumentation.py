@@ -0,0 +1,162 @@
+"""
+Per-request SQL and template timing.
+
+A RequestProfile is installed as a ``connection.execute_wrapper`` and
+as the current profile for template rendering while a request runs. It
+records every query with its duration, counts exact duplicates (same
+SQL and parameters) and groups queries by fingerprint, so a statement
+repeated once per row (an N+1 pattern) stands out. Query parameters are
+never logged, as they hold applicant data.
+
+Template.render is wrapped once per process; outside a profiled request
+the wrapper only checks a context variable.
+"""
+import contextvars
+import json
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.base import Template
+
+
+current_profile = contextvars.ContextVar('admissions_request_profile', default=None)
+
+IN_LIST_RE = re.compile(r'\bIN \((?:%s, )*%s\)')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Longest statement kept in log lines
+MAX_LOGGED_SQL = 2000
+
+
+def fingerprint(sql):
+    """
+    Normalize a statement so queries differing only in parameters or
+    IN-list length compare equal.
+    """
+    sql = WHITESPACE_RE.sub(' ', sql).strip()
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+class RequestProfile:
+    """
+    Queries and render time of one request.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.render_depth = 0
+        self.parameter_hashes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.db_seconds += duration
+            self.queries.append((sql, duration))
+            self.parameter_hashes[(sql, hash(repr(params)))] += 1
+
+    @property
+    def duplicates(self):
+        """
+        Number of queries that repeated an earlier one exactly.
+        """
+        return sum(count - 1 for count in self.parameter_hashes.values())
+
+    def repeated(self, threshold):
+        """
+        ``[(fingerprint, count)]`` of statements run at least ``threshold`` times.
+        """
+        counts = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return [(sql, count) for sql, count in counts.most_common() if count >= threshold]
+
+
+def timed_render(render):
+    def render_with_timing(self, context):
+        profile = current_profile.get()
+        if profile is None:
+            return render(self, context)
+        profile.render_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.render_depth -= 1
+            # Includes are counted in the template that includes them
+            if not profile.render_depth:
+                profile.render_seconds += time.perf_counter() - start
+    render_with_timing.admissions_timed = True
+    return render_with_timing
+
+
+def install_template_timing():
+    if not getattr(Template.render, 'admissions_timed', False):
+        Template.render = timed_render(Template.render)
+
+
+@contextmanager
+def profiling(profile):
+    """
+    Record queries on every database connection and template renders
+    into ``profile`` for the duration of the block.
+    """
+    install_template_timing()
+    token = current_profile.set(profile)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            yield profile
+    finally:
+        current_profile.reset(token)
+
+
+def server_timing(profile, total_seconds, repeated=()):
+    """
+    Server-Timing header value for a profiled request.
+    """
+    metrics = [
+        f'total;dur={total_seconds * 1000:.1f}',
+        f'db;dur={profile.db_seconds * 1000:.1f};desc="{len(profile.queries)} queries"',
+        f'render;dur={profile.render_seconds * 1000:.1f}',
+    ]
+    if profile.duplicates:
+        metrics.append(f'dup;desc="{profile.duplicates} duplicate queries"')
+    if repeated:
+        metrics.append(f'nplus1;desc="{len(repeated)} repeated statements"')
+    return ', '.join(metrics)
+
+
+def log_line(request, response, total_seconds, profile=None, repeated=(), include_queries=False):
+    """
+    JSON log line describing a request.
+    """
+    match = getattr(request, 'resolver_match', None)
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'total_ms': round(total_seconds * 1000, 1),
+        'sampled': profile is not None,
+    }
+    if profile is not None:
+        record.update({
+            'queries': len(profile.queries),
+            'db_ms': round(profile.db_seconds * 1000, 1),
+            'render_ms': round(profile.render_seconds * 1000, 1),
+            'duplicates': profile.duplicates,
+            'repeated': [{'sql': sql[:MAX_LOGGED_SQL], 'count': count} for sql, count in repeated],
+        })
+        if include_queries:
+            record['query_list'] = [
+                {'sql': sql[:MAX_LOGGED_SQL], 'ms': round(duration * 1000, 2)}
+                for sql, duration in profile.queries
+            ]
+    return json.dumps(record)
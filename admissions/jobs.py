@@ -0,0 +1,185 @@
+"""
+Database-backed background job queue.
+
+Jobs are rows in BackgroundJob, so no external broker is needed. Tasks are
+plain functions registered with @task and run by ``manage.py process_jobs``
+worker processes, which claim jobs with a compare-and-set UPDATE (plus
+SKIP LOCKED where the database supports it).
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+# The job run_job is executing in this thread
+_current = threading.local()
+
+
+def task(name):
+    """
+    Register a function as a background task under ``name``.
+    """
+    def decorator(func):
+        TASKS[name] = func
+        func.task_name = name
+        return func
+    return decorator
+
+
+def enqueue(name, **payload):
+    """
+    Queue a single job.
+    """
+    return enqueue_many(name, [payload])[0]
+
+
+def enqueue_many(name, payloads):
+    """
+    Queue one job per payload with a single INSERT.
+    """
+    from .models import BackgroundJob
+
+    if name not in TASKS:
+        raise KeyError(f"Unknown task: {name}")
+    return BackgroundJob.objects.bulk_create([
+        BackgroundJob(task_name=name, payload=payload)
+        for payload in payloads
+    ])
+
+
+def get_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claimable_jobs(now):
+    """
+    Queued jobs that are due, plus running jobs whose worker went away.
+    """
+    from .models import BackgroundJob
+
+    stale = now - timedelta(
+        seconds=getattr(settings, 'ADMISSIONS_JOB_TIMEOUT', 300)
+    )
+    return BackgroundJob.objects.filter(
+        Q(status='queued', run_after__lte=now)
+        | Q(status='running', locked_at__lt=stale)
+    )
+
+
+def claim_job(worker_id):
+    """
+    Atomically take the next job for this worker, or return None.
+    """
+    now = timezone.now()
+    candidates = claimable_jobs(now).order_by('run_after', 'pk')
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job_ids = list(
+                candidates.select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:1]
+            )
+            return _mark_running(job_ids, worker_id, now)
+
+    job_ids = list(candidates.values_list('pk', flat=True)[:10])
+    return _mark_running(job_ids, worker_id, now)
+
+
+def _mark_running(job_ids, worker_id, now):
+    from .models import BackgroundJob
+
+    for job_id in job_ids:
+        # Compare-and-set: only one worker can move the row to running
+        claimed = claimable_jobs(now).filter(pk=job_id).update(
+            status='running',
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return BackgroundJob.objects.get(pk=job_id)
+    return None
+
+
+def heartbeat():
+    """
+    Mark the running job as alive, so a long task is not reclaimed as
+    stale after ADMISSIONS_JOB_TIMEOUT. Does nothing outside a job.
+    """
+    from .models import BackgroundJob
+
+    job = getattr(_current, 'job', None)
+    if job is not None:
+        BackgroundJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+            locked_at=timezone.now()
+        )
+
+
+def run_job(job):
+    """
+    Execute a claimed job and record the outcome.
+    """
+    from .models import BackgroundJob
+
+    jobs = BackgroundJob.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    func = TASKS.get(job.task_name)
+    _current.job = job
+    try:
+        if func is None:
+            raise KeyError(f"Unknown task: {job.task_name}")
+        result = func(**job.payload)
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.pk, job.task_name)
+        if job.attempts < job.max_attempts:
+            delay = getattr(settings, 'ADMISSIONS_JOB_RETRY_DELAY', 30) * job.attempts
+            jobs.update(
+                status='queued',
+                error=str(exc),
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+        else:
+            jobs.update(status='failed', error=str(exc), finished_at=timezone.now())
+        return False
+    finally:
+        _current.job = None
+
+    jobs.update(
+        status='completed',
+        result=result if isinstance(result, dict) else {},
+        error='',
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def work(worker_id=None, once=False, poll_interval=None, should_stop=lambda: False):
+    """
+    Run jobs until stopped. With ``once`` return when the queue is empty.
+    Returns the number of jobs processed.
+    """
+    worker_id = worker_id or get_worker_id()
+    if poll_interval is None:
+        poll_interval = getattr(settings, 'ADMISSIONS_JOB_POLL_INTERVAL', 1.0)
+
+    processed = 0
+    while not should_stop():
+        job = claim_job(worker_id)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
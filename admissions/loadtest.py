@@ -0,0 +1,392 @@
+"""
+Load generator for the applicant journey.
+
+Each virtual user scripts what an applicant does on deadline day against
+a running server: register, log out and back in, fill in personal and
+program information, upload a passport photo and two PDF documents, and
+submit. Users pause for a random think time between pages and loop
+through new journeys until their stage ends. Stages raise the number of
+concurrent users step by step, so throughput and latency can be read at
+each level of load.
+
+Only the standard library is used for HTTP, so the harness runs
+anywhere the project runs; see the run_load_test management command.
+"""
+import csv
+import io
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from PIL import Image
+
+
+# Request steps of one journey, in order
+JOURNEY_STEPS = [
+    'register_form',
+    'register',
+    'logout',
+    'login_form',
+    'login',
+    'personal_info_form',
+    'personal_info',
+    'program_info_form',
+    'program_info',
+    'document_upload_form',
+    'document_upload',
+    'submit',
+    'dashboard',
+]
+
+PERCENTILES = (50, 95, 99)
+
+TIMEOUT = 60
+
+
+class JourneyError(Exception):
+    """
+    A step returned an unexpected response.
+    """
+
+
+class StageEnded(Exception):
+    """
+    The stage ended while the user was thinking.
+    """
+
+
+class NoRedirectHandler(HTTPRedirectHandler):
+    """
+    Return redirects as responses so each request is timed on its own.
+    """
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def encode_multipart(fields, files):
+    """
+    Return (body, content type) for a multipart/form-data request.
+    ``files`` maps field names to (filename, content type, bytes).
+    """
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            f'{value}\r\n'.encode()
+        )
+    for name, (filename, content_type, data) in files.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\nContent-Type: {content_type}\r\n\r\n'.encode()
+        )
+        body.write(data)
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return body.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+def make_photo(size=(1200, 1600)):
+    """
+    A noisy JPEG close to a phone camera photo in size and entropy.
+    """
+    image = Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3))
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=85)
+    return output.getvalue()
+
+
+def make_pdf(size):
+    """
+    A minimal PDF padded to about ``size`` bytes.
+    """
+    header = b'%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\n'
+    padding = b''.join(
+        b'%' + os.urandom(36).hex().encode() + b'\n'
+        for _ in range(max(size - len(header), 0) // 74)
+    )
+    return header + padding + b'trailer << /Root 1 0 R >>\n%%EOF\n'
+
+
+def unique(data):
+    """
+    Append random bytes so every applicant uploads distinct content.
+    """
+    return data + b'\n%' + uuid.uuid4().hex.encode() + b'\n'
+
+
+class Recorder:
+    """
+    Thread-safe collection of request samples and completed journeys.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+        self.journeys = defaultdict(int)
+
+    def add(self, stage, user, step, started, duration, status, error=''):
+        with self.lock:
+            self.samples.append({
+                'stage': stage,
+                'user': user,
+                'step': step,
+                'started': round(started, 4),
+                'duration_ms': round(duration * 1000, 2),
+                'status': status,
+                'error': error,
+            })
+
+    def journey_completed(self, stage):
+        with self.lock:
+            self.journeys[stage] += 1
+
+
+class VirtualUser:
+    """
+    One applicant's browser: a cookie jar and the journey script.
+    """
+
+    def __init__(self, base_url, recorder, stage, number, documents, think_time, started):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.stage = stage
+        self.number = number
+        self.documents = documents
+        self.think_time = think_time
+        self.started = started
+        self.stop = threading.Event()
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), NoRedirectHandler)
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, step, path, data=None, files=None, expect=(200,), contains=None):
+        """
+        Issue one timed request and check its status (and body text).
+        """
+        headers = {'User-Agent': 'admissions-load-test'}
+        body = None
+        if files is not None:
+            body, headers['Content-Type'] = encode_multipart(data or {}, files)
+        elif data is not None:
+            body = urlencode(data).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if body is not None:
+            headers['X-CSRFToken'] = self.csrf_token()
+            headers['Referer'] = urljoin(self.base_url, path)
+
+        request = Request(urljoin(self.base_url, path), data=body, headers=headers)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=TIMEOUT) as response:
+                status, content = response.status, response.read()
+        except HTTPError as exc:
+            status, content = exc.code, exc.read()
+        except (URLError, OSError) as exc:
+            duration = time.perf_counter() - start
+            self.recorder.add(self.stage, self.number, step, start - self.started, duration, 0, str(exc))
+            raise JourneyError(f'{step}: {exc}')
+        duration = time.perf_counter() - start
+
+        error = ''
+        if status not in expect:
+            error = f'unexpected status {status}'
+        elif contains is not None and contains.encode() not in content:
+            error = f'response does not contain {contains!r}'
+        self.recorder.add(self.stage, self.number, step, start - self.started, duration, status, error)
+        if error:
+            raise JourneyError(f'{step}: {error}')
+        return content
+
+    def think(self):
+        low, high = self.think_time
+        if high > 0:
+            self.stop.wait(random.uniform(low, high))
+        if self.stop.is_set():
+            raise StageEnded
+
+    def run_journey(self):
+        name = uuid.uuid4().hex[:12]
+        email = f'loadtest-{name}@example.invalid'
+        password = f'Lt-{uuid.uuid4().hex}'
+        letters = re.sub(r'[^a-z]', '', name) or 'applicant'
+
+        self.request('register_form', '/accounts/register/')
+        self.think()
+        self.request('register', '/accounts/register/', {
+            'first_name': 'Load',
+            'middle_name': '',
+            'last_name': f'Tester{letters}'.title(),
+            'email': email,
+            'password1': password,
+            'password2': password,
+        }, expect=(302,))
+        self.request('logout', '/accounts/logout/', {}, expect=(302,))
+        self.think()
+        self.request('login_form', '/accounts/login/')
+        self.think()
+        self.request('login', '/accounts/login/', {
+            'username': email,
+            'password': password,
+        }, expect=(302,))
+        self.think()
+
+        self.request('personal_info_form', '/admissions/personal-info/')
+        self.think()
+        self.request('personal_info', '/admissions/personal-info/', {
+            'date_of_birth': '2006-03-14',
+            'gender': random.choice(['M', 'F']),
+            'nationality': 'Nigerian',
+            'address': '12 University Road',
+            'city': 'Enugu',
+            'state': 'Enugu',
+            'postal_code': '400001',
+        }, expect=(302,))
+        self.think()
+
+        self.request('program_info_form', '/admissions/program-info/')
+        self.think()
+        self.request('program_info', '/admissions/program-info/', {
+            'program_choice': random.choice(['undergraduate', 'postgraduate', 'diploma', 'certificate']),
+            'course_of_study': 'Computer Science',
+        }, expect=(302,))
+        self.think()
+
+        self.request('document_upload_form', '/admissions/upload-documents/')
+        self.think()
+        photo, olevel, certificate = self.documents
+        self.request('document_upload', '/admissions/upload-documents/', {}, files={
+            'passport_photo': ('photo.jpg', 'image/jpeg', unique(photo)),
+            'olevel_result': ('olevel.pdf', 'application/pdf', unique(olevel)),
+            'birth_certificate': ('birth-certificate.pdf', 'application/pdf', unique(certificate)),
+        }, expect=(302,))
+        self.think()
+
+        self.request('submit', '/admissions/submit/', {}, expect=(302,))
+        self.request('dashboard', '/admissions/dashboard/', contains='awaiting review')
+        self.recorder.journey_completed(self.stage)
+
+    def run(self, stop):
+        self.stop = stop
+        try:
+            while not stop.is_set():
+                self.cookies.clear()
+                try:
+                    self.run_journey()
+                except JourneyError:
+                    # Logged by request(); start over as a new applicant
+                    self.think()
+        except StageEnded:
+            pass
+
+
+def run_stage(base_url, recorder, stage, users, duration, documents, think_time, started):
+    """
+    Run ``users`` concurrent virtual users for ``duration`` seconds.
+    Users finish their current request, not their journey, at the end.
+    Returns the elapsed seconds.
+    """
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=VirtualUser(
+                base_url, recorder, stage, number, documents, think_time, started
+            ).run,
+            args=(stop,),
+            daemon=True,
+        )
+        for number in range(users)
+    ]
+    stage_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - stage_start
+
+
+def summarize(recorder, stages):
+    """
+    Per stage: throughput, error rate and latency percentiles per step.
+    ``stages`` is a list of (concurrent users, elapsed seconds).
+    """
+    by_stage = defaultdict(lambda: defaultdict(list))
+    for sample in recorder.samples:
+        by_stage[sample['stage']][sample['step']].append(sample)
+
+    summary = []
+    for stage, (users, elapsed) in enumerate(stages):
+        steps = {}
+        total = errors = 0
+        for step in JOURNEY_STEPS:
+            samples = by_stage[stage].get(step, [])
+            failed = sum(1 for sample in samples if sample['error'])
+            durations = [sample['duration_ms'] for sample in samples if not sample['error']]
+            steps[step] = {
+                'requests': len(samples),
+                'errors': failed,
+                'error_rate': round(failed / len(samples), 4) if samples else 0,
+                **{f'p{pct}_ms': percentile(durations, pct) for pct in PERCENTILES},
+            }
+            total += len(samples)
+            errors += failed
+        summary.append({
+            'users': users,
+            'elapsed_s': round(elapsed, 2),
+            'journeys': recorder.journeys[stage],
+            'journeys_per_s': round(recorder.journeys[stage] / elapsed, 3) if elapsed else 0,
+            'requests': total,
+            'requests_per_s': round(total / elapsed, 2) if elapsed else 0,
+            'error_rate': round(errors / total, 4) if total else 0,
+            'steps': steps,
+        })
+    return summary
+
+
+def write_results(output_dir, config, summary, samples):
+    """
+    Save the summary as JSON and the raw samples as CSV lines.
+    Returns the two paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    summary_path = os.path.join(output_dir, f'loadtest-{stamp}.json')
+    samples_path = os.path.join(output_dir, f'loadtest-{stamp}-samples.csv')
+    with open(summary_path, 'w') as output:
+        json.dump({'config': config, 'stages': summary}, output, indent=2, default=str)
+    with open(samples_path, 'w', newline='') as output:
+        writer = csv.DictWriter(
+            output, fieldnames=['stage', 'user', 'step', 'started', 'duration_ms', 'status', 'error']
+        )
+        writer.writeheader()
+        writer.writerows(samples)
+    return summary_path, samples_path
@@ -0,0 +1,93 @@
+"""
+Measure the applicant dashboard and detail pages.
+
+Compares a full render with a cold fragment cache (what every visit cost
+before conditional GET and fragment caching), a full render with warm
+fragments, and a conditional GET answered with 304 Not Modified.
+Runs against a throwaway applicant inside a transaction that is rolled back.
+
+Usage:
+    python manage.py benchmark_applicant_pages --iterations 200
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from admissions.models import AdmissionApplication
+
+
+PAGES = ['admissions:dashboard', 'admissions:application_detail']
+
+
+class Command(BaseCommand):
+    help = "Benchmark full, fragment-cached and 304 responses of the applicant pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help="Requests per page and scenario (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        with override_settings(ALLOWED_HOSTS=['testserver']), transaction.atomic():
+            client = Client()
+            client.force_login(self.create_applicant())
+
+            self.stdout.write(f"{'page':<24}{'scenario':<22}{'median ms':>10}{'p95 ms':>10}{'queries':>9}")
+            for page in PAGES:
+                url = reverse(page)
+                etag = client.get(url)['ETag']
+                scenarios = [
+                    ('full, cold fragments', {}, True),
+                    ('full, warm fragments', {}, False),
+                    ('conditional (304)', {'HTTP_IF_NONE_MATCH': etag}, False),
+                ]
+                for name, headers, clear_cache in scenarios:
+                    timings, queries = self.measure(client, url, headers, clear_cache, iterations)
+                    self.stdout.write(
+                        f"{page.split(':')[1]:<24}{name:<22}"
+                        f"{statistics.median(timings):>10.2f}"
+                        f"{statistics.quantiles(timings, n=20)[-1]:>10.2f}"
+                        f"{queries:>9}"
+                    )
+            transaction.set_rollback(True)
+
+    def create_applicant(self):
+        user = get_user_model().objects.create_user(
+            username='benchmark-applicant',
+            email='benchmark-applicant@example.invalid',
+            first_name='Bench',
+            last_name='Mark',
+        )
+        AdmissionApplication.objects.create(
+            user=user,
+            personal_info_completed=True,
+            program_info_completed=True,
+            program_choice='undergraduate',
+            course_of_study='Computer Science',
+        )
+        return user
+
+    def measure(self, client, url, headers, clear_cache, iterations):
+        timings = []
+        for _ in range(iterations):
+            if clear_cache:
+                cache.clear()
+            start = time.perf_counter()
+            response = client.get(url, **headers)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code not in (200, 304):
+                raise CommandError(f"{url} returned {response.status_code}")
+        with CaptureQueriesContext(connection) as context:
+            client.get(url, **headers)
+        return timings, len(context.captured_queries)
@@ -0,0 +1,138 @@
+"""
+Move existing applicant documents into the content-addressed blob store.
+
+Usage:
+    python manage.py convert_document_storage --workers 8
+    python manage.py convert_document_storage --dry-run
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from admissions.models import DOCUMENT_FIELDS, AdmissionApplication, ApplicationDocument, StoredBlob
+from admissions.storage import BLOB_PREFIX, ContentAddressedStorage, document_storage, is_blob_name
+
+
+# Applications handled per worker task (and per database connection)
+BATCH_SIZE = 100
+
+
+def convert_batch(rows, keep_originals):
+    """
+    Convert one batch of (pk, {field: name}) rows.
+    Returns (converted, missing) file counts.
+    """
+    storage = document_storage()
+    converted = missing = 0
+    for pk, names in rows:
+        for field, name in names.items():
+            if not storage.exists(name):
+                missing += 1
+                continue
+            with storage.open(name) as original:
+                blob = storage.save(name, original)
+
+            with transaction.atomic():
+                # Only if the applicant has not replaced the file meanwhile
+                updated = AdmissionApplication.objects.filter(
+                    pk=pk, **{field: name}
+                ).update(**{field: blob, 'updated_at': timezone.now(), 'version': F('version') + 1})
+                if updated:
+                    ApplicationDocument.objects.filter(
+                        application_id=pk, field_name=field, source_name=name
+                    ).update(source_name=blob)
+            if not updated:
+                storage.delete(blob)
+                continue
+
+            converted += 1
+            if not keep_originals:
+                storage.delete(name)
+    return converted, missing
+
+
+def convert_batch_in_thread(rows, keep_originals):
+    try:
+        return convert_batch(rows, keep_originals)
+    finally:
+        # Worker threads each open their own connection
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Convert uploads/user_<id>/ documents to deduplicated content-addressed blobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help="Number of files hashed and copied in parallel (default: 4)",
+        )
+        parser.add_argument(
+            '--keep-originals',
+            action='store_true',
+            help="Leave the original files in place after conversion",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report how many files would be converted",
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(document_storage(), ContentAddressedStorage):
+            self.stderr.write(self.style.WARNING(
+                "STORAGES['documents'] is not a ContentAddressedStorage; nothing to do."
+            ))
+            return
+
+        legacy = Q()
+        for field in DOCUMENT_FIELDS:
+            legacy |= Q(**{f'{field}__gt': ''}) & ~Q(**{f'{field}__startswith': f'{BLOB_PREFIX}/'})
+        rows = (
+            AdmissionApplication.objects.filter(legacy)
+            .order_by('pk')
+            .values_list('pk', *DOCUMENT_FIELDS)
+            .iterator(chunk_size=2000)
+        )
+
+        batches, batch, files = [], [], 0
+        for pk, *names in rows:
+            names = {
+                field: name
+                for field, name in zip(DOCUMENT_FIELDS, names)
+                if name and not is_blob_name(name)
+            }
+            files += len(names)
+            batch.append((pk, names))
+            if len(batch) == BATCH_SIZE:
+                batches.append(batch)
+                batch = []
+        if batch:
+            batches.append(batch)
+
+        if options['dry_run']:
+            self.stdout.write(f"{files} file(s) to convert.")
+            return
+
+        keep_originals = options['keep_originals']
+        if options['workers'] <= 1:
+            results = [convert_batch(batch, keep_originals) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                results = list(executor.map(
+                    convert_batch_in_thread, batches, [keep_originals] * len(batches)
+                ))
+        converted = sum(result[0] for result in results)
+        missing = sum(result[1] for result in results)
+
+        blobs = StoredBlob.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Converted {converted} file(s) into the blob store ({blobs} distinct blob(s))."
+        ))
+        if missing:
+            self.stderr.write(self.style.WARNING(f"{missing} referenced file(s) were missing."))
@@ -0,0 +1,59 @@
+"""
+Export admission applications as CSV or XLSX.
+
+Usage:
+    python manage.py export_applications --format xlsx --output intake.xlsx
+    python manage.py export_applications --status submitted > submitted.csv
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from admissions.exports import iter_export
+from admissions.models import AdmissionApplication
+
+
+class Command(BaseCommand):
+    help = "Stream admission applications to a CSV or XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'xlsx'],
+            default='csv',
+            help="Output format (default: csv)",
+        )
+        parser.add_argument(
+            '--output',
+            help="File to write to (default: stdout, CSV only)",
+        )
+        parser.add_argument(
+            '--status',
+            action='append',
+            choices=[value for value, _ in AdmissionApplication.STATUS_CHOICES],
+            help="Only export applications with this status (repeatable)",
+        )
+        parser.add_argument(
+            '--program',
+            choices=[value for value, _ in AdmissionApplication.PROGRAM_CHOICES],
+            help="Only export applications for this program",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format']
+        output = options['output']
+        if file_format == 'xlsx' and not output:
+            raise CommandError("--output is required for XLSX exports.")
+
+        queryset = AdmissionApplication.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status__in=options['status'])
+        if options['program']:
+            queryset = queryset.filter(program_choice=options['program'])
+
+        if output:
+            with open(output, 'wb') as stream:
+                for chunk in iter_export(queryset, file_format):
+                    stream.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported applications to {output}"))
+        else:
+            for chunk in iter_export(queryset, file_format):
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,78 @@
+"""
+Run background job workers.
+
+Usage:
+    python manage.py process_jobs --workers 4
+    python manage.py process_jobs --once
+"""
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from admissions.jobs import get_worker_id, work
+
+
+def run_worker(poll_interval):
+    """
+    Worker process entry point: run jobs until SIGTERM/SIGINT.
+    """
+    import django
+    django.setup()
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+    work(get_worker_id(), poll_interval=poll_interval, should_stop=lambda: bool(stopping))
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs with a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help="Number of worker processes (default: 1)",
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Process every due job in this process, then exit",
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help="Seconds to wait when the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            processed = work(once=True)
+            self.stdout.write(f"Processed {processed} job(s).")
+            return
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=run_worker, args=(options['poll_interval'],))
+            for _ in range(max(1, options['workers']))
+        ]
+        for worker in workers:
+            worker.start()
+        # Forward SIGTERM so workers finish their current job and exit
+        signal.signal(signal.SIGTERM, lambda *args: [worker.terminate() for worker in workers])
+        self.stdout.write(f"Started {len(workers)} worker(s).")
+
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.join()
@@ -0,0 +1,37 @@
+"""
+Rebuild the application statistics rollup from the applications.
+
+Needed after bulk imports, raw SQL updates or restoring a backup; normal
+status and program changes keep the rollup current on their own.
+
+Usage:
+    python manage.py reconcile_statistics
+    python manage.py reconcile_statistics --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from admissions.statistics import reconcile_statistics
+
+
+class Command(BaseCommand):
+    help = "Compare the application statistics rollup with the applications and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report buckets that differ",
+        )
+
+    def handle(self, *args, **options):
+        drift = reconcile_statistics(dry_run=options['dry_run'])
+        for (intake_year, status, program_choice, day), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f"{intake_year} {status} {program_choice or '-'} {day}: {stored} -> {actual}"
+            )
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Statistics are up to date."))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} bucket(s) differ."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Corrected {len(drift)} bucket(s)."))
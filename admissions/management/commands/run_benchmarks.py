@@ -0,0 +1,137 @@
+"""
+Run the view benchmarks against seeded throwaway databases.
+
+A test database is created for the run (the configured database is not
+touched), each dataset is seeded and measured in a rolled back
+transaction, and the results are checked against
+admissions/benchmark_budgets.json.
+
+Usage:
+    python manage.py run_benchmarks
+    python manage.py run_benchmarks --sizes small --scenario admin.changelist
+    python manage.py run_benchmarks --update-budgets
+"""
+import json
+import math
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from admissions import benchmarks
+
+
+# Headroom for --update-budgets; query counts get none
+WALL_TIME_HEADROOM = 3
+MIN_WALL_BUDGET_MS = 50
+
+
+class Command(BaseCommand):
+    help = "Measure queries, DB, render and wall time of every view and enforce the budgets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default=','.join(benchmarks.DATASET_SIZES),
+            help=f"Comma-separated datasets (default: {','.join(benchmarks.DATASET_SIZES)})",
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            help="Only run this scenario (repeatable)",
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=5,
+            help="Measured requests per scenario after one warm-up (default: 5)",
+        )
+        parser.add_argument(
+            '--budgets',
+            default=benchmarks.BUDGET_FILE,
+            help="Budget file (default: admissions/benchmark_budgets.json)",
+        )
+        parser.add_argument(
+            '--output',
+            help="JSON results file (default: benchmark-results/benchmarks-<time>.json)",
+        )
+        parser.add_argument(
+            '--update-budgets',
+            action='store_true',
+            help="Rewrite the budget file from this run instead of checking it",
+        )
+
+    def handle(self, *args, **options):
+        sizes = options['sizes'].split(',')
+        unknown = set(sizes) - set(benchmarks.DATASET_SIZES)
+        if unknown:
+            raise CommandError(f"Unknown dataset(s): {', '.join(sorted(unknown))}")
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = {}
+            for size in sizes:
+                self.stdout.write(f"Dataset {size} ({benchmarks.DATASET_SIZES[size]} applications)")
+                results[size] = benchmarks.run_dataset(
+                    benchmarks.DATASET_SIZES[size], options['iterations'], options['scenario']
+                )
+                self.print_results(results[size])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options['update_budgets']:
+            self.update_budgets(options['budgets'], results)
+            violations = []
+        else:
+            with open(options['budgets']) as budget_file:
+                budgets = json.load(budget_file)
+            violations = benchmarks.check_budgets(results, budgets)
+
+        output = options['output'] or os.path.join(
+            'benchmark-results', f"benchmarks-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as output_file:
+            json.dump({
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'iterations': options['iterations'],
+                'datasets': {size: benchmarks.DATASET_SIZES[size] for size in sizes},
+                'results': results,
+                'violations': violations,
+            }, output_file, indent=2)
+        self.stdout.write(f"Wrote {output}")
+
+        if violations:
+            raise CommandError("Budgets exceeded:\n" + "\n".join(violations))
+        self.stdout.write(self.style.SUCCESS("All scenarios within budget."))
+
+    def print_results(self, results):
+        self.stdout.write(
+            f"  {'scenario':<34}{'queries':>8}{'db ms':>9}{'render ms':>11}{'wall ms':>10}"
+        )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"  {name:<34}{metrics['queries']:>8}{metrics['db_ms']:>9.2f}"
+                f"{metrics['render_ms']:>11.2f}{metrics['wall_ms']:>10.2f}"
+            )
+
+    def update_budgets(self, path, results):
+        budgets = {}
+        if os.path.exists(path):
+            with open(path) as budget_file:
+                budgets = json.load(budget_file)
+        for scenarios in results.values():
+            for name, metrics in scenarios.items():
+                budgets.setdefault(name, {'queries': 0, 'wall_ms': 0})
+                budgets[name]['queries'] = max(budgets[name]['queries'], metrics['queries'])
+                wall_budget = max(
+                    math.ceil(metrics['wall_ms'] * WALL_TIME_HEADROOM / 10) * 10, MIN_WALL_BUDGET_MS
+                )
+                budgets[name]['wall_ms'] = max(budgets[name]['wall_ms'], wall_budget)
+        with open(path, 'w') as budget_file:
+            json.dump(dict(sorted(budgets.items())), budget_file, indent=2)
+            budget_file.write('\n')
+        self.stdout.write(f"Updated {path}")
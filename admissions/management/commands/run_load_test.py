@@ -0,0 +1,136 @@
+"""
+Drive concurrent applicant journeys against a running server.
+
+Start the server separately (runserver, or gunicorn for realistic
+numbers), then:
+
+Usage:
+    python manage.py run_load_test --base-url http://127.0.0.1:8000 --stages 5,10,25,50
+    python manage.py run_load_test --stages 1 --stage-duration 30 --think-time 0 0
+
+Every virtual user registers a new account; run it against a disposable
+database. Results are written to --output-dir as a JSON summary and a CSV
+of every request, named by start time, so runs can be compared.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admissions import loadtest
+
+
+def stage_list(value):
+    try:
+        stages = [int(users) for users in value.split(',')]
+    except ValueError:
+        stages = []
+    if not stages or min(stages) < 1:
+        raise ValueError(value)
+    return stages
+
+
+class Command(BaseCommand):
+    help = "Load test the register-to-submit applicant journey against a running server."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            default='http://127.0.0.1:8000',
+            help="Server to test (default: http://127.0.0.1:8000)",
+        )
+        parser.add_argument(
+            '--stages',
+            type=stage_list,
+            default=[1, 5, 10, 25],
+            help="Comma-separated concurrent users per stage (default: 1,5,10,25)",
+        )
+        parser.add_argument(
+            '--stage-duration',
+            type=float,
+            default=60,
+            help="Seconds each stage runs (default: 60)",
+        )
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            nargs=2,
+            default=[1.0, 5.0],
+            metavar=('MIN', 'MAX'),
+            help="Random pause between pages in seconds (default: 1 5)",
+        )
+        parser.add_argument(
+            '--photo-size',
+            type=int,
+            nargs=2,
+            default=[1200, 1600],
+            metavar=('WIDTH', 'HEIGHT'),
+            help="Passport photo dimensions (default: 1200 1600)",
+        )
+        parser.add_argument(
+            '--document-size',
+            type=int,
+            default=400 * 1024,
+            help="Size of each PDF document in bytes (default: 409600)",
+        )
+        parser.add_argument(
+            '--output-dir',
+            default='loadtest-results',
+            help="Directory for result files (default: loadtest-results)",
+        )
+
+    def handle(self, *args, **options):
+        think_time = tuple(options['think_time'])
+        if think_time[0] < 0 or think_time[0] > think_time[1]:
+            raise CommandError("--think-time needs 0 <= MIN <= MAX.")
+
+        documents = (
+            loadtest.make_photo(tuple(options['photo_size'])),
+            loadtest.make_pdf(options['document_size']),
+            loadtest.make_pdf(options['document_size']),
+        )
+        recorder = loadtest.Recorder()
+        started = time.perf_counter()
+        stages = []
+        for stage, users in enumerate(options['stages']):
+            self.stdout.write(f"Stage {stage + 1}: {users} user(s) for {options['stage_duration']:g}s")
+            elapsed = loadtest.run_stage(
+                options['base_url'],
+                recorder,
+                stage,
+                users,
+                options['stage_duration'],
+                documents,
+                think_time,
+                started,
+            )
+            stages.append((users, elapsed))
+
+        summary = loadtest.summarize(recorder, stages)
+        self.print_summary(summary)
+
+        config = {
+            key: options[key]
+            for key in ['base_url', 'stages', 'stage_duration', 'think_time', 'photo_size', 'document_size']
+        }
+        config['photo_bytes'] = len(documents[0])
+        summary_path, samples_path = loadtest.write_results(
+            options['output_dir'], config, summary, recorder.samples
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {summary_path} and {samples_path}"))
+
+    def print_summary(self, summary):
+        for stage in summary:
+            self.stdout.write(
+                f"\n{stage['users']} user(s): {stage['journeys']} journeys "
+                f"({stage['journeys_per_s']}/s), {stage['requests_per_s']} requests/s, "
+                f"{stage['error_rate']:.2%} errors"
+            )
+            self.stdout.write(f"  {'step':<22}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+            for step, stats in stage['steps'].items():
+                if not stats['requests']:
+                    continue
+                latencies = ''.join(
+                    f"{stats[f'p{pct}_ms']:>10.1f}" if stats[f'p{pct}_ms'] is not None else f"{'-':>10}"
+                    for pct in loadtest.PERCENTILES
+                )
+                self.stdout.write(f"  {step:<22}{stats['requests']:>9}{stats['errors']:>8}{latencies}")
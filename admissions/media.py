@@ -0,0 +1,148 @@
+"""
+Access-controlled delivery of applicant documents.
+
+Django only decides whether a document may be seen; the bytes are sent by
+the front proxy when ADMISSIONS_PROTECTED_MEDIA_SERVER is configured:
+
+    'nginx'     X-Accel-Redirect to ADMISSIONS_PROTECTED_MEDIA_PREFIX + name,
+                served by an ``internal`` location aliasing MEDIA_ROOT
+    'sendfile'  X-Sendfile with the absolute path (Apache mod_xsendfile,
+                lighttpd), which must be allowed to read MEDIA_ROOT
+
+Without a proxy a FileResponse is returned, which WSGI servers hand to
+sendfile() through wsgi.file_wrapper. Single byte ranges are supported so
+interrupted downloads and PDF viewers can fetch parts of a file.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date
+from django.views.static import serve, was_modified_since
+
+
+# Storage prefixes holding applicant documents and copies derived from them
+PROTECTED_PREFIXES = ('blobs/', 'uploads/', 'processed/', 'renditions/')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def is_protected_name(name):
+    return name.startswith(PROTECTED_PREFIXES) and '..' not in name.split('/')
+
+
+def serve_public_media(request, path, document_root=None, show_indexes=False):
+    """
+    Development server view for MEDIA_ROOT that leaves out applicant
+    documents, which only the protected document view may send.
+    """
+    if path.startswith(PROTECTED_PREFIXES) or '..' in path.split('/'):
+        raise Http404("Not a public file.")
+    return serve(request, path, document_root=document_root, show_indexes=show_indexes)
+
+
+def parse_range(header, size):
+    """
+    Return the (start, end) byte positions, inclusive, of a single-range
+    Range header. Returns None to send the whole file (no header, or one
+    this view does not handle) and raises ValueError if unsatisfiable.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+class RangeFile:
+    """
+    Read-only view of ``length`` bytes of an open file from its position.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def serve_document(request, storage, name):
+    """
+    Return a response delivering a stored document.
+    """
+    path = storage.path(name)
+    stat = os.stat(path)
+    content_type, encoding = mimetypes.guess_type(name)
+    content_type = content_type or 'application/octet-stream'
+
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    server = getattr(settings, 'ADMISSIONS_PROTECTED_MEDIA_SERVER', None)
+    if server == 'nginx':
+        prefix = getattr(settings, 'ADMISSIONS_PROTECTED_MEDIA_PREFIX', '/protected-media/')
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = prefix + quote(name)
+    elif server == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    else:
+        response = file_response(request, path, stat.st_size, content_type)
+
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = 'private, max-age=3600'
+    response['X-Content-Type-Options'] = 'nosniff'
+    response['Content-Disposition'] = f'inline; filename="{os.path.basename(name)}"'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+def file_response(request, path, size, content_type):
+    """
+    FileResponse for the whole file or a single byte range.
+    """
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        if end == size - 1:
+            # Runs to the end of the file, so sendfile() can still be used
+            response = FileResponse(file, content_type=content_type, status=206)
+        else:
+            response = FileResponse(
+                RangeFile(file, end - start + 1), content_type=content_type, status=206
+            )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
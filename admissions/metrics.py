@@ -0,0 +1,333 @@
+"""
+Request and application metrics in the Prometheus text format.
+
+Every worker process adds to its own store. With ADMISSIONS_METRICS_DIR
+set, the store is a memory-mapped file named after the process id in
+that directory, and the /metrics view sums the files of all workers, so
+gunicorn workers report together without a metrics server. Without it,
+an in-memory store covers the current process only, which is enough for
+runserver and the tests.
+
+Clear the directory when the server restarts; files of exited workers
+are still summed, which keeps counters from going backwards while the
+server runs.
+
+Recorded:
+
+- requests by resolved URL name, method and status
+- request latency and database time histograms by URL name
+- request body bytes (uploads) by URL name
+- committed application status transitions
+"""
+import functools
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+
+METRICS = {
+    'admissions_http_requests_total': (
+        'counter', 'Requests by URL name, method and status.'
+    ),
+    'admissions_http_request_duration_seconds': (
+        'histogram', 'Request latency by URL name.'
+    ),
+    'admissions_http_request_db_seconds': (
+        'histogram', 'Database time per request by URL name.'
+    ),
+    'admissions_upload_bytes_total': (
+        'counter', 'Request body bytes received by URL name.'
+    ),
+    'admissions_status_transitions_total': (
+        'counter', 'Committed application status transitions.'
+    ),
+}
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# View label of requests that did not resolve to a URL pattern
+UNRESOLVED = 'unresolved'
+
+INITIAL_FILE_SIZE = 64 * 1024
+
+HEADER = struct.Struct('q')
+LENGTH = struct.Struct('i')
+VALUE = struct.Struct('d')
+
+
+def sample_key(name, labels):
+    """
+    Store key of one sample: its name and sorted label pairs as JSON.
+    """
+    return encode_key(name, tuple(sorted(labels.items())))
+
+
+@functools.lru_cache(maxsize=4096)
+def encode_key(name, labels):
+    return json.dumps([name, labels])
+
+
+def read_entries(data):
+    """
+    Yield ``(key, value, offset)`` of every entry in a store file.
+    """
+    used = HEADER.unpack_from(data, 0)[0]
+    position = HEADER.size
+    while position < used:
+        length = LENGTH.unpack_from(data, position)[0]
+        key_start = position + LENGTH.size
+        key = bytes(data[key_start:key_start + length]).decode()
+        offset = key_start + length + padding(length)
+        yield key, VALUE.unpack_from(data, offset)[0], offset
+        position = offset + VALUE.size
+
+
+def padding(length):
+    # Values start on 8-byte boundaries so each write is a single store
+    return (8 - (LENGTH.size + length) % 8) % 8
+
+
+class MemoryStore:
+    """
+    Samples of the current process, kept in a dict.
+    """
+
+    def __init__(self):
+        self.values = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def add(self, key, amount):
+        with self.lock:
+            self.values[key] += amount
+
+    def items(self):
+        with self.lock:
+            return list(self.values.items())
+
+
+class MmapStore:
+    """
+    Samples of one worker process in a memory-mapped file.
+
+    The file starts with the number of bytes in use, followed by entries
+    of a key length, the UTF-8 key, padding and a double. Entries are
+    appended and their values updated in place; readers see an entry once
+    the header includes it.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), 'r+b')
+        size = os.fstat(self.file.fileno()).st_size
+        if size < INITIAL_FILE_SIZE:
+            self.file.truncate(INITIAL_FILE_SIZE)
+            size = INITIAL_FILE_SIZE
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.used = HEADER.unpack_from(self.map, 0)[0]
+        if not self.used:
+            self.used = HEADER.size
+            HEADER.pack_into(self.map, 0, self.used)
+        self.offsets = {key: offset for key, _, offset in read_entries(self.map)}
+
+    def add(self, key, amount):
+        with self.lock:
+            offset = self.offsets.get(key)
+            if offset is None:
+                offset = self.append(key)
+            VALUE.pack_into(self.map, offset, VALUE.unpack_from(self.map, offset)[0] + amount)
+
+    def append(self, key):
+        encoded = key.encode()
+        entry = (
+            LENGTH.pack(len(encoded))
+            + encoded
+            + b'\0' * padding(len(encoded))
+            + VALUE.pack(0.0)
+        )
+        if self.used + len(entry) > len(self.map):
+            size = len(self.map)
+            while self.used + len(entry) > size:
+                size *= 2
+            self.map.close()
+            self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), size)
+        self.map[self.used:self.used + len(entry)] = entry
+        self.used += len(entry)
+        HEADER.pack_into(self.map, 0, self.used)
+        offset = self.used - VALUE.size
+        self.offsets[key] = offset
+        return offset
+
+    def items(self):
+        with self.lock:
+            return [(key, value) for key, value, _ in read_entries(self.map)]
+
+
+_store = None
+_store_owner = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Store of the current process. A new one is opened after a fork or
+    when ADMISSIONS_METRICS_DIR changes.
+    """
+    global _store, _store_owner
+    directory = getattr(settings, 'ADMISSIONS_METRICS_DIR', None)
+    owner = (os.getpid(), directory)
+    if _store_owner != owner:
+        with _store_lock:
+            if _store_owner != owner:
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                    _store = MmapStore(os.path.join(directory, f'{os.getpid()}.db'))
+                else:
+                    _store = MemoryStore()
+                _store_owner = owner
+    return _store
+
+
+def get_buckets():
+    return tuple(getattr(settings, 'ADMISSIONS_METRICS_BUCKETS', DEFAULT_BUCKETS))
+
+
+def observe(store, name, labels, value, buckets):
+    """
+    Add one histogram observation. Buckets are stored per interval and
+    made cumulative when rendered.
+    """
+    for bound in buckets:
+        if value <= bound:
+            store.add(sample_key(f'{name}_bucket', {**labels, 'le': format_value(bound)}), 1)
+            break
+    store.add(sample_key(f'{name}_sum', labels), value)
+    store.add(sample_key(f'{name}_count', labels), 1)
+
+
+def record_request(view, method, status, duration, db_seconds, body_bytes):
+    """
+    Count one finished request.
+    """
+    store = get_store()
+    buckets = get_buckets()
+    store.add(sample_key('admissions_http_requests_total', {
+        'view': view, 'method': method, 'status': str(status),
+    }), 1)
+    observe(store, 'admissions_http_request_duration_seconds', {'view': view}, duration, buckets)
+    observe(store, 'admissions_http_request_db_seconds', {'view': view}, db_seconds, buckets)
+    if body_bytes:
+        store.add(sample_key('admissions_upload_bytes_total', {'view': view}), body_bytes)
+
+
+def record_transitions(from_status, to_status, count=1):
+    """
+    Count status transitions. Call once the transaction has committed.
+    """
+    get_store().add(sample_key('admissions_status_transitions_total', {
+        'from_status': from_status, 'to_status': to_status,
+    }), count)
+
+
+def collect():
+    """
+    Sum the samples of every worker: ``{(name, labels): value}`` where
+    labels is a tuple of pairs.
+    """
+    totals = defaultdict(float)
+    directory = getattr(settings, 'ADMISSIONS_METRICS_DIR', None)
+    if directory:
+        get_store()
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith('.db'):
+                continue
+            try:
+                with open(os.path.join(directory, filename), 'rb') as store_file:
+                    data = store_file.read()
+            except FileNotFoundError:
+                continue
+            if len(data) < HEADER.size:
+                continue
+            for key, value, _ in read_entries(data):
+                totals[key] += value
+    else:
+        for key, value in get_store().items():
+            totals[key] += value
+
+    samples = {}
+    for key, value in totals.items():
+        name, labels = json.loads(key)
+        samples[name, tuple(tuple(pair) for pair in labels)] = value
+    return samples
+
+
+def format_value(value):
+    if value == int(value) and abs(value) < 1e15:
+        return f'{value:.1f}'
+    return repr(float(value))
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_sample(name, labels, value):
+    if labels:
+        label_text = ','.join(f'{key}="{escape(label)}"' for key, label in labels)
+        return f'{name}{{{label_text}}} {format_value(value)}'
+    return f'{name} {format_value(value)}'
+
+
+def render(samples=None):
+    """
+    Prometheus text exposition of the collected samples.
+    """
+    if samples is None:
+        samples = collect()
+    buckets = get_buckets()
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        if metric_type == 'counter':
+            for (sample_name, labels), value in sorted(samples.items()):
+                if sample_name == name:
+                    lines.append(format_sample(name, labels, value))
+            continue
+
+        series = sorted(
+            labels for sample_name, labels in samples if sample_name == f'{name}_count'
+        )
+        for labels in series:
+            cumulative = 0.0
+            for bound in buckets:
+                le = format_value(bound)
+                cumulative += samples.get((f'{name}_bucket', tuple(sorted(labels + (('le', le),)))), 0)
+                lines.append(format_sample(f'{name}_bucket', labels + (('le', le),), cumulative))
+            count = samples[f'{name}_count', labels]
+            lines.append(format_sample(f'{name}_bucket', labels + (('le', '+Inf'),), count))
+            lines.append(format_sample(f'{name}_sum', labels, samples.get((f'{name}_sum', labels), 0)))
+            lines.append(format_sample(f'{name}_count', labels, count))
+    return '\n'.join(lines) + '\n'
+
+
+class QueryTimer:
+    """
+    ``connection.execute_wrapper`` adding up time spent in the database.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
@@ -0,0 +1,241 @@
+"""
+Middleware for the admission application system.
+Provides a request-scoped, lazily loaded admission application,
+sampled per-request SQL and timing instrumentation, request metrics
+and on-demand request profiling.
+"""
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.http import Http404
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+
+from . import metrics
+from .instrumentation import RequestProfile, log_line, profiling, server_timing
+from .models import AdmissionApplication, ProfiledRequest
+from .profiling import StackSampler
+
+
+logger = logging.getLogger('admissions.instrumentation')
+profiling_logger = logging.getLogger('admissions.profiling')
+
+
+def get_application(request, create=False):
+    """
+    Return the current user's application, loaded at most once per
+    request and cached on it. A missing application is a 404 unless
+    ``create`` starts a draft, which only the application step views do.
+    """
+    if getattr(request, '_cached_application', None) is None:
+        request._cached_application = load_application(request.user, create)
+    if request._cached_application is None and request.user.is_authenticated:
+        raise Http404("No application found.")
+    return request._cached_application
+
+
+def load_application(user, create=False):
+    """
+    Fetch the application for a user with a single SELECT.
+    With ``create``, a missing draft is inserted in a savepoint, so a
+    concurrent first visit that wins the race is loaded instead of
+    raising IntegrityError, and the draft is counted in the statistics
+    rollup. Otherwise a missing application is None.
+    """
+    if not user.is_authenticated:
+        return None
+
+    queryset = AdmissionApplication.objects.select_related('user')
+    try:
+        return queryset.get(user=user)
+    except AdmissionApplication.DoesNotExist:
+        if not create:
+            return None
+
+    draft = AdmissionApplication(user=user)
+    try:
+        with transaction.atomic():
+            draft.save()
+    except IntegrityError:
+        return queryset.get(user=user)
+    return draft
+
+
+class ApplicationMiddleware:
+    """
+    Attach a lazy ``request.application`` accessor that raises Http404
+    for users without an application (see DraftApplicationMixin).
+    Must be placed after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.application = SimpleLazyObject(lambda: get_application(request))
+        return self.get_response(request)
+
+
+class InstrumentationMiddleware:
+    """
+    Measure requests under ADMISSIONS_INSTRUMENTATION_PATHS.
+    
+    A fraction (ADMISSIONS_INSTRUMENTATION_SAMPLE_RATE) of requests is
+    profiled: query count, DB time, duplicate and repeated statements and
+    template render time go to a Server-Timing header and an INFO log line.
+    Requests slower than their ADMISSIONS_SLOW_REQUEST_THRESHOLDS entry
+    (in ms, by URL name, falling back to 'default') log a WARNING, with
+    the captured query list when they were sampled. Place it first so
+    session and authentication queries are included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(getattr(
+            settings, 'ADMISSIONS_INSTRUMENTATION_PATHS', ['/admissions/', '/django-admin/']
+        ))
+        self.sample_rate = getattr(settings, 'ADMISSIONS_INSTRUMENTATION_SAMPLE_RATE', 0.0)
+        self.thresholds = getattr(settings, 'ADMISSIONS_SLOW_REQUEST_THRESHOLDS', {'default': 1000})
+        self.repeated_threshold = getattr(settings, 'ADMISSIONS_REPEATED_QUERY_THRESHOLD', 5)
+
+    def __call__(self, request):
+        if not request.path.startswith(self.paths):
+            return self.get_response(request)
+        
+        profile = RequestProfile() if random.random() < self.sample_rate else None
+        start = time.perf_counter()
+        if profile is None:
+            response = self.get_response(request)
+        else:
+            with profiling(profile):
+                response = self.get_response(request)
+        total = time.perf_counter() - start
+        
+        slow = total * 1000 > self.get_threshold(request)
+        if profile is None:
+            if slow:
+                logger.warning(log_line(request, response, total))
+            return response
+        
+        repeated = profile.repeated(self.repeated_threshold)
+        response['Server-Timing'] = server_timing(profile, total, repeated)
+        if slow:
+            logger.warning(log_line(request, response, total, profile, repeated, include_queries=True))
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info(log_line(request, response, total, profile, repeated))
+        return response
+    
+    def get_threshold(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.view_name in self.thresholds:
+            return self.thresholds[match.view_name]
+        return self.thresholds.get('default', 1000)
+
+
+class MetricsMiddleware:
+    """
+    Record every request in admissions.metrics: count, latency and
+    database time by resolved URL name, and request body bytes.
+    Place it first so the other middleware is included in the latency.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = metrics.QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        
+        match = getattr(request, 'resolver_match', None)
+        try:
+            body_bytes = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            body_bytes = 0
+        metrics.record_request(
+            match.view_name if match else metrics.UNRESOLVED,
+            request.method,
+            response.status_code,
+            duration,
+            timer.seconds,
+            body_bytes,
+        )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request when a staff user adds the ADMISSIONS_PROFILER_PARAM
+    query parameter (``?_profile=1``), or at random for a share
+    (ADMISSIONS_PROFILER_SAMPLE_RATE) of requests under
+    ADMISSIONS_PROFILER_PATHS. The profile is stored as a ProfiledRequest
+    and linked from the X-Profile-URL response header. Other requests
+    only pay for the checks. Must be placed after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.param = getattr(settings, 'ADMISSIONS_PROFILER_PARAM', '_profile')
+        self.sample_rate = getattr(settings, 'ADMISSIONS_PROFILER_SAMPLE_RATE', 0.0)
+        self.paths = tuple(getattr(settings, 'ADMISSIONS_PROFILER_PATHS', ['/']))
+        self.keep = getattr(settings, 'ADMISSIONS_PROFILER_KEEP', 500)
+
+    def __call__(self, request):
+        trigger = self.get_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+        
+        sampler = StackSampler().start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        
+        try:
+            profile = self.save_profile(request, response, sampler, trigger)
+        except DatabaseError:
+            profiling_logger.exception("Could not store the profile of %s", request.path)
+        else:
+            response['X-Profile-URL'] = reverse(
+                'admin:admissions_profiledrequest_change', args=[profile.pk]
+            )
+        return response
+    
+    def get_trigger(self, request):
+        if self.param in request.GET and request.user.is_staff:
+            return 'staff'
+        if self.sample_rate and request.path.startswith(self.paths):
+            if random.random() < self.sample_rate:
+                return 'sampled'
+        return None
+    
+    def save_profile(self, request, response, sampler, trigger):
+        match = getattr(request, 'resolver_match', None)
+        profile = ProfiledRequest.objects.create(
+            method=request.method,
+            path=request.get_full_path()[:2000],
+            view_name=match.view_name if match else '',
+            user=request.user if request.user.is_authenticated else None,
+            status_code=response.status_code,
+            duration_ms=round(sampler.duration * 1000, 2),
+            samples=sampler.samples,
+            interval_ms=sampler.interval * 1000,
+            trigger=trigger,
+            folded_stacks=sampler.folded(),
+        )
+        # Keep the newest ADMISSIONS_PROFILER_KEEP profiles
+        cutoff = list(
+            ProfiledRequest.objects.order_by('-pk')
+            .values_list('pk', flat=True)[self.keep:self.keep + 1]
+        )
+        if cutoff:
+            ProfiledRequest.objects.filter(pk__lte=cutoff[0]).delete()
+        return profile
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0002_bulk_review"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="admissionapplication",
+            name="admissions__registr_d0b19c_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="admissionapplication",
+            name="admissions__status_134212_idx",
+        ),
+        migrations.AddIndex(
+            model_name="admissionapplication",
+            index=models.Index(
+                fields=["status", "program_choice", "-created_at"],
+                name="admission_status_program_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="admissionapplication",
+            index=models.Index(
+                fields=["program_choice", "-created_at"], name="admission_program_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="admissionapplication",
+            index=models.Index(
+                fields=["status", "submitted_at"], name="admission_status_submit_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="admissionapplication",
+            index=models.Index(
+                condition=models.Q(("status__in", ["submitted", "under_review"])),
+                fields=["submitted_at"],
+                name="admission_review_queue_idx",
+            ),
+        ),
+    ]
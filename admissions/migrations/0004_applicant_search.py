@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:08
+
+from django.db import migrations, models
+
+from admissions.search import (
+    build_search_document,
+    install_search_index,
+    uninstall_search_index,
+)
+
+
+def populate_search_documents(apps, schema_editor):
+    AdmissionApplication = apps.get_model("admissions", "AdmissionApplication")
+    applications = AdmissionApplication.objects.using(
+        schema_editor.connection.alias
+    ).select_related("user")
+    batch = []
+    for application in applications.iterator(chunk_size=1000):
+        application.search_document = build_search_document(application)
+        batch.append(application)
+        if len(batch) == 1000:
+            AdmissionApplication.objects.bulk_update(batch, ["search_document"])
+            batch = []
+    AdmissionApplication.objects.bulk_update(batch, ["search_document"])
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0003_workload_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="admissionapplication",
+            name="search_document",
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                help_text="Lowercased registration number, names, email and course",
+            ),
+        ),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0004_applicant_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegistrationSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("intake_year", models.PositiveIntegerField(unique=True)),
+                ("next_value", models.PositiveBigIntegerField(default=1)),
+            ],
+            options={
+                "verbose_name": "Registration Sequence",
+                "verbose_name_plural": "Registration Sequences",
+            },
+        ),
+    ]
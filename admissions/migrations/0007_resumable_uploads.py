@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:18
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0006_document_processing"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadSession",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "field_name",
+                    models.CharField(
+                        choices=[
+                            ("passport_photo", "Passport Photo"),
+                            ("olevel_result", "Olevel Result"),
+                            ("birth_certificate", "Birth Certificate"),
+                            ("additional_document_1", "Additional Document 1"),
+                            ("additional_document_2", "Additional Document 2"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("filename", models.CharField(max_length=255)),
+                (
+                    "length",
+                    models.PositiveIntegerField(help_text="Total upload size in bytes"),
+                ),
+                (
+                    "offset",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Bytes received so far"
+                    ),
+                ),
+                (
+                    "checksum",
+                    models.CharField(
+                        blank=True,
+                        help_text="Optional whole-file checksum, e.g. 'sha256 <base64 digest>'",
+                        max_length=200,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("expires_at", models.DateTimeField()),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "application",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to="admissions.admissionapplication",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Upload Session",
+                "verbose_name_plural": "Upload Sessions",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("completed_at__isnull", True)),
+                        fields=["expires_at"],
+                        name="upload_session_expiry_idx",
+                    )
+                ],
+            },
+        ),
+    ]
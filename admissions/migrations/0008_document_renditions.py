@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0007_resumable_uploads"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="applicationdocument",
+            name="content_hash",
+            field=models.CharField(
+                blank=True, help_text="SHA-256 of the processed upload", max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="applicationdocument",
+            name="renditions",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Stored passport photo renditions, see admissions.renditions",
+            ),
+        ),
+    ]
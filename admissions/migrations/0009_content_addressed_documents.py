@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:29
+
+import admissions.models
+import admissions.storage
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0008_document_renditions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("size", models.PositiveBigIntegerField()),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Stored Blob",
+                "verbose_name_plural": "Stored Blobs",
+            },
+        ),
+        migrations.AlterField(
+            model_name="admissionapplication",
+            name="additional_document_1",
+            field=models.FileField(
+                blank=True,
+                help_text="Additional supporting document (optional)",
+                null=True,
+                storage=admissions.storage.document_storage,
+                upload_to=admissions.models.user_directory_path,
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        allowed_extensions=["pdf", "doc", "docx"]
+                    )
+                ],
+            ),
+        ),
+        migrations.AlterField(
+            model_name="admissionapplication",
+            name="additional_document_2",
+            field=models.FileField(
+                blank=True,
+                help_text="Additional supporting document (optional)",
+                null=True,
+                storage=admissions.storage.document_storage,
+                upload_to=admissions.models.user_directory_path,
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        allowed_extensions=["pdf", "doc", "docx"]
+                    )
+                ],
+            ),
+        ),
+        migrations.AlterField(
+            model_name="admissionapplication",
+            name="birth_certificate",
+            field=models.FileField(
+                blank=True,
+                help_text="Upload birth certificate (PDF, JPG, PNG only, max 5MB)",
+                null=True,
+                storage=admissions.storage.document_storage,
+                upload_to=admissions.models.user_directory_path,
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        allowed_extensions=["pdf", "jpg", "jpeg", "png"]
+                    )
+                ],
+            ),
+        ),
+        migrations.AlterField(
+            model_name="admissionapplication",
+            name="olevel_result",
+            field=models.FileField(
+                blank=True,
+                help_text="Upload O'Level result (PDF, JPG, PNG only, max 5MB)",
+                null=True,
+                storage=admissions.storage.document_storage,
+                upload_to=admissions.models.user_directory_path,
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        allowed_extensions=["pdf", "jpg", "jpeg", "png"]
+                    )
+                ],
+            ),
+        ),
+        migrations.AlterField(
+            model_name="admissionapplication",
+            name="passport_photo",
+            field=models.ImageField(
+                blank=True,
+                help_text="Upload passport photograph (JPG, PNG only, max 5MB)",
+                null=True,
+                storage=admissions.storage.document_storage,
+                upload_to=admissions.models.user_directory_path,
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        allowed_extensions=["jpg", "jpeg", "png"]
+                    )
+                ],
+            ),
+        ),
+    ]
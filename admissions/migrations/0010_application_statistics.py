@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:45
+
+from django.db import migrations, models
+
+from admissions.statistics import count_applications
+
+
+def populate_statistics(apps, schema_editor):
+    AdmissionApplication = apps.get_model("admissions", "AdmissionApplication")
+    ApplicationStatistic = apps.get_model("admissions", "ApplicationStatistic")
+    alias = schema_editor.connection.alias
+    counts = count_applications(AdmissionApplication.objects.using(alias))
+    ApplicationStatistic.objects.using(alias).bulk_create(
+        [
+            ApplicationStatistic(
+                intake_year=intake_year,
+                status=status,
+                program_choice=program_choice,
+                day=day,
+                count=count,
+            )
+            for (intake_year, status, program_choice, day), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0009_content_addressed_documents"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("intake_year", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "Draft"),
+                            ("submitted", "Submitted"),
+                            ("under_review", "Under Review"),
+                            ("approved", "Approved"),
+                            ("rejected", "Rejected"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "program_choice",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("undergraduate", "Undergraduate"),
+                            ("postgraduate", "Postgraduate"),
+                            ("diploma", "Diploma"),
+                            ("certificate", "Certificate"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Application Statistic",
+                "verbose_name_plural": "Application Statistics",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("intake_year", "status", "program_choice", "day"),
+                        name="application_statistic_bucket",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_statistics, migrations.RunPython.noop),
+    ]
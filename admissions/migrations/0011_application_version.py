@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0010_application_statistics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="admissionapplication",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0011_application_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfiledRequest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("method", models.CharField(max_length=10)),
+                ("path", models.CharField(max_length=2000)),
+                ("view_name", models.CharField(blank=True, max_length=200)),
+                ("status_code", models.PositiveSmallIntegerField()),
+                ("duration_ms", models.FloatField()),
+                ("samples", models.PositiveIntegerField()),
+                ("interval_ms", models.FloatField()),
+                (
+                    "trigger",
+                    models.CharField(
+                        choices=[
+                            ("staff", "Requested by staff"),
+                            ("sampled", "Sampled"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("folded_stacks", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="profiled_requests",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Request Profile",
+                "verbose_name_plural": "Request Profiles",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0012_request_profiles"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApiToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="System using the token", max_length=100
+                    ),
+                ),
+                ("key_prefix", models.CharField(editable=False, max_length=8)),
+                (
+                    "key_hash",
+                    models.CharField(editable=False, max_length=64, unique=True),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "last_used_at",
+                    models.DateTimeField(blank=True, editable=False, null=True),
+                ),
+            ],
+            options={
+                "verbose_name": "API Token",
+                "verbose_name_plural": "API Tokens",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="admissionapplication",
+            index=models.Index(fields=["updated_at", "id"], name="admission_sync_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="admissionapplication",
+            index=models.Index(
+                fields=["status", "updated_at", "id"], name="admission_status_sync_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="admissionapplication",
+            index=models.Index(
+                fields=["program_choice", "updated_at", "id"],
+                name="admission_program_sync_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="apitoken",
+            name="created_by",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="admission_api_tokens",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
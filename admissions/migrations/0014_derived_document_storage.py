@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:43
+
+import admissions.models
+import admissions.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0013_read_api"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="applicationdocument",
+            name="preview",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=admissions.storage.document_storage,
+                upload_to=admissions.models.processed_document_path,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="applicationdocument",
+            name="thumbnail",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=admissions.storage.document_storage,
+                upload_to=admissions.models.processed_document_path,
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:00
+
+from django.db import migrations
+
+from admissions.statistics import count_applications
+
+
+def regroup_drafts(apps, schema_editor):
+    """
+    Drafts are now counted without their program; rebuild their buckets.
+    """
+    AdmissionApplication = apps.get_model("admissions", "AdmissionApplication")
+    ApplicationStatistic = apps.get_model("admissions", "ApplicationStatistic")
+    alias = schema_editor.connection.alias
+    ApplicationStatistic.objects.using(alias).filter(status="draft").delete()
+    counts = count_applications(
+        AdmissionApplication.objects.using(alias).filter(status="draft")
+    )
+    ApplicationStatistic.objects.using(alias).bulk_create(
+        [
+            ApplicationStatistic(
+                intake_year=intake_year,
+                status=status,
+                program_choice=program_choice,
+                day=day,
+                count=count,
+            )
+            for (intake_year, status, program_choice, day), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0014_derived_document_storage"),
+    ]
+
+    operations = [
+        migrations.RunPython(regroup_drafts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:15
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0015_draft_statistics_without_program"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="admissionapplication",
+            name="admission_review_queue_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="admissionapplication",
+            name="admission_status_sync_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="admissionapplication",
+            name="admission_program_sync_idx",
+        ),
+        migrations.RenameIndex(
+            model_name="admissionapplication",
+            new_name="admission_review_queue_idx",
+            old_name="admission_status_submit_idx",
+        ),
+    ]
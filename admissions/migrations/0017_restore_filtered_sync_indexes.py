@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admissions", "0016_prune_overlapping_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="admissionapplication",
+            index=models.Index(
+                fields=["status", "updated_at", "id"], name="admission_status_sync_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="admissionapplication",
+            index=models.Index(
+                fields=["program_choice", "updated_at", "id"],
+                name="admission_program_sync_idx",
+            ),
+        ),
+    ]
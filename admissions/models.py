@@ -2,22 +2,82 @@
 Models for the admission application system.
 Handles application data, file uploads, and approval workflow.
 """
+import functools
+import operator
 import os
 import uuid
-from django.db import models
+from collections import Counter
+from functools import reduce
+from django.db import models, transaction
+from django.db.models.functions import Cast, Coalesce
 from django.conf import settings
 from django.core.validators import FileExtensionValidator
 from django.utils import timezone
 
+from . import metrics
+from .jobs import enqueue, heartbeat, task
+from .registration import registration_numbers
+from .search import build_search_document
+from .signals import applications_reviewed
+from . import statistics
+from .storage import discard_rolled_back, document_storage, is_blob_name
+
+
+# Statuses an application can be approved or rejected from
+REVIEWABLE_STATUSES = ['submitted', 'under_review']
+
+# Allowed status transitions; decisions can only be reopened for review
+STATUS_TRANSITIONS = {
+    'draft': {'submitted'},
+    'submitted': {'under_review', 'approved', 'rejected'},
+    'under_review': {'approved', 'rejected'},
+    'approved': {'under_review'},
+    'rejected': {'under_review'},
+}
+
+# Derived fields that may be saved without a version check
+UNVERSIONED_FIELDS = {'search_document'}
+
+# File fields holding applicant documents
+DOCUMENT_FIELDS = [
+    'passport_photo',
+    'olevel_result',
+    'birth_certificate',
+    'additional_document_1',
+    'additional_document_2',
+]
+
+# Boolean fields tracking the application steps
+STEP_FIELDS = [
+    'personal_info_completed',
+    'program_info_completed',
+    'documents_uploaded',
+]
+
+
+class InvalidTransitionError(Exception):
+    """
+    A status change not allowed by STATUS_TRANSITIONS.
+    """
+    
+    def __init__(self, from_status, to_status):
+        self.from_status = from_status
+        self.to_status = to_status
+        super().__init__(f"Cannot change status from {from_status} to {to_status}.")
+
+
+class ConcurrentUpdateError(Exception):
+    """
+    The application was changed by someone else since it was loaded.
+    """
+
 
 def generate_registration_number():
     """
     Generate a unique registration number for each application.
-    Format: YEAR-RANDOM_UUID
+    Format: ADMISSIONS_REGISTRATION_NUMBER_FORMAT, e.g. 2026-000123-3
     """
-    year = timezone.now().year
-    unique_id = str(uuid.uuid4().hex[:8]).upper()
-    return f"{year}-{unique_id}"
+    return registration_numbers.allocate()
 
 
 def user_directory_path(instance, filename):
@@ -29,6 +89,118 @@ def user_directory_path(instance, filename):
     return os.path.join('uploads', f'user_{instance.user.id}', filename)
 
 
+class AdmissionApplicationQuerySet(models.QuerySet):
+    """
+    Set-based operations on admission applications.
+    """
+    
+    def review_queue(self):
+        """
+        Applications awaiting a decision, oldest submission first.
+        Served by admission_review_queue_idx on (status, submitted_at); the
+        submitted_at condition, true of every reviewable application, lets
+        planners without statistics prefer it over other status indexes.
+        """
+        return self.filter(
+            status__in=REVIEWABLE_STATUSES, submitted_at__isnull=False
+        ).order_by('submitted_at')
+    
+    def with_completion_percentage(self):
+        """
+        Annotate ``completion_percentage`` computed in SQL from the step flags.
+        Matches get_completion_percentage(): 0, 33, 66 or 100.
+        """
+        steps_completed = reduce(operator.add, [
+            Cast(field, models.IntegerField())
+            for field in STEP_FIELDS
+        ])
+        return self.annotate(
+            completion_percentage=models.ExpressionWrapper(
+                steps_completed * 100 / len(STEP_FIELDS),
+                output_field=models.IntegerField(),
+            )
+        )
+    
+    def bulk_review(self, status, admin_user, notes='', from_statuses=None,
+                    chunk_size=None):
+        """
+        Move matching applications to ``status`` with chunked UPDATEs.
+        
+        Only rows currently in ``from_statuses`` are changed. Each chunk is a
+        single UPDATE plus one bulk INSERT of status change records, and
+        ``applications_reviewed`` is sent once per chunk for notifications.
+        Returns the number of applications updated.
+        """
+        if from_statuses is None:
+            from_statuses = REVIEWABLE_STATUSES
+        from_statuses = [
+            from_status for from_status in from_statuses
+            if status in STATUS_TRANSITIONS[from_status]
+        ]
+        if chunk_size is None:
+            chunk_size = getattr(settings, 'ADMISSIONS_BULK_REVIEW_CHUNK_SIZE', 500)
+        
+        pks = list(
+            self.filter(status__in=from_statuses)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        updated = 0
+        
+        for start in range(0, len(pks), chunk_size):
+            chunk = pks[start:start + chunk_size]
+            now = timezone.now()
+            
+            with transaction.atomic():
+                rows = list(
+                    self.model.objects.select_for_update()
+                    .filter(pk__in=chunk, status__in=from_statuses)
+                    .values_list('pk', 'status', 'program_choice', 'created_at')
+                )
+                changed = [row[0] for row in rows]
+                values = {
+                    'status': status,
+                    'reviewed_by': admin_user,
+                    'reviewed_at': now,
+                    'updated_at': now,
+                    'version': models.F('version') + 1,
+                }
+                # Keep earlier reviewer notes unless new ones are given
+                if notes:
+                    values['review_notes'] = notes
+                count = self.model.objects.filter(pk__in=changed).update(**values)
+                ApplicationStatusChange.objects.bulk_create([
+                    ApplicationStatusChange(
+                        application_id=pk,
+                        from_status=from_status,
+                        to_status=status,
+                        changed_by=admin_user,
+                        notes=notes,
+                    )
+                    for pk, from_status, _, _ in rows
+                ])
+                deltas = Counter()
+                for _, from_status, program_choice, created_at in rows:
+                    deltas[statistics.rollup_key(from_status, program_choice, created_at)] -= 1
+                    deltas[statistics.rollup_key(status, program_choice, created_at)] += 1
+                statistics.apply_deltas(deltas)
+                for from_status, transitions in Counter(row[1] for row in rows).items():
+                    transaction.on_commit(functools.partial(
+                        metrics.record_transitions, from_status, status, transitions
+                    ))
+            
+            updated += count
+            if changed:
+                applications_reviewed.send(
+                    sender=self.model,
+                    application_ids=changed,
+                    status=status,
+                    reviewed_by=admin_user,
+                )
+        
+        return updated
+
+
 class AdmissionApplication(models.Model):
     """
     Main admission application model.
@@ -141,6 +313,7 @@ class AdmissionApplication(models.Model):
     # File Uploads
     passport_photo = models.ImageField(
         upload_to=user_directory_path,
+        storage=document_storage,
         validators=[FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png'])],
         null=True,
         blank=True,
@@ -149,6 +322,7 @@ class AdmissionApplication(models.Model):
     
     olevel_result = models.FileField(
         upload_to=user_directory_path,
+        storage=document_storage,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'jpeg', 'png'])],
         null=True,
         blank=True,
@@ -157,6 +331,7 @@ class AdmissionApplication(models.Model):
     
     birth_certificate = models.FileField(
         upload_to=user_directory_path,
+        storage=document_storage,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'jpeg', 'png'])],
         null=True,
         blank=True,
@@ -166,6 +341,7 @@ class AdmissionApplication(models.Model):
     # Additional Documents (for extensibility)
     additional_document_1 = models.FileField(
         upload_to=user_directory_path,
+        storage=document_storage,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx'])],
         null=True,
         blank=True,
@@ -174,6 +350,7 @@ class AdmissionApplication(models.Model):
     
     additional_document_2 = models.FileField(
         upload_to=user_directory_path,
+        storage=document_storage,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx'])],
         null=True,
         blank=True,
@@ -226,19 +403,203 @@ class AdmissionApplication(models.Model):
         help_text="Date and time when application was submitted"
     )
     
+    # Incremented by every save; saves compare-and-swap on it
+    version = models.PositiveIntegerField(default=1, editable=False)
+    
+    # Denormalized applicant search text, see admissions.search
+    search_document = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Lowercased registration number, names, email and course"
+    )
+    
+    objects = AdmissionApplicationQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Admission Application"
         verbose_name_plural = "Admission Applications"
         ordering = ['-created_at']
+        # registration_number and user already have unique indexes.
         indexes = [
-            models.Index(fields=['registration_number']),
-            models.Index(fields=['status']),
+            # Default changelist ordering
             models.Index(fields=['-created_at']),
+            # Status / program list filters, newest first
+            models.Index(
+                fields=['status', 'program_choice', '-created_at'],
+                name='admission_status_program_idx',
+            ),
+            models.Index(
+                fields=['program_choice', '-created_at'],
+                name='admission_program_idx',
+            ),
+            # Review queue (pending applications, oldest submission first)
+            # and the status + submitted_at date filter
+            models.Index(
+                fields=['status', 'submitted_at'],
+                name='admission_review_queue_idx',
+            ),
+            # Keyset pages of the read API, unfiltered and filtered by
+            # status or program
+            models.Index(
+                fields=['updated_at', 'id'],
+                name='admission_sync_idx',
+            ),
+            models.Index(
+                fields=['status', 'updated_at', 'id'],
+                name='admission_status_sync_idx',
+            ),
+            models.Index(
+                fields=['program_choice', 'updated_at', 'id'],
+                name='admission_program_sync_idx',
+            ),
         ]
     
     def __str__(self):
         return f"{self.registration_number} - {self.user.get_full_name()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_documents = {
+            field: getattr(instance, field).name
+            for field in DOCUMENT_FIELDS
+            if field in instance.__dict__
+        }
+        instance._rollup_key = statistics.application_key(instance)
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """
+        Keep the search document current on every save, move the
+        application between statistics buckets, and release stored
+        documents that were replaced.
+        
+        Updates only succeed if the row still has the ``version`` this
+        instance holds, and raise ConcurrentUpdateError otherwise.
+        """
+        self.refresh_search_document()
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        versioned = not adding and 'version' in self.__dict__ and (
+            update_fields is None or not UNVERSIONED_FIELDS.issuperset(update_fields)
+        )
+        if update_fields is not None:
+            extra_fields = {'search_document', 'updated_at', 'version'} if versioned else {'search_document'}
+            kwargs['update_fields'] = {*update_fields, *extra_fields}
+        
+        # Only creation and status or program changes move the application
+        # between statistics buckets
+        previous_key = None if adding else getattr(self, '_rollup_key', None)
+        rollup_saved = adding or update_fields is None or not {'status', 'program_choice'}.isdisjoint(update_fields)
+        # Instances loaded without their rollup fields read the stored bucket
+        lookup = rollup_saved and not adding and previous_key is None
+        moves = lookup or (
+            rollup_saved and (adding or statistics.application_key(self) != previous_key)
+        )
+        # New files are stored while saving; a failed save rolls back their
+        # blob references and leaves the files to discard
+        pending = [
+            field for field in DOCUMENT_FIELDS
+            if (update_fields is None or field in update_fields)
+            and field in self.__dict__
+            and not getattr(self, field)._committed
+        ]
+        if versioned:
+            self._expected_version = self.version
+            self.version += 1
+        try:
+            if moves or pending:
+                with transaction.atomic():
+                    if lookup:
+                        previous_key = statistics.stored_key(self)
+                    super().save(*args, **kwargs)
+                    if moves:
+                        self._rollup_key = statistics.current_key(self)
+                        statistics.move(previous_key, self._rollup_key)
+            else:
+                super().save(*args, **kwargs)
+        except BaseException as error:
+            if versioned:
+                self.version = self._expected_version
+            self.discard_unsaved_documents(pending)
+            # A lost compare-and-swap ran no failing SQL, so an enclosing
+            # transaction stays usable for re-rendering the form
+            if (
+                isinstance(error, ConcurrentUpdateError)
+                and not (moves or pending)
+                and transaction.get_connection(self._state.db).in_atomic_block
+            ):
+                transaction.set_rollback(False, using=self._state.db)
+            raise
+        finally:
+            self._expected_version = None
+        
+        stored = getattr(self, '_stored_documents', {})
+        for field in DOCUMENT_FIELDS:
+            if update_fields is not None and field not in update_fields:
+                continue
+            previous, current = stored.get(field), getattr(self, field).name
+            if is_blob_name(previous) and previous != current:
+                self._meta.get_field(field).storage.delete(previous)
+            stored[field] = current
+        self._stored_documents = stored
+    
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        """
+        Compare-and-swap: UPDATE ... WHERE id = %s AND version = %s.
+        """
+        expected = getattr(self, '_expected_version', None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        if super()._do_update(
+            base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update
+        ):
+            return True
+        raise ConcurrentUpdateError(
+            f"Application {self.registration_number} was changed by someone else. "
+            "Reload it and try again."
+        )
+    
+    def discard_unsaved_documents(self, fields):
+        """
+        After a failed save, remove the files it stored for ``fields``
+        and point the fields back at the saved documents.
+        """
+        stored = getattr(self, '_stored_documents', {})
+        for field in fields:
+            upload = getattr(self, field)
+            if upload._committed and upload.name != stored.get(field):
+                discard_rolled_back(upload.storage, upload.name)
+                upload.name = stored.get(field)
+    
+    def release_documents(self):
+        """
+        Drop this application's references to its stored documents.
+        """
+        for field in DOCUMENT_FIELDS:
+            upload = getattr(self, field)
+            if is_blob_name(upload.name):
+                upload.storage.delete(upload.name)
+    
+    def get_document_names(self):
+        """
+        Stored names of this application's documents and of the
+        thumbnails, previews and renditions derived from them.
+        """
+        names = {getattr(self, field).name for field in DOCUMENT_FIELDS}
+        for document in self.documents.all():
+            names.update([document.thumbnail.name, document.preview.name])
+            names.update(rendition['name'] for rendition in document.renditions.values())
+        names.discard(None)
+        names.discard('')
+        return names
+    
+    def refresh_search_document(self):
+        """
+        Rebuild the denormalized search text from the application and user.
+        """
+        self.search_document = build_search_document(self)
+    
     def get_completion_percentage(self):
         """
         Calculate application completion percentage.
@@ -273,9 +634,7 @@ class AdmissionApplication(models.Model):
         Submit the application for review.
         """
         if self.can_submit():
-            self.status = 'submitted'
-            self.submitted_at = timezone.now()
-            self.save()
+            self.transition('submitted', self.user, submitted_at=timezone.now())
             return True
         return False
     
@@ -283,21 +642,73 @@ class AdmissionApplication(models.Model):
         """
         Approve the application.
         """
-        self.status = 'approved'
-        self.reviewed_by = admin_user
-        self.review_notes = notes
-        self.reviewed_at = timezone.now()
-        self.save()
+        self.transition(
+            'approved',
+            admin_user,
+            notes,
+            reviewed_by=admin_user,
+            review_notes=notes,
+            reviewed_at=timezone.now(),
+        )
     
     def reject(self, admin_user, notes=''):
         """
         Reject the application.
         """
-        self.status = 'rejected'
-        self.reviewed_by = admin_user
-        self.review_notes = notes
-        self.reviewed_at = timezone.now()
-        self.save()
+        self.transition(
+            'rejected',
+            admin_user,
+            notes,
+            reviewed_by=admin_user,
+            review_notes=notes,
+            reviewed_at=timezone.now(),
+        )
+    
+    def can_transition(self, status):
+        """
+        Check if the state machine allows moving to ``status``.
+        """
+        return status in STATUS_TRANSITIONS.get(self.status, ())
+    
+    def transition(self, status, changed_by=None, notes='', **changes):
+        """
+        Move to ``status`` and set ``changes``, saving only those columns
+        together with an audit record. Raises InvalidTransitionError for
+        transitions the state machine does not allow and
+        ConcurrentUpdateError if the row changed since it was loaded;
+        the instance is left unchanged in both cases.
+        """
+        if not self.can_transition(status):
+            raise InvalidTransitionError(self.status, status)
+        
+        state = self.__dict__.copy()
+        from_status = self.status
+        self.status = status
+        for field, value in changes.items():
+            setattr(self, field, value)
+        try:
+            with transaction.atomic():
+                self.save(update_fields=['status', *changes])
+                self.record_status_change(from_status, changed_by, notes)
+        except BaseException:
+            self.__dict__.update(state)
+            raise
+    
+    def record_status_change(self, from_status, changed_by=None, notes=''):
+        """
+        Add an audit record for a transition to the current status.
+        The transition is counted in the metrics once it commits.
+        """
+        transaction.on_commit(functools.partial(
+            metrics.record_transitions, from_status, self.status
+        ))
+        return ApplicationStatusChange.objects.create(
+            application=self,
+            from_status=from_status,
+            to_status=self.status,
+            changed_by=changed_by,
+            notes=notes,
+        )
     
     def get_status_badge_class(self):
         """
@@ -310,4 +721,504 @@ class AdmissionApplication(models.Model):
             'approved': 'success',
             'rejected': 'danger',
         }
-        return status_classes.get(self.status, 'secondary')
\ No newline at end of file
+        return status_classes.get(self.status, 'secondary')
+
+
+class RegistrationSequence(models.Model):
+    """
+    Next unleased registration sequence value for each intake year.
+    Values are leased in blocks by admissions.registration.
+    """
+    
+    intake_year = models.PositiveIntegerField(unique=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+    
+    class Meta:
+        verbose_name = "Registration Sequence"
+        verbose_name_plural = "Registration Sequences"
+    
+    def __str__(self):
+        return f"{self.intake_year}: {self.next_value}"
+
+
+class ApplicationStatusChange(models.Model):
+    """
+    Audit trail of application status transitions.
+    """
+    
+    application = models.ForeignKey(
+        AdmissionApplication,
+        on_delete=models.CASCADE,
+        related_name='status_changes'
+    )
+    
+    from_status = models.CharField(
+        max_length=20,
+        choices=AdmissionApplication.STATUS_CHOICES
+    )
+    
+    to_status = models.CharField(
+        max_length=20,
+        choices=AdmissionApplication.STATUS_CHOICES
+    )
+    
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='application_status_changes',
+        help_text="User who made the change"
+    )
+    
+    notes = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Application Status Change"
+        verbose_name_plural = "Application Status Changes"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.application_id}: {self.from_status} -> {self.to_status}"
+
+
+class BulkReviewJob(models.Model):
+    """
+    Background job for bulk approve/reject of large admin selections.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    target_status = models.CharField(
+        max_length=20,
+        choices=AdmissionApplication.STATUS_CHOICES,
+        help_text="Status applied to the selected applications"
+    )
+    
+    from_statuses = models.JSONField(default=list)
+    
+    notes = models.TextField(blank=True)
+    
+    application_ids = models.JSONField(
+        default=list,
+        help_text="Primary keys of the selected applications"
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='bulk_review_jobs'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Bulk Review Job"
+        verbose_name_plural = "Bulk Review Jobs"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.get_target_status_display()} {self.total} application(s)"
+    
+    def get_progress_percentage(self):
+        """
+        Calculate job progress percentage.
+        """
+        if not self.total:
+            return 100 if self.status == 'completed' else 0
+        return int((self.processed / self.total) * 100)
+    
+    def start(self):
+        """
+        Queue the job for the background workers (``manage.py process_jobs``).
+        """
+        return enqueue('admissions.run_bulk_review', job_id=self.pk)
+    
+    def run(self):
+        """
+        Apply the bulk review chunk by chunk, recording progress as it goes.
+        A run after an interruption carries on after the processed applications.
+        """
+        jobs = BulkReviewJob.objects.filter(pk=self.pk)
+        now = timezone.now()
+        self.status = 'running'
+        jobs.update(status='running', error='', started_at=Coalesce('started_at', now))
+        chunk_size = getattr(settings, 'ADMISSIONS_BULK_REVIEW_CHUNK_SIZE', 500)
+        
+        try:
+            for start in range(self.processed, len(self.application_ids), chunk_size):
+                ids = self.application_ids[start:start + chunk_size]
+                # A chunk that committed before an interruption recorded its
+                # progress matches no rows the second time
+                self.updated += AdmissionApplication.objects.filter(
+                    pk__in=ids
+                ).bulk_review(
+                    self.target_status,
+                    self.created_by,
+                    self.notes,
+                    from_statuses=self.from_statuses or None,
+                    chunk_size=chunk_size,
+                )
+                self.processed = start + len(ids)
+                jobs.update(processed=self.processed, updated=self.updated)
+                heartbeat()
+        except Exception as exc:
+            self.status = 'failed'
+            jobs.update(status='failed', error=str(exc), finished_at=timezone.now())
+            raise
+        
+        self.status = 'completed'
+        jobs.update(status='completed', finished_at=timezone.now())
+
+
+@task('admissions.run_bulk_review')
+def run_bulk_review(job_id):
+    """
+    Run a BulkReviewJob, resuming from its recorded progress.
+    """
+    try:
+        job = BulkReviewJob.objects.get(pk=job_id)
+    except BulkReviewJob.DoesNotExist:
+        return {'skipped': 'job deleted'}
+    if job.status == 'completed':
+        return {'skipped': 'already completed'}
+    job.run()
+    return {'processed': job.processed, 'updated': job.updated}
+
+
+def processed_document_path(instance, filename):
+    """
+    Derived file path: processed/user_<id>/<filename>
+    """
+    return os.path.join('processed', f'user_{instance.application.user_id}', filename)
+
+
+class ApplicationDocument(models.Model):
+    """
+    Processing results for one uploaded document of an application.
+    Filled in by the admissions.process_document background task.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('valid', 'Valid'),
+        ('invalid', 'Invalid'),
+    ]
+    
+    application = models.ForeignKey(
+        AdmissionApplication,
+        on_delete=models.CASCADE,
+        related_name='documents'
+    )
+    
+    field_name = models.CharField(
+        max_length=50,
+        choices=[(field, field.replace('_', ' ').title()) for field in DOCUMENT_FIELDS]
+    )
+    
+    source_name = models.CharField(
+        max_length=255,
+        help_text="Stored name of the processed upload"
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveIntegerField(null=True, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    
+    thumbnail = models.ImageField(
+        upload_to=processed_document_path,
+        storage=document_storage,
+        null=True,
+        blank=True
+    )
+    
+    preview = models.ImageField(
+        upload_to=processed_document_path,
+        storage=document_storage,
+        null=True,
+        blank=True
+    )
+    
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the processed upload"
+    )
+    
+    renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Stored passport photo renditions, see admissions.renditions"
+    )
+    
+    error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Application Document"
+        verbose_name_plural = "Application Documents"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['application', 'field_name'],
+                name='unique_application_document',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.application_id}: {self.field_name} ({self.status})"
+
+
+class BackgroundJob(models.Model):
+    """
+    A queued unit of background work, see admissions.jobs.
+    """
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    task_name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='queued'
+    )
+    
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Background Job"
+        verbose_name_plural = "Background Jobs"
+        ordering = ['-created_at']
+        indexes = [
+            # Workers poll for due and stale jobs
+            models.Index(
+                fields=['status', 'run_after'],
+                name='background_job_due_idx',
+            ),
+            models.Index(
+                fields=['status', 'locked_at'],
+                name='background_job_stale_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.task_name} #{self.pk} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """
+    An in-progress resumable upload of one application document.
+    Bytes up to ``offset`` are safely on disk; see admissions.uploads.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    
+    application = models.ForeignKey(
+        AdmissionApplication,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    
+    field_name = models.CharField(
+        max_length=50,
+        choices=[(field, field.replace('_', ' ').title()) for field in DOCUMENT_FIELDS]
+    )
+    
+    filename = models.CharField(max_length=255)
+    length = models.PositiveIntegerField(help_text="Total upload size in bytes")
+    offset = models.PositiveIntegerField(default=0, help_text="Bytes received so far")
+    checksum = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Optional whole-file checksum, e.g. 'sha256 <base64 digest>'"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Upload Session"
+        verbose_name_plural = "Upload Sessions"
+        indexes = [
+            models.Index(
+                fields=['expires_at'],
+                name='upload_session_expiry_idx',
+                condition=models.Q(completed_at__isnull=True),
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.field_name} upload {self.pk} ({self.offset}/{self.length})"
+    
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
+
+
+class StoredBlob(models.Model):
+    """
+    Reference count for one content-addressed document blob,
+    see admissions.storage.
+    """
+    
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Stored Blob"
+        verbose_name_plural = "Stored Blobs"
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+
+
+class ApplicationStatistic(models.Model):
+    """
+    Number of applications per intake year, status, program and the day
+    they were started. Maintained transactionally by admissions.statistics.
+    """
+    
+    intake_year = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=AdmissionApplication.STATUS_CHOICES)
+    program_choice = models.CharField(
+        max_length=50,
+        choices=AdmissionApplication.PROGRAM_CHOICES,
+        blank=True,
+    )
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Application Statistic"
+        verbose_name_plural = "Application Statistics"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['intake_year', 'status', 'program_choice', 'day'],
+                name='application_statistic_bucket',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.intake_year} {self.status} {self.program_choice or '-'} {self.day}: {self.count}"
+
+
+class ProfiledRequest(models.Model):
+    """
+    Call profile of one request as folded stacks, see admissions.profiling.
+    """
+    
+    TRIGGER_CHOICES = [
+        ('staff', 'Requested by staff'),
+        ('sampled', 'Sampled'),
+    ]
+    
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2000)
+    view_name = models.CharField(max_length=200, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='profiled_requests'
+    )
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    samples = models.PositiveIntegerField()
+    interval_ms = models.FloatField()
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    folded_stacks = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Request Profile"
+        verbose_name_plural = "Request Profiles"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class ApiToken(models.Model):
+    """
+    Credential of a system using the read API, see admissions.api.
+    Only a hash of the key is stored; the key is shown once on creation.
+    """
+    
+    name = models.CharField(max_length=100, help_text="System using the token")
+    key_prefix = models.CharField(max_length=8, editable=False)
+    key_hash = models.CharField(max_length=64, unique=True, editable=False)
+    is_active = models.BooleanField(default=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='admission_api_tokens'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    class Meta:
+        verbose_name = "API Token"
+        verbose_name_plural = "API Tokens"
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.key_prefix}…)"
@@ -0,0 +1,139 @@
+"""
+Statistical profiler for single requests.
+
+While a request is profiled, a background thread samples the request
+thread's Python stack every ADMISSIONS_PROFILER_INTERVAL seconds with
+``sys._current_frames()``. Only frames below the caller of ``start()``
+are kept, so the server and outer middleware are left out. Identical
+stacks are counted and stored as folded stacks, one line of
+``frame;frame;frame count`` per stack, which flamegraph.pl, inferno and
+speedscope read directly.
+
+Nothing is installed for requests that are not profiled.
+"""
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+
+# Shortest interval; the sampler needs the GIL to take a sample
+MIN_INTERVAL = 0.001
+
+STDLIB_DIR = sysconfig.get_paths()['stdlib']
+
+
+def frame_label(code):
+    """
+    ``function (path:line)`` of a code object, with paths shortened to the
+    project, the installed package or the standard library.
+    """
+    filename = code.co_filename
+    base_dir = str(getattr(settings, 'BASE_DIR', ''))
+    if base_dir and filename.startswith(base_dir + os.sep):
+        filename = filename[len(base_dir) + 1:]
+    elif 'site-packages' + os.sep in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    elif filename.startswith(STDLIB_DIR + os.sep):
+        filename = filename[len(STDLIB_DIR) + 1:]
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f'{name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+
+
+class StackSampler:
+    """
+    Sample the calling thread's stack until ``stop()`` is called.
+    """
+
+    def __init__(self, interval=None):
+        if interval is None:
+            interval = getattr(settings, 'ADMISSIONS_PROFILER_INTERVAL', 0.005)
+        self.interval = max(interval, MIN_INTERVAL)
+        self.stacks = Counter()
+        self.labels = {}
+        self.stopped = threading.Event()
+        self.thread = None
+        self.thread_id = None
+        self.root = None
+        self.started = None
+        self.duration = None
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.root = sys._getframe(1)
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name='admissions-profiler', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.duration = time.perf_counter() - self.started
+        self.thread.join()
+        return self
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None and frame is not self.root:
+            code = frame.f_code
+            label = self.labels.get(code)
+            if label is None:
+                label = self.labels[code] = frame_label(code)
+            stack.append(label)
+            frame = frame.f_back
+        if frame is None or self.stopped.is_set():
+            # The thread has returned past the profiled call or is in stop()
+            return
+        if stack:
+            self.stacks[tuple(reversed(stack))] += 1
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def folded(self):
+        """
+        Folded stacks, one ``frame;frame count`` line per distinct stack.
+        """
+        return ''.join(
+            f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.stacks.items())
+        )
+
+
+def parse_folded(folded):
+    """
+    Return ``[(stack tuple, count)]`` from folded stack text.
+    """
+    stacks = []
+    for line in folded.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if stack and count.isdigit():
+            stacks.append((tuple(stack.split(';')), int(count)))
+    return stacks
+
+
+def hot_functions(folded, limit=30):
+    """
+    Functions with the most samples: ``[(label, self, total)]`` where
+    ``self`` counts samples in the function itself and ``total`` also
+    those in functions it called, ordered by self samples.
+    """
+    own = Counter()
+    total = Counter()
+    for stack, count in parse_folded(folded):
+        own[stack[-1]] += count
+        for label in set(stack):
+            total[label] += count
+    return [
+        (label, own[label], total[label])
+        for label in sorted(total, key=lambda label: (-own[label], -total[label], label))[:limit]
+    ]
@@ -0,0 +1,219 @@
+"""
+Registration number allocation.
+
+Numbers come from per-intake-year sequences that are leased from the
+database in blocks (ADMISSIONS_REGISTRATION_BLOCK_SIZE at a time) and
+handed out from memory, so allocating a number normally costs no query
+and can never collide.
+
+A block leased inside an outer transaction only becomes shared once that
+transaction commits; until then only the leasing thread may use it, and
+it is dropped if the transaction (or savepoint) rolls back.
+"""
+import re
+import string
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+DEFAULT_FORMAT = '{year}-{sequence:06d}-{check}'
+DEFAULT_BLOCK_SIZE = 100
+
+
+def luhn_check_digit(digits):
+    """
+    Return the Luhn check digit for a string of digits.
+    """
+    total = 0
+    for position, digit in enumerate(reversed(digits)):
+        value = int(digit)
+        if position % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return str((10 - total % 10) % 10)
+
+
+def format_registration_number(year, sequence):
+    """
+    Render a registration number using ADMISSIONS_REGISTRATION_NUMBER_FORMAT.
+    The format may use ``year``, ``sequence`` and ``check``; the check digit
+    covers the digits printed before it, padding included.
+    """
+    number_format = getattr(settings, 'ADMISSIONS_REGISTRATION_NUMBER_FORMAT', DEFAULT_FORMAT)
+    printed = number_format.format(year=year, sequence=sequence, check='')
+    return number_format.format(
+        year=year,
+        sequence=sequence,
+        check=luhn_check_digit(''.join(char for char in printed if char.isdigit())),
+    )
+
+
+def is_valid_registration_number(number):
+    """
+    Whether ``number`` is a complete registration number in the configured
+    format with a correct check digit.
+    """
+    number_format = getattr(settings, 'ADMISSIONS_REGISTRATION_NUMBER_FORMAT', DEFAULT_FORMAT)
+    fields = {'year': r'\d{4}', 'sequence': r'\d+', 'check': r'\d'}
+    pattern = ''.join(
+        re.escape(literal) + (fields[field] if field else '')
+        for literal, field, _, _ in string.Formatter().parse(number_format)
+    )
+    if not re.fullmatch(pattern, number):
+        return False
+    digits = ''.join(char for char in number if char.isdigit())
+    return luhn_check_digit(digits[:-1]) == digits[-1]
+
+
+class Block:
+    """
+    A leased, half-open range of sequence values.
+    """
+
+    def __init__(self, start, end):
+        self.next = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.next
+
+    def take(self, count):
+        count = min(count, len(self))
+        start = self.next
+        self.next += count
+        return range(start, start + count)
+
+
+class RegistrationNumberAllocator:
+    """
+    Hands out registration numbers from leased sequence blocks.
+    """
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._blocks = {}
+        self._local = threading.local()
+
+    def get_block_size(self):
+        if self.block_size is not None:
+            return self.block_size
+        return getattr(settings, 'ADMISSIONS_REGISTRATION_BLOCK_SIZE', DEFAULT_BLOCK_SIZE)
+
+    def allocate(self, year=None):
+        """
+        Return the next registration number for an intake year.
+        """
+        return self.allocate_many(1, year)[0]
+
+    def allocate_many(self, count, year=None):
+        """
+        Return ``count`` registration numbers, e.g. for bulk_create imports.
+        Large requests are served from a single lease.
+        """
+        year = year or timezone.now().year
+        return [
+            format_registration_number(year, sequence)
+            for sequence in self._take(year, count)
+        ]
+
+    def reset(self):
+        """
+        Forget all leased blocks (their unused values are skipped).
+        """
+        with self._lock:
+            self._blocks.clear()
+        self._local.__dict__.clear()
+
+    def _take(self, year, count):
+        sequences = []
+
+        with self._lock:
+            block = self._blocks.get(year)
+            if block is not None:
+                sequences.extend(block.take(count))
+                if not len(block):
+                    del self._blocks[year]
+
+        pending = self._pending_block(year)
+        if pending is not None:
+            sequences.extend(pending.take(count - len(sequences)))
+
+        if len(sequences) < count:
+            needed = count - len(sequences)
+            sequences.extend(self._lease(year, needed))
+
+        return sequences
+
+    def _pending_block(self, year):
+        """
+        Return this thread's uncommitted block, if its lease is still live.
+        The lease is live while its on_commit callback is still queued;
+        Django drops the callback when the transaction or savepoint that
+        made the lease rolls back.
+        """
+        pending = self._local.__dict__.setdefault('pending', {})
+        if year not in pending:
+            return None
+
+        alias, block, callback = pending[year]
+        queued = connections[alias].run_on_commit
+        if not len(block) or not any(item[1] is callback for item in queued):
+            del pending[year]
+            return None
+        return block
+
+    def _publish(self, year, block):
+        with self._lock:
+            current = self._blocks.get(year)
+            if current is None or len(block) > len(current):
+                self._blocks[year] = block
+
+    def _lease(self, year, needed):
+        """
+        Lease a new block from the database and take ``needed`` values from it.
+        """
+        from .models import RegistrationSequence
+
+        size = max(needed, self.get_block_size())
+        alias = router.db_for_write(RegistrationSequence)
+        in_transaction = connections[alias].in_atomic_block
+
+        with transaction.atomic(using=alias):
+            sequences = RegistrationSequence.objects.using(alias)
+            leased = sequences.filter(intake_year=year).update(
+                next_value=F('next_value') + size
+            )
+            if not leased:
+                try:
+                    with transaction.atomic(using=alias):
+                        sequences.create(intake_year=year, next_value=1 + size)
+                except IntegrityError:
+                    # Another worker created the year's sequence first
+                    sequences.filter(intake_year=year).update(
+                        next_value=F('next_value') + size
+                    )
+            end = sequences.values_list('next_value', flat=True).get(intake_year=year)
+
+        block = Block(end - size, end)
+        taken = block.take(needed)
+
+        if not in_transaction:
+            self._publish(year, block)
+        else:
+            # Only safe to share once the enclosing transaction commits
+            def callback():
+                self._publish(year, block)
+            transaction.on_commit(callback, using=alias)
+            self._local.__dict__.setdefault('pending', {})[year] = (alias, block, callback)
+
+        return taken
+
+
+registration_numbers = RegistrationNumberAllocator()
@@ -0,0 +1,205 @@
+"""
+Passport photo renditions.
+
+Phone camera originals are several megabytes; reviewers only need a face
+at screen size. Renditions are orientation-corrected, metadata-free JPEG
+or WebP files bounded to one of RENDITION_SPECS. They are kept with the
+applicant documents in the documents storage, behind the same access
+check, and recorded on the ApplicationDocument with the SHA-256 of the
+original, so identical uploads share renditions and a replaced photo can
+never be served a stale one.
+
+process_document generates every rendition in the background. Pages
+link through rendition_url(), which points at the protected file when it
+exists and otherwise at a view that renders it on first request.
+"""
+import hashlib
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+from .storage import document_storage
+
+
+# Bounding boxes in pixels
+RENDITION_SPECS = {
+    'thumbnail': (160, 160),
+    'review': (640, 640),
+    'print': (1200, 1200),
+}
+
+# format name -> (Pillow format, file extension, save options)
+RENDITION_FORMATS = {
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def rendition_key(spec, file_format):
+    return f'{spec}.{RENDITION_FORMATS[file_format][1]}'
+
+
+def rendition_path(digest, spec, file_format):
+    """
+    Storage path: renditions/<ab>/<sha256>/<spec>.<ext>
+    """
+    return os.path.join('renditions', digest[:2], digest, rendition_key(spec, file_format))
+
+
+def render(image, spec, file_format):
+    """
+    Return (bytes, width, height) of one rendition of an open image.
+    """
+    pil_format, _, options = RENDITION_FORMATS[file_format]
+    rendition = ImageOps.exif_transpose(image).convert('RGB')
+    rendition.thumbnail(RENDITION_SPECS[spec], Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    rendition.save(output, format=pil_format, **options)
+    return output.getvalue(), rendition.width, rendition.height
+
+
+def shared_rendition(document, key):
+    """
+    The rendition ``key`` of another document with the same content, or None.
+    """
+    from .models import ApplicationDocument
+
+    renditions = (
+        ApplicationDocument.objects
+        .filter(content_hash=document.content_hash, renditions__has_key=key)
+        .exclude(pk=document.pk)
+        .values_list('renditions', flat=True)
+        .first()
+    )
+    return renditions[key] if renditions else None
+
+
+def store_rendition(document, image, spec, file_format):
+    """
+    Render and store one rendition for a document, unless a photo with the
+    same content already has it. Updates ``document.renditions`` in memory.
+    """
+    storage = document_storage()
+    key = rendition_key(spec, file_format)
+    shared = shared_rendition(document, key)
+    if shared is not None:
+        # Saved again so the document holds its own reference to the blob
+        with storage.open(shared['name']) as stored:
+            name = storage.save(rendition_path(document.content_hash, spec, file_format), stored)
+        width, height = shared['width'], shared['height']
+    else:
+        data, width, height = render(image, spec, file_format)
+        name = storage.save(
+            rendition_path(document.content_hash, spec, file_format), ContentFile(data)
+        )
+    document.renditions[key] = {
+        'name': name,
+        'width': width,
+        'height': height,
+    }
+
+
+def release_renditions(document):
+    """
+    Delete a document's stored renditions and forget them in memory.
+    """
+    storage = document_storage()
+    for rendition in document.renditions.values():
+        storage.delete(rendition['name'])
+    document.renditions = {}
+
+
+def generate_renditions(document, image):
+    """
+    Store every spec and format for a processed passport photo.
+    """
+    for spec in RENDITION_SPECS:
+        for file_format in RENDITION_FORMATS:
+            store_rendition(document, image, spec, file_format)
+
+
+def get_photo_document(application):
+    """
+    Return the processed ApplicationDocument for the current passport
+    photo, or None. Uses prefetched ``documents`` when available.
+    """
+    photo = application.passport_photo
+    if not photo:
+        return None
+    for document in application.documents.all():
+        if document.field_name == 'passport_photo' and document.source_name == photo.name:
+            return document
+    return None
+
+
+def rendition_url(application, spec='review', file_format='jpeg'):
+    """
+    URL of a passport photo rendition, without rendering anything.
+    """
+    if not application.passport_photo:
+        return ''
+    document = get_photo_document(application)
+    key = rendition_key(spec, file_format)
+    if document is not None and key in document.renditions:
+        return document_storage().url(document.renditions[key]['name'])
+    return reverse('admissions:photo_rendition', args=[application.pk, spec, file_format])
+
+
+def ensure_rendition(application, spec, file_format):
+    """
+    Return the stored rendition for the current passport photo, creating
+    it (and the document record it is cached on) if needed.
+    """
+    from .models import ApplicationDocument
+
+    photo = application.passport_photo
+    document = get_photo_document(application)
+    if document is None:
+        document, _ = ApplicationDocument.objects.get_or_create(
+            application=application,
+            field_name='passport_photo',
+            defaults={'source_name': photo.name},
+        )
+
+    key = rendition_key(spec, file_format)
+    if document.source_name == photo.name and document.content_hash and key in document.renditions:
+        return document.renditions[key]
+
+    with photo.open('rb') as stream:
+        data = stream.read()
+    digest = content_hash(data)
+    # Rendered outside the lock; only the bookkeeping below is serialised
+    pending = ApplicationDocument(pk=document.pk, content_hash=digest, renditions={})
+    with Image.open(io.BytesIO(data)) as image:
+        store_rendition(pending, image, spec, file_format)
+    rendition = pending.renditions[key]
+
+    storage = document_storage()
+    try:
+        with transaction.atomic():
+            # Reloaded under the lock so renditions recorded by concurrent
+            # requests are merged rather than overwritten
+            document = ApplicationDocument.objects.select_for_update().get(pk=document.pk)
+            if document.source_name != photo.name or document.content_hash != digest:
+                release_renditions(document)
+                document.source_name = photo.name
+                document.content_hash = digest
+            if key in document.renditions:
+                # Another request recorded this rendition first
+                storage.delete(rendition['name'])
+                return document.renditions[key]
+            document.renditions[key] = rendition
+            document.save(update_fields=['source_name', 'content_hash', 'renditions'])
+    except BaseException:
+        # The rendition stored above is referenced by no document
+        storage.delete(rendition['name'])
+        raise
+    return rendition
@@ -0,0 +1,166 @@
+"""
+Indexed applicant search for the admin.
+
+Each application stores a lowercased ``search_document`` built from its
+registration number, course and the applicant's names and email. It is
+indexed with a pg_trgm GIN index on PostgreSQL and an FTS5 trigram table
+(kept in sync by triggers) on SQLite, so substring searches never need
+the join plus leading-wildcard LIKEs of ``search_fields``.
+"""
+from django.db import OperationalError, connections
+from django.db.models.expressions import RawSQL
+
+from .registration import is_valid_registration_number
+
+
+APPLICATION_TABLE = 'admissions_admissionapplication'
+FTS_TABLE = 'admissions_application_search'
+TRIGRAM_INDEX = 'admission_search_trgm_idx'
+
+# Triggers keeping the external-content FTS5 table in sync. SQLite drops
+# them whenever a migration rebuilds the application table, so they are
+# re-installed after every migrate (see AdmissionsConfig.ready).
+SQLITE_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {APPLICATION_TABLE}
+        BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, search_document)
+            VALUES (new.id, new.search_document);
+        END""",
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {APPLICATION_TABLE}
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document)
+            VALUES ('delete', old.id, old.search_document);
+        END""",
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF search_document ON {APPLICATION_TABLE}
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document)
+            VALUES ('delete', old.id, old.search_document);
+            INSERT INTO {FTS_TABLE}(rowid, search_document)
+            VALUES (new.id, new.search_document);
+        END""",
+}
+
+# Trigram indexes cannot help with shorter terms
+MIN_TRIGRAM_LENGTH = 3
+
+
+def build_search_document(application):
+    """
+    Return the denormalized search text for an application.
+    """
+    user = application.user
+    parts = [
+        application.registration_number,
+        user.first_name,
+        user.middle_name,
+        user.last_name,
+        user.email,
+        application.course_of_study,
+    ]
+    return ' '.join(part for part in parts if part).lower()
+
+
+def looks_like_registration_number(term):
+    """
+    Only complete numbers are looked up exactly; partial ones such as
+    ``2026-000123`` are searched for in the search document.
+    """
+    return is_valid_registration_number(term.upper())
+
+
+def install_search_index(connection):
+    """
+    Create the search index for the connection's database, if missing.
+    Safe to call repeatedly.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON {APPLICATION_TABLE} '
+                'USING gin (search_document gin_trgm_ops)'
+            )
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    f"search_document, content='{APPLICATION_TABLE}', "
+                    "content_rowid='id', tokenize='trigram')"
+                )
+            except OperationalError:
+                # SQLite built without FTS5 or the trigram tokenizer
+                return
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{FTS_TABLE}_%'],
+            )
+            existing = {name for name, in cursor.fetchall()}
+            if existing != set(SQLITE_TRIGGERS):
+                for sql in SQLITE_TRIGGERS.values():
+                    cursor.execute(sql)
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    connection.__dict__.pop('_admissions_fts_table', None)
+
+
+def uninstall_search_index(connection):
+    """
+    Drop the search index created by install_search_index().
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+        elif connection.vendor == 'sqlite':
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    connection.__dict__.pop('_admissions_fts_table', None)
+
+
+def has_fts_table(using):
+    """
+    Whether the SQLite FTS5 table exists (FTS5 may be compiled out).
+    """
+    connection = connections[using]
+    if not hasattr(connection, '_admissions_fts_table'):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [FTS_TABLE],
+            )
+            connection._admissions_fts_table = cursor.fetchone() is not None
+    return connection._admissions_fts_table
+
+
+def search_applications(queryset, search_term):
+    """
+    Filter applications matching every word of ``search_term``.
+    Registration numbers short-circuit to the unique index.
+    """
+    search_term = search_term.strip()
+    if not search_term:
+        return queryset
+
+    if looks_like_registration_number(search_term):
+        return queryset.filter(registration_number=search_term.upper())
+
+    words = search_term.lower().split()
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'sqlite' and has_fts_table(queryset.db):
+        long_words = [word for word in words if len(word) >= MIN_TRIGRAM_LENGTH]
+        if long_words:
+            match = ' AND '.join('"{}"'.format(word.replace('"', '""')) for word in long_words)
+            queryset = queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [match],
+            ))
+            words = [word for word in words if len(word) < MIN_TRIGRAM_LENGTH]
+
+    # On PostgreSQL each LIKE is served by the trigram index
+    for word in words:
+        queryset = queryset.filter(search_document__contains=word)
+    return queryset
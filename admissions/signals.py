@@ -0,0 +1,101 @@
+"""
+Signals for the admission application system.
+"""
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from . import statistics
+from .search import APPLICATION_TABLE, install_search_index
+
+
+# Sent once per chunk by bulk status changes, so that receivers
+# (e.g. applicant notifications) can handle many applications at once.
+# Arguments: application_ids, status, reviewed_by
+applications_reviewed = Signal()
+
+
+# User fields copied into AdmissionApplication.search_document
+USER_SEARCH_FIELDS = {'first_name', 'middle_name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_application_search_document(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Keep the application's search document in step with the user's names and email.
+    """
+    if created:
+        return
+    if update_fields is not None and not USER_SEARCH_FIELDS.intersection(update_fields):
+        return
+    
+    try:
+        application = instance.admission_application
+    except ObjectDoesNotExist:
+        return
+    
+    search_document = application.search_document
+    application.refresh_search_document()
+    if application.search_document != search_document:
+        application.save(update_fields=['search_document'])
+
+
+@receiver(post_delete, sender='admissions.AdmissionApplication')
+def release_application_documents(sender, instance, **kwargs):
+    """
+    Drop the deleted application's references to shared document blobs.
+    """
+    instance.release_documents()
+
+
+@receiver(post_delete, sender='admissions.ApplicationDocument')
+def release_derived_documents(sender, instance, **kwargs):
+    """
+    Drop the deleted document record's thumbnail, preview and renditions.
+    """
+    from .renditions import release_renditions
+    
+    for derived in (instance.thumbnail, instance.preview):
+        if derived:
+            derived.delete(save=False)
+    release_renditions(instance)
+
+
+@receiver(pre_delete, sender='admissions.AdmissionApplication')
+def load_statistics_bucket(sender, instance, **kwargs):
+    """
+    Read the bucket of an application loaded without its rollup fields
+    while its row still exists.
+    """
+    if getattr(instance, '_rollup_key', None) is None:
+        instance._rollup_key = statistics.stored_key(instance)
+
+
+@receiver(post_delete, sender='admissions.AdmissionApplication')
+def remove_application_from_statistics(sender, instance, **kwargs):
+    """
+    Take the deleted application out of its statistics bucket.
+    """
+    statistics.move(getattr(instance, '_rollup_key', None), None)
+
+
+@receiver(post_migrate)
+def reinstall_search_index(sender, app_config, using='default', **kwargs):
+    """
+    Restore the search index after migrations that rebuild the table.
+    """
+    if app_config.label != 'admissions':
+        return
+    
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if APPLICATION_TABLE not in connection.introspection.table_names(cursor):
+            return
+        columns = {
+            column.name
+            for column in connection.introspection.get_table_description(cursor, APPLICATION_TABLE)
+        }
+    if 'search_document' in columns:
+        install_search_index(connection)
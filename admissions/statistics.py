@@ -0,0 +1,232 @@
+"""
+Rollup of application counts for the intake statistics page.
+
+ApplicationStatistic holds one row per intake year, status, program and
+day (the local date the application was started) with the number of
+applications in that bucket. Creating an application and every status
+change (and program change after submission) moves one application
+between buckets in the same transaction as the change, so the statistics
+page sums a few hundred rollup rows instead of grouping the whole
+application table. Drafts are counted without their program, which the
+applicant may still change, so saving a draft never touches the rollup.
+``reconcile_statistics`` rebuilds the rollup from the applications after
+bulk imports or raw SQL changes.
+"""
+import operator
+from collections import Counter
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, Q, Sum, Value, When
+from django.db.models.functions import ExtractYear, TruncDate
+from django.utils import timezone
+
+
+# Application fields that decide the rollup bucket
+ROLLUP_FIELDS = ('status', 'program_choice', 'created_at')
+
+
+def rollup_key(status, program_choice, created_at):
+    """
+    Bucket of an application: (intake_year, status, program_choice, day).
+    """
+    day = timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+    if status == 'draft':
+        program_choice = ''
+    return day.year, status, program_choice or '', day
+
+
+def application_key(application):
+    """
+    Bucket of an application instance, or None if its rollup
+    fields were not loaded.
+    """
+    if any(field not in application.__dict__ for field in ROLLUP_FIELDS):
+        return None
+    if application.created_at is None:
+        return None
+    return rollup_key(application.status, application.program_choice, application.created_at)
+
+
+def stored_key(application):
+    """
+    Bucket of an application as its row is stored, for instances loaded
+    without their rollup fields. None if there is no row.
+    """
+    row = (
+        type(application).objects.filter(pk=application.pk)
+        .values_list(*ROLLUP_FIELDS)
+        .first()
+    )
+    return rollup_key(*row) if row else None
+
+
+def current_key(application):
+    """
+    Bucket of an application instance, loading rollup fields that were
+    deferred.
+    """
+    missing = [field for field in ROLLUP_FIELDS if field not in application.__dict__]
+    if missing:
+        application.refresh_from_db(fields=missing)
+    return application_key(application)
+
+
+def apply_deltas(deltas):
+    """
+    Add ``{key: delta}`` changes to the rollup with two queries however
+    many buckets change: an INSERT of the gaining buckets that do not
+    exist yet and one UPDATE of all of them. Runs in the caller's
+    transaction, so the counts commit or roll back with the change.
+    """
+    from .models import ApplicationStatistic
+
+    deltas = {key: delta for key, delta in sorted(deltas.items()) if delta}
+    if not deltas:
+        return
+    # A concurrent transition may create the same bucket; both then update it
+    ApplicationStatistic.objects.bulk_create(
+        [
+            ApplicationStatistic(
+                intake_year=intake_year, status=status, program_choice=program_choice, day=day
+            )
+            for (intake_year, status, program_choice, day), delta in deltas.items()
+            if delta > 0
+        ],
+        ignore_conflicts=True,
+    )
+    buckets = {
+        key: Q(intake_year=key[0], status=key[1], program_choice=key[2], day=key[3])
+        for key in deltas
+    }
+    ApplicationStatistic.objects.filter(reduce(operator.or_, buckets.values())).update(
+        count=F('count') + Case(
+            *[When(bucket, then=Value(deltas[key])) for key, bucket in buckets.items()],
+            default=Value(0),
+        )
+    )
+
+
+def move(previous, current):
+    """
+    Move one application from bucket ``previous`` to ``current``;
+    either may be None for a created or deleted application.
+    """
+    if previous == current:
+        return
+    deltas = Counter()
+    if previous is not None:
+        deltas[previous] -= 1
+    if current is not None:
+        deltas[current] += 1
+    apply_deltas(deltas)
+
+
+def count_applications(queryset):
+    """
+    Return ``{key: count}`` grouped from applications in SQL.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(
+            intake_year=ExtractYear('created_at'),
+            day=TruncDate('created_at'),
+            bucket_program=Case(
+                When(status='draft', then=Value('')),
+                default=F('program_choice'),
+                output_field=CharField(),
+            ),
+        )
+        .values('intake_year', 'status', 'bucket_program', 'day')
+        .annotate(count=Count('pk'))
+    )
+    return {
+        (row['intake_year'], row['status'], row['bucket_program'] or '', row['day']): row['count']
+        for row in rows
+    }
+
+
+def reconcile_statistics(dry_run=False):
+    """
+    Compare the rollup with the applications and rewrite the buckets
+    that differ. Returns ``{key: (rollup count, actual count)}`` of them.
+    """
+    from .models import AdmissionApplication, ApplicationStatistic
+
+    with transaction.atomic():
+        # Transitions touching existing buckets wait until the rewrite commits
+        stored = {
+            (row.intake_year, row.status, row.program_choice, row.day): row
+            for row in ApplicationStatistic.objects.select_for_update()
+        }
+        actual = count_applications(AdmissionApplication.objects.all())
+
+        drift = {}
+        for key in stored.keys() | actual.keys():
+            rollup_count = stored[key].count if key in stored else 0
+            if rollup_count != actual.get(key, 0):
+                drift[key] = (rollup_count, actual.get(key, 0))
+        if dry_run or not drift:
+            return drift
+
+        ApplicationStatistic.objects.filter(
+            pk__in=[stored[key].pk for key in drift if key in stored]
+        ).delete()
+        ApplicationStatistic.objects.bulk_create([
+            ApplicationStatistic(
+                intake_year=intake_year,
+                status=status,
+                program_choice=program_choice,
+                day=day,
+                count=count,
+            )
+            for (intake_year, status, program_choice, day), (_, count) in drift.items()
+            if count
+        ])
+    return drift
+
+
+def intake_summary(intake_year=None):
+    """
+    Counts for the statistics page, read only from the rollup.
+    Returns a dict with ``years``, ``intake_year``, ``total``,
+    ``by_status``, ``by_program`` ({program: {status: count}}) and
+    ``by_day`` ([(day, count)], newest first).
+    """
+    from .models import ApplicationStatistic
+
+    years = list(
+        ApplicationStatistic.objects.filter(count__gt=0)
+        .order_by('-intake_year')
+        .values_list('intake_year', flat=True)
+        .distinct()
+    )
+    if intake_year is None:
+        intake_year = years[0] if years else timezone.localdate().year
+    rollup = ApplicationStatistic.objects.filter(intake_year=intake_year).order_by()
+
+    by_status = dict(
+        rollup.values_list('status').annotate(total=Sum('count')).values_list('status', 'total')
+    )
+    by_program = {}
+    for program, status, total in (
+        rollup.values_list('program_choice', 'status')
+        .annotate(total=Sum('count'))
+        .values_list('program_choice', 'status', 'total')
+    ):
+        by_program.setdefault(program, {})[status] = total
+    by_day = list(
+        rollup.values_list('day')
+        .annotate(total=Sum('count'))
+        .filter(total__gt=0)
+        .order_by('-day')
+        .values_list('day', 'total')
+    )
+    return {
+        'years': years,
+        'intake_year': intake_year,
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+        'by_program': by_program,
+        'by_day': by_day,
+    }
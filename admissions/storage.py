@@ -0,0 +1,131 @@
+"""
+Content-addressed storage for applicant documents.
+
+Uploads are hashed while they are streamed to a temporary file and then
+stored once under their SHA-256 digest, so identical files (a certificate
+submitted twice, a shared template) share one blob on disk. StoredBlob
+rows count the file fields pointing at each blob; deleting a name only
+drops a reference, and the blob goes when the last reference does.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage, InvalidStorageError, default_storage, storages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+BLOB_PREFIX = 'blobs'
+TEMP_DIR = os.path.join(BLOB_PREFIX, 'tmp')
+
+
+def blob_name(digest, ext=''):
+    """
+    Storage name for a digest: blobs/<ab>/<cd>/<sha256><ext>
+    """
+    return '/'.join([BLOB_PREFIX, digest[:2], digest[2:4], f'{digest}{ext}'])
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(f'{BLOB_PREFIX}/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that stores each distinct content once.
+    Names passed to save() only contribute their extension.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content digest in _save()
+        return name
+
+    def _save(self, name, content):
+        temp_dir = self.path(TEMP_DIR)
+        os.makedirs(temp_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp.write(chunk)
+                    size += len(chunk)
+
+            name = blob_name(digest.hexdigest(), os.path.splitext(name)[1].lower())
+            self.add_reference(name, size)
+
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+            else:
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                # Atomic; a concurrent writer of the same digest wrote the same bytes
+                os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def add_reference(self, name, size):
+        from .models import StoredBlob
+
+        with transaction.atomic():
+            if StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1):
+                return
+            try:
+                with transaction.atomic():
+                    StoredBlob.objects.create(name=name, size=size, ref_count=1)
+            except IntegrityError:
+                # Another upload of the same content created the row first
+                StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    def delete(self, name):
+        """
+        Drop one reference to a blob; remove the file with the last one.
+        Names outside the blob tree (legacy uploads) are deleted directly.
+        """
+        from .models import StoredBlob
+
+        if not is_blob_name(name):
+            return super().delete(name)
+
+        with transaction.atomic():
+            StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') - 1)
+            removed, _ = StoredBlob.objects.filter(name=name, ref_count__lte=0).delete()
+            if removed:
+                transaction.on_commit(lambda: self.remove_unreferenced(name))
+
+    def remove_unreferenced(self, name):
+        from .models import StoredBlob
+
+        # A new upload of the same content may have referenced it again
+        if not StoredBlob.objects.filter(name=name).exists():
+            super().delete(name)
+
+
+def discard_rolled_back(storage, name):
+    """
+    Remove a file stored in a transaction that rolled back. A shared blob
+    stays while other rows still reference it.
+    """
+    if isinstance(storage, ContentAddressedStorage):
+        storage.remove_unreferenced(name)
+    else:
+        storage.delete(name)
+
+
+def document_storage():
+    """
+    Storage for AdmissionApplication documents: STORAGES['documents'],
+    falling back to the default storage when it is not configured.
+    """
+    try:
+        return storages['documents']
+    except InvalidStorageError:
+        return default_storage
@@ -0,0 +1,40 @@
+"""
+Template tags for the admissions app.
+"""
+from django import template
+from django.utils.html import format_html
+
+from ..renditions import RENDITION_SPECS, rendition_url
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def passport_photo_url(application, spec='review', file_format='jpeg'):
+    """
+    {% passport_photo_url application 'thumbnail' 'webp' %}
+    """
+    return rendition_url(application, spec, file_format)
+
+
+@register.simple_tag
+def passport_photo(application, spec='review', css_class=''):
+    """
+    Render a <picture> with a WebP rendition and a JPEG fallback.
+    """
+    if not application.passport_photo:
+        return ''
+    width, height = RENDITION_SPECS[spec]
+    return format_html(
+        '<picture>'
+        '<source srcset="{}" type="image/webp">'
+        '<img src="{}" alt="Passport photograph" class="{}" '
+        'style="max-width: {}px; max-height: {}px;" loading="lazy">'
+        '</picture>',
+        rendition_url(application, spec, 'webp'),
+        rendition_url(application, spec, 'jpeg'),
+        css_class,
+        width,
+        height,
+    )
@@ -0,0 +1,2360 @@
+import base64
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
+
+from PIL import Image
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import Http404, StreamingHttpResponse
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import Client, LiveServerTestCase, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from admissions.models import (
+    AdmissionApplication,
+    ApiToken,
+    ApplicationDocument,
+    ApplicationStatistic,
+    ApplicationStatusChange,
+    BackgroundJob,
+    BulkReviewJob,
+    ConcurrentUpdateError,
+    InvalidTransitionError,
+    ProfiledRequest,
+    RegistrationSequence,
+    StoredBlob,
+    UploadSession,
+)
+from admissions import api, benchmarks, loadtest, metrics, uploads
+from admissions.instrumentation import RequestProfile, fingerprint
+from admissions.changelist import KeysetChangeList
+from admissions.documents import enqueue_document_processing
+from admissions.forms import ApplicationAdminForm, DocumentUploadForm, ProgramInfoForm
+from admissions.jobs import enqueue, heartbeat, task, work
+from admissions.media import serve_public_media
+from admissions.profiling import StackSampler, hot_functions, parse_folded
+from admissions.registration import RegistrationNumberAllocator, luhn_check_digit
+from admissions.renditions import RENDITION_FORMATS, RENDITION_SPECS, ensure_rendition, rendition_url
+from admissions.signals import applications_reviewed
+from admissions.statistics import intake_summary, reconcile_statistics
+from admissions.storage import is_blob_name
+from admissions.uploadhandlers import DocumentUploadHandler
+
+
+User = get_user_model()
+
+
+def create_applicant(username="applicant", **kwargs):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="s3cure-pass-123",
+        first_name="Ada",
+        last_name="Obi",
+        **kwargs,
+    )
+
+
+class ApplicationLoaderTests(TestCase):
+    """
+    Tests for the request-scoped application loader.
+    """
+
+    def setUp(self):
+        self.user = create_applicant()
+        self.client.force_login(self.user)
+
+    def test_dashboard_creates_draft_once(self):
+        self.client.get(reverse("admissions:dashboard"))
+        self.client.get(reverse("admissions:dashboard"))
+        self.assertEqual(AdmissionApplication.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(AdmissionApplication.objects.get(user=self.user).status, "draft")
+        self.assertEqual(ApplicationStatistic.objects.get(status="draft").count, 1)
+
+    def test_only_step_views_create_a_draft(self):
+        for response in [
+            self.client.get(reverse("admissions:application_detail")),
+            self.client.get(reverse("admissions:submit_application")),
+            self.client.post(reverse("admissions:submit_application")),
+            self.client.patch(
+                reverse("admissions:autosave", args=["personal-info"]),
+                json.dumps({"fields": {"city": "Enugu"}}),
+                content_type="application/json",
+            ),
+            self.client.get(reverse("admissions:protected_document", args=["blobs/ab/cd/x.pdf"])),
+        ]:
+            self.assertEqual(response.status_code, 404)
+        self.assertFalse(AdmissionApplication.objects.exists())
+
+        response = self.client.get(reverse("admissions:program_info"))
+        self.assertRedirects(response, reverse("admissions:personal_info"))
+        self.assertEqual(AdmissionApplication.objects.get().user, self.user)
+
+    def test_anonymous_user_is_redirected_to_login(self):
+        self.client.logout()
+        response = self.client.get(reverse("admissions:document_upload"))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse("accounts:login"), response["Location"])
+
+
+class StepViewQueryBudgetTests(TestCase):
+    """
+    Query budgets for the applicant step views.
+    Budget: session + user + one application SELECT (+ session write on redirects).
+    """
+
+    def setUp(self):
+        self.user = create_applicant()
+        self.application = AdmissionApplication.objects.create(
+            user=self.user,
+            personal_info_completed=True,
+            program_info_completed=True,
+        )
+        self.client.force_login(self.user)
+
+    def test_dashboard_budget(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("admissions:dashboard"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_personal_info_budget(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("admissions:personal_info"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_program_info_budget(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("admissions:program_info"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_document_upload_budget(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("admissions:document_upload"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_application_detail_budget(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("admissions:application_detail"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_program_info_redirect_budget(self):
+        self.application.personal_info_completed = False
+        self.application.save()
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("admissions:program_info"))
+        self.assertRedirects(
+            response, reverse("admissions:personal_info"), fetch_redirect_response=False
+        )
+
+    def test_program_info_post_budget(self):
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                reverse("admissions:program_info"),
+                {"program_choice": "undergraduate", "course_of_study": "Physics"},
+            )
+        self.assertRedirects(
+            response, reverse("admissions:dashboard"), fetch_redirect_response=False
+        )
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.course_of_study, "Physics")
+
+
+class BulkReviewTests(TestCase):
+    """
+    Tests for set-based bulk approve/reject.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        )
+        statuses = ["submitted", "under_review", "draft", "approved", "submitted"]
+        self.applications = [
+            AdmissionApplication.objects.create(
+                user=create_applicant(f"applicant{i}"), status=status
+            )
+            for i, status in enumerate(statuses)
+        ]
+        self.client.force_login(self.admin)
+        self.changelist_url = reverse("admin:admissions_admissionapplication_changelist")
+
+    def post_action(self, action):
+        return self.client.post(self.changelist_url, {
+            "action": action,
+            "_selected_action": [application.pk for application in self.applications],
+        })
+
+    @override_settings(ADMISSIONS_BULK_REVIEW_CHUNK_SIZE=2)
+    def test_bulk_review_updates_only_reviewable_rows(self):
+        received = []
+        handler = lambda sender, **kwargs: received.append(kwargs["application_ids"])
+        applications_reviewed.connect(handler)
+        self.addCleanup(applications_reviewed.disconnect, handler)
+
+        count = AdmissionApplication.objects.all().bulk_review(
+            "approved", self.admin, "Looks good"
+        )
+
+        self.assertEqual(count, 3)
+        self.assertEqual(AdmissionApplication.objects.filter(status="approved").count(), 4)
+        self.assertEqual(AdmissionApplication.objects.filter(status="draft").count(), 1)
+        reviewed = AdmissionApplication.objects.filter(review_notes="Looks good")
+        self.assertEqual(reviewed.filter(reviewed_by=self.admin).count(), 3)
+        self.assertEqual(reviewed.filter(reviewed_at__isnull=False).count(), 3)
+        self.assertEqual(ApplicationStatusChange.objects.filter(to_status="approved").count(), 3)
+        self.assertEqual([len(ids) for ids in received], [2, 1])
+
+    def test_bulk_review_query_count_is_per_chunk(self):
+        # pk list + (SAVEPOINT, SELECT FOR UPDATE, UPDATE, INSERT, RELEASE)
+        # + the statistics INSERT of new buckets and UPDATE of all buckets
+        with self.assertNumQueries(8):
+            AdmissionApplication.objects.all().bulk_review("rejected", self.admin)
+
+    def test_approve_action(self):
+        self.post_action("approve_applications")
+        self.assertEqual(AdmissionApplication.objects.filter(status="approved").count(), 4)
+        self.assertFalse(BulkReviewJob.objects.exists())
+
+    def test_mark_under_review_action_only_moves_submitted(self):
+        self.post_action("mark_under_review")
+        self.assertEqual(
+            AdmissionApplication.objects.filter(status="under_review").count(), 3
+        )
+        self.assertEqual(
+            ApplicationStatusChange.objects.filter(from_status="submitted").count(), 2
+        )
+
+    def test_mark_under_review_keeps_reviewer_notes(self):
+        AdmissionApplication.objects.filter(status="submitted").update(review_notes="Call referee")
+        self.post_action("mark_under_review")
+        self.assertEqual(
+            AdmissionApplication.objects.filter(status="under_review", review_notes="Call referee").count(), 2
+        )
+
+    @override_settings(ADMISSIONS_BULK_REVIEW_SYNC_LIMIT=2)
+    def test_large_selection_runs_as_background_job(self):
+        self.post_action("reject_applications")
+
+        job = BulkReviewJob.objects.get()
+        self.assertEqual(job.total, 3)
+        self.assertEqual(job.status, "pending")
+        self.assertEqual(AdmissionApplication.objects.filter(status="rejected").count(), 0)
+        self.assertTrue(BackgroundJob.objects.filter(
+            task_name="admissions.run_bulk_review", payload={"job_id": job.pk}
+        ).exists())
+
+        self.assertEqual(work(once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.updated, 3)
+        self.assertEqual(job.get_progress_percentage(), 100)
+        self.assertEqual(AdmissionApplication.objects.filter(status="rejected").count(), 3)
+
+    @override_settings(ADMISSIONS_BULK_REVIEW_SYNC_LIMIT=2, ADMISSIONS_BULK_REVIEW_CHUNK_SIZE=2)
+    def test_interrupted_job_resumes_from_its_progress(self):
+        self.post_action("reject_applications")
+        job = BulkReviewJob.objects.get()
+        # Recorded as if a worker died after the first chunk; the queue
+        # reclaims its stale job
+        BulkReviewJob.objects.filter(pk=job.pk).update(status="running", processed=2, updated=2)
+        BackgroundJob.objects.update(
+            status="running", locked_by="dead", locked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(work(once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.updated), ("completed", 3, 3))
+        # Only the last chunk was applied on the second run
+        self.assertEqual(
+            list(AdmissionApplication.objects.filter(status="rejected").values_list("pk", flat=True)),
+            job.application_ids[2:],
+        )
+
+
+class ExportTests(TestCase):
+    """
+    Tests for streaming CSV/XLSX exports.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        )
+        AdmissionApplication.objects.create(
+            user=create_applicant("first"), status="submitted", course_of_study="=SUM(A1)"
+        )
+        AdmissionApplication.objects.create(
+            user=create_applicant("second"), status="draft", course_of_study="Law & <Ethics>"
+        )
+        self.client.force_login(self.admin)
+
+    def export(self, action):
+        return self.client.post(
+            reverse("admin:admissions_admissionapplication_changelist"),
+            {
+                "action": action,
+                "_selected_action": AdmissionApplication.objects.values_list("pk", flat=True),
+            },
+        )
+
+    def test_csv_action_streams_rows_with_user_columns(self):
+        response = self.export("export_as_csv")
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response["Content-Type"], "text/csv")
+
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:3], ["Registration Number", "Status", "First Name"])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(
+            sorted(row[5] for row in rows[1:]), ["first@example.com", "second@example.com"]
+        )
+        self.assertIn("'=SUM(A1)", rows[1])
+
+    def test_export_reads_rows_in_a_single_query(self):
+        from admissions.exports import export_rows
+
+        with self.assertNumQueries(1):
+            rows = list(export_rows(AdmissionApplication.objects.all()))
+        self.assertEqual(len(rows), 2)
+
+    def test_xlsx_action_streams_valid_workbook(self):
+        response = self.export("export_as_xlsx")
+        content = b"".join(response.streaming_content)
+
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 3)
+        self.assertIn("Law &amp; &lt;Ethics&gt;", sheet)
+
+    def test_management_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.csv")
+            call_command("export_applications", "--status", "submitted", "--output", path,
+                         stderr=io.StringIO())
+            with open(path, newline="") as stream:
+                rows = list(csv.reader(stream))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][1], "submitted")
+
+
+def bulk_create_applications(count, prefix="bulk", **fields):
+    users = User.objects.bulk_create([
+        User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", first_name=f"Bulk{i}")
+        for i in range(count)
+    ])
+    return AdmissionApplication.objects.bulk_create([
+        AdmissionApplication(user=user, **fields) for user in users
+    ])
+
+
+class ChangelistQueryTests(TestCase):
+    """
+    Tests for the N+1-free admission application changelist.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        )
+        self.client.force_login(self.admin)
+        self.changelist_url = reverse("admin:admissions_admissionapplication_changelist")
+
+    def changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.changelist_url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_page_renders_in_constant_queries(self):
+        bulk_create_applications(5, personal_info_completed=True)
+        small_page = self.changelist_queries()
+
+        bulk_create_applications(95, prefix="more", personal_info_completed=True)
+        self.assertEqual(self.changelist_queries(), small_page)
+
+    def test_progress_is_annotated_in_sql(self):
+        application = bulk_create_applications(
+            1, personal_info_completed=True, program_info_completed=True
+        )[0]
+        annotated = AdmissionApplication.objects.with_completion_percentage().get(
+            pk=application.pk
+        )
+        self.assertEqual(annotated.completion_percentage, 66)
+        self.assertEqual(annotated.completion_percentage, annotated.get_completion_percentage())
+
+    def test_filter_and_sort_by_progress(self):
+        bulk_create_applications(3, personal_info_completed=True)
+        AdmissionApplication.objects.filter(
+            pk=AdmissionApplication.objects.order_by("pk").values("pk")[:1]
+        ).update(program_info_completed=True, documents_uploaded=True)
+
+        response = self.client.get(self.changelist_url, {"progress": "100"})
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+        response = self.client.get(self.changelist_url, {"o": "6"})
+        percentages = [obj.completion_percentage for obj in response.context["cl"].result_list]
+        self.assertEqual(percentages, [33, 33, 100])
+
+
+class IndexUsageTests(TestCase):
+    """
+    EXPLAIN-based checks that the admin and review queries use an index.
+    """
+
+    def setUp(self):
+        bulk_create_applications(20, status="submitted", program_choice="diploma")
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == "postgresql":
+            # Tiny test tables would otherwise always be sequentially scanned
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"Expected {index_name} in plan:\n{plan}")
+
+    def test_review_queue_uses_index(self):
+        self.assertUsesIndex(
+            AdmissionApplication.objects.review_queue(), "admission_review_queue_idx"
+        )
+
+    def test_status_and_program_filter_uses_composite_index(self):
+        self.assertUsesIndex(
+            AdmissionApplication.objects.filter(status="submitted", program_choice="diploma"),
+            "admission_status_program_idx",
+        )
+
+    def test_program_filter_uses_index(self):
+        self.assertUsesIndex(
+            AdmissionApplication.objects.filter(program_choice="diploma"),
+            "admission_program_idx",
+        )
+
+    def test_status_and_submitted_at_filter_uses_index(self):
+        self.assertUsesIndex(
+            AdmissionApplication.objects.filter(
+                status="submitted", submitted_at__gte=timezone.now() - timedelta(days=7)
+            ),
+            "admission_review_queue_idx",
+        )
+
+    def test_default_changelist_ordering_uses_index(self):
+        self.assertUsesIndex(
+            AdmissionApplication.objects.all()[:100],
+            "admissions__created_e86e3c_idx",
+        )
+
+    def test_api_cursor_page_uses_sync_index(self):
+        cursor = api.encode_cursor(timezone.now(), 1)
+        self.assertUsesIndex(
+            api.filter_applications({"cursor": cursor})[:100],
+            "admission_sync_idx",
+        )
+
+    def test_filtered_api_cursor_page_uses_filter_sync_index(self):
+        cursor = api.encode_cursor(timezone.now(), 1)
+        self.assertUsesIndex(
+            api.filter_applications({"status": "submitted", "cursor": cursor})[:100],
+            "admission_status_sync_idx",
+        )
+        self.assertUsesIndex(
+            api.filter_applications({"program": "diploma", "cursor": cursor})[:100],
+            "admission_program_sync_idx",
+        )
+
+    def test_secondary_indexes_do_not_overlap(self):
+        indexes = AdmissionApplication._meta.indexes
+        self.assertEqual(len(indexes), 7)
+        prefixes = [tuple(index.fields[:2]) for index in indexes]
+        self.assertEqual(len(prefixes), len(set(prefixes)))
+        self.assertEqual(
+            [index.name for index in indexes if "updated_at" in index.fields],
+            ["admission_sync_idx", "admission_status_sync_idx", "admission_program_sync_idx"],
+        )
+
+
+class ApplicantSearchTests(TestCase):
+    """
+    Tests for the indexed applicant search.
+    """
+
+    def setUp(self):
+        self.application = AdmissionApplication.objects.create(
+            user=create_applicant("chioma"), course_of_study="Computer Science"
+        )
+        AdmissionApplication.objects.create(
+            user=create_applicant("tunde"), course_of_study="Law"
+        )
+
+    def search(self, term):
+        from admissions.search import search_applications
+
+        return list(search_applications(AdmissionApplication.objects.all(), term))
+
+    def test_search_document_is_kept_current(self):
+        self.assertIn("chioma@example.com", self.application.search_document)
+        self.assertIn("computer science", self.application.search_document)
+
+        user = self.application.user
+        user.last_name = "Eze"
+        user.save()
+        self.application.refresh_from_db()
+        self.assertIn("eze", self.application.search_document)
+
+    def test_search_matches_partial_names_emails_and_course(self):
+        self.assertEqual(self.search("CHIOMA@exam"), [self.application])
+        self.assertEqual(self.search("computer sci"), [self.application])
+        self.assertEqual(len(self.search("obi")), 2)
+        self.assertEqual(self.search("nobody"), [])
+
+    def test_short_terms_still_match(self):
+        self.assertEqual(self.search("la"), [AdmissionApplication.objects.get(course_of_study="Law")])
+
+    def test_registration_number_uses_exact_lookup(self):
+        term = self.application.registration_number.lower()
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.search(term), [self.application])
+        self.assertIn("registration_number", context.captured_queries[0]["sql"])
+        self.assertNotIn("LIKE", context.captured_queries[0]["sql"])
+
+    def test_partial_registration_number_searches_the_document(self):
+        number = self.application.registration_number
+        partial = number.rsplit("-", 1)[0]
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.search(partial), [self.application])
+        self.assertNotIn("registration_number", context.captured_queries[0]["sql"].split("WHERE")[1])
+        # A wrong check digit is not a complete number either
+        wrong = f"{partial}-{(int(number[-1]) + 1) % 10}"
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.search(wrong), [])
+        self.assertNotIn("registration_number", context.captured_queries[0]["sql"].split("WHERE")[1])
+
+    def test_admin_search(self):
+        admin_user = User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        )
+        self.client.force_login(admin_user)
+        response = self.client.get(
+            reverse("admin:admissions_admissionapplication_changelist"), {"q": "tunde"}
+        )
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+
+class RegistrationNumberAllocatorTests(TestCase):
+    """
+    Tests for block-leased registration number allocation.
+    """
+
+    def setUp(self):
+        self.allocator = RegistrationNumberAllocator(block_size=5)
+
+    def test_numbers_are_formatted_with_check_digit(self):
+        number = self.allocator.allocate(year=2026)
+        self.assertEqual(number, f"2026-000001-{luhn_check_digit('2026000001')}")
+
+        year, sequence, check = number.split("-")
+        self.assertEqual(check, luhn_check_digit(f"{year}{sequence}"))
+
+    def test_printed_number_passes_luhn_validation(self):
+        def luhn_valid(number):
+            # Independent check: the weighted sum over every printed digit,
+            # check digit included, is a multiple of ten
+            digits = [int(char) for char in number if char.isdigit()]
+            odd = digits[-1::-2]
+            even = [sum(divmod(digit * 2, 10)) for digit in digits[-2::-2]]
+            return (sum(odd) + sum(even)) % 10 == 0
+
+        numbers = self.allocator.allocate_many(5, year=2026)
+        self.assertTrue(all(luhn_valid(number) for number in numbers), numbers)
+        with override_settings(ADMISSIONS_REGISTRATION_NUMBER_FORMAT="ADM/{year}/{sequence:05d}{check}"):
+            self.assertTrue(luhn_valid(self.allocator.allocate(year=2027)))
+
+    @override_settings(ADMISSIONS_REGISTRATION_NUMBER_FORMAT="ADM/{year}/{sequence:05d}{check}")
+    def test_format_is_configurable(self):
+        self.assertRegex(self.allocator.allocate(year=2026), r"^ADM/2026/00001\d$")
+
+    def test_numbers_within_a_block_need_no_queries(self):
+        self.allocator.allocate(year=2026)
+        with self.assertNumQueries(0):
+            numbers = [self.allocator.allocate(year=2026) for _ in range(4)]
+        self.assertEqual(len(set(numbers)), 4)
+
+        self.allocator.allocate(year=2026)
+        self.assertEqual(RegistrationSequence.objects.get(intake_year=2026).next_value, 11)
+
+    def test_years_have_separate_sequences(self):
+        self.assertTrue(self.allocator.allocate(year=2026).startswith("2026-000001-"))
+        self.assertTrue(self.allocator.allocate(year=2027).startswith("2027-000001-"))
+
+    def test_allocate_many_uses_one_lease(self):
+        with CaptureQueriesContext(connection) as context:
+            numbers = self.allocator.allocate_many(40, year=2026)
+        updates = [q for q in context.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(len(set(numbers)), 40)
+
+    def test_rolled_back_lease_is_not_reused(self):
+        try:
+            with transaction.atomic():
+                first = self.allocator.allocate(year=2026)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        # The rolled-back block is dropped, so the allocator stays in step
+        # with the database instead of handing out an unrecorded range.
+        second = self.allocator.allocate(year=2026)
+        self.assertEqual(second, first)
+        self.assertEqual(RegistrationSequence.objects.get(intake_year=2026).next_value, 6)
+
+    def test_bulk_create_gets_unique_numbers(self):
+        applications = bulk_create_applications(250, prefix="import")
+        numbers = {application.registration_number for application in applications}
+        self.assertEqual(len(numbers), 250)
+        self.assertEqual(
+            AdmissionApplication.objects.values("registration_number").distinct().count(), 250
+        )
+
+
+def make_png(size=(640, 480)):
+    output = io.BytesIO()
+    Image.new("RGB", size, "navy").save(output, format="PNG")
+    return output.getvalue()
+
+
+PDF_BYTES = (
+    b"%PDF-1.4\n1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n"
+    b"2 0 obj << /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 >> endobj\n"
+    b"3 0 obj << /Type /Page /Parent 2 0 R >> endobj\n"
+    b"4 0 obj << /Type /Page /Parent 2 0 R >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF"
+)
+
+
+@task("tests.flaky")
+def flaky_task(fail):
+    if fail:
+        raise ValueError("boom")
+    return {"ok": True}
+
+
+@task("tests.long")
+def long_task():
+    an_hour_ago = timezone.now() - timedelta(hours=1)
+    BackgroundJob.objects.update(locked_at=an_hour_ago)
+    heartbeat()
+    return {"stale": BackgroundJob.objects.filter(locked_at=an_hour_ago).exists()}
+
+
+class MediaRootMixin:
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class BackgroundJobTests(TestCase):
+    """
+    Tests for the database-backed job queue.
+    """
+
+    def test_worker_runs_queued_jobs(self):
+        job = enqueue("tests.flaky", fail=False)
+        self.assertEqual(work(worker_id="test", once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.result, {"ok": True})
+        self.assertEqual(job.locked_by, "test")
+
+    def test_failed_jobs_are_retried_then_marked_failed(self):
+        job = enqueue("tests.flaky", fail=True)
+        with self.assertLogs("admissions.jobs", "ERROR"):
+            work(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertGreater(job.run_after, timezone.now())
+
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            run_after=timezone.now(), attempts=job.max_attempts - 1
+        )
+        with self.assertLogs("admissions.jobs", "ERROR"):
+            work(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, "boom")
+
+    def test_heartbeat_keeps_a_long_job_claimed(self):
+        job = enqueue("tests.long")
+        work(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"stale": False})
+
+    def test_stale_running_jobs_are_reclaimed(self):
+        job = enqueue("tests.flaky", fail=False)
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            status="running", locked_by="dead", locked_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(work(once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+
+
+class DocumentProcessingTests(MediaRootMixin, TestCase):
+    """
+    Tests for background processing of uploaded documents.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_applicant()
+        self.application = AdmissionApplication.objects.create(
+            user=self.user, personal_info_completed=True, program_info_completed=True
+        )
+        self.client.force_login(self.user)
+
+    def upload(self, **files):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse("admissions:document_upload"), files)
+
+    def test_upload_enqueues_and_worker_records_results(self):
+        response = self.upload(
+            passport_photo=SimpleUploadedFile("photo.png", make_png(), "image/png"),
+            olevel_result=SimpleUploadedFile("result.pdf", PDF_BYTES, "application/pdf"),
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            BackgroundJob.objects.filter(task_name="admissions.process_document").count(), 2
+        )
+        self.assertFalse(ApplicationDocument.objects.exists())
+
+        call_command("process_jobs", "--once", stdout=io.StringIO())
+
+        photo = ApplicationDocument.objects.get(field_name="passport_photo")
+        self.assertEqual(photo.status, "valid")
+        self.assertEqual((photo.width, photo.height), (640, 480))
+        with Image.open(photo.thumbnail.path) as thumbnail:
+            self.assertLessEqual(max(thumbnail.size), 200)
+
+        result = ApplicationDocument.objects.get(field_name="olevel_result")
+        self.assertEqual(result.status, "valid")
+        self.assertEqual(result.page_count, 2)
+
+    def test_disguised_file_is_marked_invalid(self):
+        # Stored without going through DocumentUploadHandler
+        self.application.olevel_result.save(
+            "result.pdf", ContentFile(b"MZ\x90\x00 not a pdf"), save=True
+        )
+        enqueue_document_processing(self.application, ["olevel_result"])
+        work(once=True)
+        document = ApplicationDocument.objects.get(field_name="olevel_result")
+        self.assertEqual(document.status, "invalid")
+
+
+class InterruptedStream:
+    """
+    Request body that drops the connection after ``limit`` bytes.
+    """
+
+    def __init__(self, data, limit):
+        self.stream = io.BytesIO(data[:limit])
+
+    def read(self, size):
+        data = self.stream.read(size)
+        if not data:
+            raise OSError("connection reset")
+        return data
+
+
+class ResumableUploadTests(MediaRootMixin, TestCase):
+    """
+    Tests for the tus-style resumable upload endpoints.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_applicant()
+        self.application = AdmissionApplication.objects.create(
+            user=self.user, personal_info_completed=True, program_info_completed=True
+        )
+        self.client.force_login(self.user)
+
+    def create(self, field="olevel_result", filename="result.pdf", length=None, **metadata):
+        metadata.update(field=field, filename=filename)
+        header = ",".join(
+            f"{key} {base64.b64encode(value.encode()).decode()}" for key, value in metadata.items()
+        )
+        return self.client.post(
+            reverse("admissions:upload_create"),
+            HTTP_UPLOAD_LENGTH=str(len(PDF_BYTES) if length is None else length),
+            HTTP_UPLOAD_METADATA=header,
+        )
+
+    def patch(self, location, data, offset, **headers):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.generic(
+                "PATCH",
+                location,
+                data,
+                content_type="application/offset+octet-stream",
+                HTTP_UPLOAD_OFFSET=str(offset),
+                **headers,
+            )
+
+    def head(self, location):
+        return self.client.head(location)
+
+    def test_chunked_upload_is_assembled_and_attached(self):
+        response = self.create()
+        self.assertEqual(response.status_code, 201)
+        location = response["Location"]
+
+        self.assertEqual(self.patch(location, PDF_BYTES[:100], 0)["Upload-Offset"], "100")
+        self.assertEqual(self.head(location)["Upload-Offset"], "100")
+        response = self.patch(location, PDF_BYTES[100:], 100)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response["Upload-Offset"], str(len(PDF_BYTES)))
+
+        self.application.refresh_from_db()
+        with self.application.olevel_result.open("rb") as stored:
+            self.assertEqual(stored.read(), PDF_BYTES)
+        self.assertTrue(
+            BackgroundJob.objects.filter(
+                task_name="admissions.process_document", payload__field="olevel_result"
+            ).exists()
+        )
+        self.assertFalse(os.listdir(uploads.get_upload_dir()))
+
+    def test_resume_after_dropped_connection(self):
+        location = self.create()["Location"]
+        session = UploadSession.objects.get()
+        offset = uploads.write_chunk(
+            session, InterruptedStream(PDF_BYTES, 150), offset=0, content_length=len(PDF_BYTES)
+        )
+        self.assertEqual(offset, 150)
+
+        self.assertEqual(self.head(location)["Upload-Offset"], "150")
+        self.assertEqual(self.patch(location, PDF_BYTES[150:], 150).status_code, 204)
+        self.application.refresh_from_db()
+        with self.application.olevel_result.open("rb") as stored:
+            self.assertEqual(stored.read(), PDF_BYTES)
+
+    def test_offset_mismatch_is_rejected(self):
+        location = self.create()["Location"]
+        self.patch(location, PDF_BYTES[:100], 0)
+        self.assertEqual(self.patch(location, PDF_BYTES[50:], 50).status_code, 409)
+        self.assertEqual(self.head(location)["Upload-Offset"], "100")
+
+    def test_chunk_checksum_mismatch_is_not_acknowledged(self):
+        location = self.create()["Location"]
+        bad_digest = base64.b64encode(hashlib.sha256(b"other").digest()).decode()
+        response = self.patch(
+            location, PDF_BYTES[:100], 0, HTTP_UPLOAD_CHECKSUM=f"sha256 {bad_digest}"
+        )
+        self.assertEqual(response.status_code, 460)
+        self.assertEqual(self.head(location)["Upload-Offset"], "0")
+
+    def test_content_is_verified_on_completion(self):
+        data = b"MZ\x90\x00" + b"\x00" * 60
+        location = self.create(length=len(data))["Location"]
+        self.assertEqual(self.patch(location, data, 0).status_code, 415)
+        self.assertFalse(UploadSession.objects.exists())
+        self.application.refresh_from_db()
+        self.assertFalse(self.application.olevel_result)
+
+    def test_content_must_match_the_file_extension(self):
+        location = self.create(filename="result.jpg")["Location"]
+        self.assertEqual(self.patch(location, PDF_BYTES, 0).status_code, 415)
+        self.application.refresh_from_db()
+        self.assertFalse(self.application.olevel_result)
+
+    def test_failed_save_removes_the_stored_file(self):
+        location = self.create()["Location"]
+        conflict = ConcurrentUpdateError("Application was changed by someone else.")
+        with mock.patch.object(AdmissionApplication, "_do_update", side_effect=conflict):
+            self.assertEqual(self.patch(location, PDF_BYTES, 0).status_code, 409)
+        self.assertFalse(StoredBlob.objects.exists())
+        stored = [
+            name
+            for root, dirs, files in os.walk(settings.MEDIA_ROOT)
+            for name in files
+            if not root.startswith(uploads.get_upload_dir())
+        ]
+        self.assertEqual(stored, [])
+
+    def test_oversized_and_wrong_type_uploads_are_refused(self):
+        self.assertEqual(self.create(length=6 * 1024 * 1024).status_code, 413)
+        self.assertEqual(self.create(filename="result.exe").status_code, 415)
+        self.assertEqual(self.create(field="registration_number").status_code, 400)
+
+    def test_uploads_are_private_to_their_owner(self):
+        location = self.create()["Location"]
+        self.client.force_login(create_applicant("intruder"))
+        self.assertEqual(self.head(location).status_code, 404)
+        self.assertEqual(self.patch(location, PDF_BYTES, 0).status_code, 404)
+
+
+class DocumentUploadHandlerTests(MediaRootMixin, TestCase):
+    """
+    Tests for the streaming size and type checks on document uploads.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_applicant()
+        self.application = AdmissionApplication.objects.create(
+            user=self.user, personal_info_completed=True, program_info_completed=True
+        )
+        self.client.force_login(self.user)
+
+    def upload(self, **files):
+        return self.client.post(reverse("admissions:document_upload"), files)
+
+    def test_valid_upload_is_saved(self):
+        response = self.upload(
+            olevel_result=SimpleUploadedFile("result.pdf", PDF_BYTES, "application/pdf"),
+        )
+        self.assertEqual(response.status_code, 302)
+        self.application.refresh_from_db()
+        self.assertTrue(self.application.olevel_result)
+
+    def test_oversized_upload_stops_reading_the_body(self):
+        body = PDF_BYTES + b"\0" * (6 * 1024 * 1024)
+        with mock.patch.object(
+            DocumentUploadHandler,
+            "receive_data_chunk",
+            autospec=True,
+            side_effect=DocumentUploadHandler.receive_data_chunk,
+        ) as receive:
+            response = self.upload(
+                olevel_result=SimpleUploadedFile("result.pdf", body, "application/pdf"),
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("must be less than 5MB", response.content.decode())
+        received = sum(len(call.args[1]) for call in receive.call_args_list)
+        self.assertLess(received, len(body))
+        self.application.refresh_from_db()
+        self.assertFalse(self.application.olevel_result)
+
+    def test_disguised_upload_is_rejected(self):
+        response = self.upload(
+            passport_photo=SimpleUploadedFile("photo.jpg", PDF_BYTES, "image/jpeg"),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("not a valid file", response.content.decode())
+        self.application.refresh_from_db()
+        self.assertFalse(self.application.passport_photo)
+
+    def test_type_must_match_extension(self):
+        response = self.upload(
+            olevel_result=SimpleUploadedFile("result.png", PDF_BYTES, "image/png"),
+        )
+        self.assertIn("not a valid file", response.content.decode())
+
+    def test_csrf_is_still_checked(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(reverse("admissions:document_upload"), {
+            "olevel_result": SimpleUploadedFile("result.pdf", PDF_BYTES, "application/pdf"),
+        })
+        self.assertEqual(response.status_code, 403)
+        self.application.refresh_from_db()
+        self.assertFalse(self.application.olevel_result)
+
+    def test_admin_uploads_are_parsed_in_full(self):
+        # The handler belongs to the applicant form only; the admin change
+        # form has the same field names but must see its whole body
+        self.client.force_login(User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        ))
+        response = self.client.post(
+            reverse("admin:admissions_admissionapplication_change", args=[self.application.pk]),
+            {
+                "status": "draft",
+                "program_choice": "",
+                "review_notes": "Photo replaced by the office",
+                "expected_version": self.application.version,
+                "passport_photo": SimpleUploadedFile("photo.jpg", PDF_BYTES, "image/jpeg"),
+                "documents-TOTAL_FORMS": 0,
+                "documents-INITIAL_FORMS": 0,
+                "documents-MIN_NUM_FORMS": 0,
+                "documents-MAX_NUM_FORMS": 1000,
+            },
+        )
+        self.assertContains(response, "Upload a valid image.")
+        self.assertNotContains(response, "ManagementForm data is missing")
+        form = response.context["adminform"].form
+        self.assertEqual(form.data["review_notes"], "Photo replaced by the office")
+        self.assertEqual(list(form.errors), ["passport_photo"])
+
+
+def make_rotated_jpeg(size=(2400, 1800)):
+    """
+    A landscape JPEG whose EXIF orientation says it is really portrait.
+    """
+    image = Image.new("RGB", size, "navy")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90 degrees clockwise
+    output = io.BytesIO()
+    image.save(output, format="JPEG", exif=exif)
+    return output.getvalue()
+
+
+class PassportRenditionTests(MediaRootMixin, TestCase):
+    """
+    Tests for cached passport photo renditions.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_applicant()
+        self.application = AdmissionApplication.objects.create(user=self.user)
+        self.application.passport_photo.save(
+            "photo.jpg", ContentFile(make_rotated_jpeg()), save=True
+        )
+
+    def process(self):
+        enqueue_document_processing(self.application, ["passport_photo"])
+        work(once=True)
+        return ApplicationDocument.objects.get(application=self.application)
+
+    def test_background_processing_stores_every_rendition(self):
+        document = self.process()
+        self.assertEqual(len(document.renditions), len(RENDITION_SPECS) * len(RENDITION_FORMATS))
+        for spec, (max_width, max_height) in RENDITION_SPECS.items():
+            rendition = document.renditions[f"{spec}.webp"]
+            # Orientation applied: the portrait side is the long one
+            self.assertLess(rendition["width"], rendition["height"])
+            self.assertLessEqual(rendition["height"], max_height)
+            with Image.open(os.path.join(settings.MEDIA_ROOT, rendition["name"])) as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertEqual(image.size, (rendition["width"], rendition["height"]))
+                self.assertNotIn(0x0112, image.getexif())
+        self.assertIn(
+            document.renditions["review.jpg"]["name"],
+            rendition_url(self.application, "review", "jpeg"),
+        )
+
+    def test_identical_photos_share_renditions(self):
+        other = AdmissionApplication.objects.create(user=create_applicant("twin"))
+        with self.application.passport_photo.open("rb") as photo:
+            other.passport_photo.save("copy.jpg", ContentFile(photo.read()), save=True)
+        enqueue_document_processing(other, ["passport_photo"])
+        first = self.process()
+        second = ApplicationDocument.objects.get(application=other)
+        self.assertEqual(first.content_hash, second.content_hash)
+        self.assertEqual(first.renditions, second.renditions)
+
+    def test_missing_rendition_is_rendered_on_request(self):
+        url = rendition_url(self.application, "thumbnail", "jpeg")
+        self.assertEqual(
+            url, reverse("admissions:photo_rendition", args=[self.application.pk, "thumbnail", "jpeg"])
+        )
+
+        self.client.force_login(create_applicant("intruder"))
+        self.assertEqual(self.client.get(url).status_code, 404)
+        # Staff without the admissions view permission are not reviewers
+        editor = create_applicant("editor", is_staff=True)
+        self.client.force_login(editor)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        editor.user_permissions.add(Permission.objects.get(codename="view_admissionapplication"))
+        self.client.force_login(User.objects.get(pk=editor.pk))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        document = ApplicationDocument.objects.get(field_name="passport_photo")
+        self.assertEqual(list(document.renditions), ["thumbnail.jpg"])
+        with Image.open(io.BytesIO(b"".join(response.streaming_content))) as image:
+            self.assertEqual(image.size, (document.renditions["thumbnail.jpg"]["width"],
+                                          document.renditions["thumbnail.jpg"]["height"]))
+
+        self.application.refresh_from_db()
+        self.assertEqual(
+            rendition_url(self.application, "thumbnail", "jpeg"),
+            reverse("admissions:protected_document", args=[document.renditions["thumbnail.jpg"]["name"]]),
+        )
+
+        response = self.client.get(reverse("admissions:application_detail"))
+        self.assertContains(response, document.renditions["thumbnail.jpg"]["name"])
+
+    def test_concurrent_renditions_are_merged(self):
+        document = ApplicationDocument.objects.create(
+            application=self.application,
+            field_name="passport_photo",
+            source_name=self.application.passport_photo.name,
+        )
+        # Requests that loaded the document before either recorded anything
+        first = AdmissionApplication.objects.prefetch_related("documents").get(pk=self.application.pk)
+        second = AdmissionApplication.objects.prefetch_related("documents").get(pk=self.application.pk)
+        third = AdmissionApplication.objects.prefetch_related("documents").get(pk=self.application.pk)
+        thumbnail = ensure_rendition(first, "thumbnail", "jpeg")
+        review = ensure_rendition(second, "review", "jpeg")
+        self.assertEqual(ensure_rendition(third, "thumbnail", "jpeg"), thumbnail)
+
+        document.refresh_from_db()
+        self.assertEqual(document.renditions, {"thumbnail.jpg": thumbnail, "review.jpg": review})
+        # The duplicate thumbnail released its reference
+        self.assertEqual(StoredBlob.objects.get(name=thumbnail["name"]).ref_count, 1)
+
+    def test_admin_shows_renditions_not_originals(self):
+        document = self.process()
+        admin = User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        )
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin:admissions_admissionapplication_changelist"))
+        self.assertContains(response, document.renditions["thumbnail.webp"]["name"])
+        response = self.client.get(
+            reverse("admin:admissions_admissionapplication_change", args=[self.application.pk])
+        )
+        self.assertContains(response, document.renditions["review.webp"]["name"])
+
+    def test_replaced_photo_does_not_use_old_renditions(self):
+        self.process()
+        self.application.passport_photo.save("new.png", ContentFile(make_png()), save=True)
+        self.assertEqual(
+            rendition_url(self.application, "review", "jpeg"),
+            reverse("admissions:photo_rendition", args=[self.application.pk, "review", "jpeg"]),
+        )
+
+
+class ContentAddressedStorageTests(MediaRootMixin, TestCase):
+    """
+    Tests for deduplicated, reference-counted document storage.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.first = AdmissionApplication.objects.create(user=create_applicant("first"))
+        self.second = AdmissionApplication.objects.create(user=create_applicant("second"))
+
+    def blob_path(self, name):
+        return os.path.join(settings.MEDIA_ROOT, name)
+
+    def test_identical_uploads_share_one_blob(self):
+        self.first.olevel_result.save("result.pdf", ContentFile(PDF_BYTES))
+        self.second.birth_certificate.save("scan.PDF", ContentFile(PDF_BYTES))
+
+        name = self.first.olevel_result.name
+        self.assertTrue(is_blob_name(name))
+        self.assertTrue(name.endswith(hashlib.sha256(PDF_BYTES).hexdigest() + ".pdf"))
+        self.assertEqual(self.second.birth_certificate.name, name)
+        self.assertEqual(StoredBlob.objects.get(name=name).ref_count, 2)
+        with self.second.birth_certificate.open("rb") as stored:
+            self.assertEqual(stored.read(), PDF_BYTES)
+
+    def test_blob_is_removed_with_its_last_reference(self):
+        self.first.olevel_result.save("result.pdf", ContentFile(PDF_BYTES))
+        self.second.olevel_result.save("result.pdf", ContentFile(PDF_BYTES))
+        name = self.first.olevel_result.name
+
+        # Replacing a file drops the reference to the old blob
+        self.first.olevel_result.save("other.png", ContentFile(make_png()))
+        self.assertEqual(StoredBlob.objects.get(name=name).ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.second.delete()
+        self.assertFalse(StoredBlob.objects.filter(name=name).exists())
+        self.assertFalse(os.path.exists(self.blob_path(name)))
+
+    def make_legacy_file(self, application, field, data):
+        name = f"uploads/user_{application.user_id}/{field}.pdf"
+        os.makedirs(os.path.dirname(self.blob_path(name)), exist_ok=True)
+        with open(self.blob_path(name), "wb") as legacy:
+            legacy.write(data)
+        AdmissionApplication.objects.filter(pk=application.pk).update(**{field: name})
+        return name
+
+    def test_convert_command_moves_legacy_uploads(self):
+        first_name = self.make_legacy_file(self.first, "olevel_result", PDF_BYTES)
+        second_name = self.make_legacy_file(self.second, "birth_certificate", PDF_BYTES)
+        ApplicationDocument.objects.create(
+            application=self.first, field_name="olevel_result", source_name=first_name
+        )
+
+        output = io.StringIO()
+        call_command("convert_document_storage", "--workers", "1", stdout=output)
+        self.assertIn("Converted 2 file(s)", output.getvalue())
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        blob = self.first.olevel_result.name
+        self.assertTrue(is_blob_name(blob))
+        self.assertEqual(self.second.birth_certificate.name, blob)
+        self.assertEqual(StoredBlob.objects.get(name=blob).ref_count, 2)
+        self.assertEqual(ApplicationDocument.objects.get().source_name, blob)
+        self.assertFalse(os.path.exists(self.blob_path(first_name)))
+        self.assertFalse(os.path.exists(self.blob_path(second_name)))
+
+
+class DocumentBundleTests(MediaRootMixin, TestCase):
+    """
+    Tests for the streaming ZIP download of application documents.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.first = AdmissionApplication.objects.create(user=create_applicant("first"))
+        self.first.passport_photo.save("photo.png", ContentFile(make_png()))
+        self.first.olevel_result.save("result.pdf", ContentFile(PDF_BYTES))
+        self.second = AdmissionApplication.objects.create(user=create_applicant("second"))
+        self.second.additional_document_1.save("letter.doc", ContentFile(b"\xd0\xcf\x11\xe0" * 50000))
+        admin = User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        )
+        self.client.force_login(admin)
+
+    def download(self):
+        return self.client.post(
+            reverse("admin:admissions_admissionapplication_changelist"),
+            {
+                "action": "download_documents",
+                "_selected_action": [self.first.pk, self.second.pk],
+            },
+        )
+
+    def test_action_streams_documents_by_registration_number(self):
+        response = self.download()
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response["Content-Type"], "application/zip")
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as archive:
+            self.assertIsNone(archive.testzip())
+            entries = {info.filename: info for info in archive.infolist()}
+            self.assertEqual(set(entries), {
+                f"{self.first.registration_number}/passport_photo.png",
+                f"{self.first.registration_number}/olevel_result.pdf",
+                f"{self.second.registration_number}/additional_document_1.doc",
+            })
+            self.assertEqual(
+                archive.read(f"{self.first.registration_number}/olevel_result.pdf"), PDF_BYTES
+            )
+        pdf = entries[f"{self.first.registration_number}/olevel_result.pdf"]
+        self.assertEqual(pdf.compress_type, zipfile.ZIP_STORED)
+        doc = entries[f"{self.second.registration_number}/additional_document_1.doc"]
+        self.assertEqual(doc.compress_type, zipfile.ZIP_DEFLATED)
+
+    def test_large_files_are_yielded_in_pieces(self):
+        self.first.birth_certificate.save("scan.pdf", ContentFile(os.urandom(1024 * 1024)))
+        chunks = list(self.download().streaming_content)
+        self.assertGreater(len(chunks), 10)
+        self.assertLessEqual(max(len(chunk) for chunk in chunks), 128 * 1024)
+
+    def test_missing_files_are_listed(self):
+        os.remove(self.first.olevel_result.path)
+        content = b"".join(self.download().streaming_content)
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(
+                archive.read("MISSING.txt").decode(),
+                f"{self.first.registration_number}/olevel_result.pdf\n",
+            )
+
+
+class ProtectedDocumentTests(MediaRootMixin, TestCase):
+    """
+    Tests for access-checked document delivery.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_applicant()
+        self.application = AdmissionApplication.objects.create(user=self.user)
+        self.application.olevel_result.save("result.pdf", ContentFile(PDF_BYTES))
+        self.url = self.application.olevel_result.url
+
+    def test_document_urls_go_through_the_protected_view(self):
+        self.assertEqual(
+            self.url,
+            reverse("admissions:protected_document", args=[self.application.olevel_result.name]),
+        )
+
+    def test_owner_and_reviewers_only(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+        self.client.force_login(create_applicant("intruder"))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        self.client.force_login(User.objects.create_user(
+            username="staff", email="staff@example.com", password="s3cure-pass-123", is_staff=True
+        ))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        self.client.force_login(User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        ))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_fallback_streams_file_with_ranges(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(b"".join(response.streaming_content), PDF_BYTES)
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=5-14")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 5-14/{len(PDF_BYTES)}")
+        self.assertEqual(b"".join(response.streaming_content), PDF_BYTES[5:15])
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(b"".join(response.streaming_content), PDF_BYTES[-10:])
+        self.assertEqual(response["Content-Length"], "10")
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(PDF_BYTES)}-")
+        self.assertEqual(response.status_code, 416)
+
+    @override_settings(ADMISSIONS_PROTECTED_MEDIA_SERVER="nginx")
+    def test_nginx_gets_the_transfer(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            f"/protected-media/{self.application.olevel_result.name}",
+        )
+        self.assertEqual(response.content, b"")
+
+    @override_settings(ADMISSIONS_PROTECTED_MEDIA_SERVER="sendfile")
+    def test_sendfile_gets_the_transfer(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Sendfile"], self.application.olevel_result.path)
+
+    def test_derived_copies_are_served_to_the_owner_only(self):
+        self.application.passport_photo.save("photo.png", ContentFile(make_png()), save=True)
+        enqueue_document_processing(self.application, ["passport_photo"])
+        work(once=True)
+        photo = ApplicationDocument.objects.get(field_name="passport_photo")
+        urls = [
+            photo.thumbnail.url,
+            photo.preview.url,
+            rendition_url(self.application, "review", "webp"),
+            reverse("admissions:photo_rendition", args=[self.application.pk, "print", "jpeg"]),
+        ]
+        for url in urls:
+            self.assertTrue(url.startswith("/admissions/"), url)
+
+        self.client.force_login(create_applicant("intruder"))
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+        self.client.force_login(self.user)
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+    def test_development_media_route_leaves_out_documents(self):
+        request = RequestFactory().get("/media/")
+        with self.assertRaises(Http404):
+            serve_public_media(request, self.application.olevel_result.name, settings.MEDIA_ROOT)
+        with self.assertRaises(Http404):
+            serve_public_media(request, "renditions/ab/secret/review.jpg", settings.MEDIA_ROOT)
+
+    def test_only_document_paths_are_served(self):
+        self.client.force_login(User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        ))
+        url = reverse("admissions:protected_document", args=["partial/secret.part"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        url = reverse("admissions:protected_document", args=["blobs/../../settings.py"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class ConditionalPageTests(TestCase):
+    """
+    Tests for 304 responses and fragment caching on the applicant pages.
+    """
+
+    def setUp(self):
+        self.user = create_applicant()
+        self.application = AdmissionApplication.objects.create(user=self.user)
+        self.client.force_login(self.user)
+
+    def test_unchanged_page_is_not_rendered_again(self):
+        for name in ["admissions:dashboard", "admissions:application_detail"]:
+            url = reverse(name)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("no-cache", response["Cache-Control"])
+
+            with self.assertTemplateNotUsed("base.html"):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, 304)
+
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+            self.assertEqual(response.status_code, 304)
+
+    def test_application_and_profile_changes_invalidate(self):
+        url = reverse("admissions:dashboard")
+        etag = self.client.get(url)["ETag"]
+
+        self.application.status = "submitted"
+        self.application.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "awaiting review")
+
+        etag = response["ETag"]
+        self.user.first_name = "Adaeze"
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Adaeze")
+
+    def test_pending_messages_force_a_render(self):
+        url = reverse("admissions:dashboard")
+        etag = self.client.get(url)["ETag"]
+        # Submitting an incomplete application redirects with an error message
+        self.client.post(reverse("admissions:submit_application"))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Cannot submit application")
+
+
+class ApplicationStatisticsTests(TestCase):
+    """
+    Tests for the incrementally maintained statistics rollup.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        )
+
+    def counts(self):
+        return {
+            (row.status, row.program_choice): row.count
+            for row in ApplicationStatistic.objects.filter(count__gt=0)
+        }
+
+    def test_transitions_move_applications_between_buckets(self):
+        application = AdmissionApplication.objects.create(
+            user=create_applicant(),
+            program_choice="diploma",
+            personal_info_completed=True,
+            program_info_completed=True,
+            documents_uploaded=True,
+        )
+        other = AdmissionApplication.objects.create(
+            user=create_applicant("other"), program_choice="diploma", status="submitted"
+        )
+        self.assertEqual(self.counts(), {("draft", ""): 1, ("submitted", "diploma"): 1})
+
+        application.submit()
+        other.reject(self.admin)
+        self.assertEqual(self.counts(), {("submitted", "diploma"): 1, ("rejected", "diploma"): 1})
+
+        application.program_choice = "certificate"
+        application.save(update_fields=["program_choice"])
+        application.approve(self.admin)
+        other.delete()
+        self.assertEqual(self.counts(), {("approved", "certificate"): 1})
+        self.assertEqual(reconcile_statistics(dry_run=True), {})
+
+    def test_program_step_saves_of_drafts_leave_rollup_alone(self):
+        application = AdmissionApplication.objects.create(user=create_applicant())
+        application.program_choice = "diploma"
+        with CaptureQueriesContext(connection) as context:
+            application.save(update_fields=["program_choice", "program_info_completed"])
+        self.assertFalse(any("admissions_applicationstatistic" in query["sql"] for query in context.captured_queries))
+        self.assertEqual(self.counts(), {("draft", ""): 1})
+
+    def test_deferred_instances_move_their_stored_bucket(self):
+        AdmissionApplication.objects.create(
+            user=create_applicant(), status="submitted", program_choice="diploma"
+        )
+        AdmissionApplication.objects.only("id", "status", "version").get().approve(self.admin)
+        self.assertEqual(self.counts(), {("approved", "diploma"): 1})
+
+        AdmissionApplication.objects.defer("status", "program_choice").get().delete()
+        self.assertEqual(self.counts(), {})
+        self.assertEqual(reconcile_statistics(dry_run=True), {})
+
+    def test_bulk_review_and_admin_edit_update_rollup(self):
+        applications = [
+            AdmissionApplication.objects.create(
+                user=create_applicant(f"applicant{i}"), status="submitted", program_choice="undergraduate"
+            )
+            for i in range(3)
+        ]
+        AdmissionApplication.objects.all().bulk_review("under_review", self.admin)
+        self.assertEqual(self.counts(), {("under_review", "undergraduate"): 3})
+
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse("admin:admissions_admissionapplication_changelist"),
+            {"action": "approve_applications", "_selected_action": [applications[0].pk]},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            self.counts(),
+            {("under_review", "undergraduate"): 2, ("approved", "undergraduate"): 1},
+        )
+
+    def test_failed_transition_leaves_rollup_unchanged(self):
+        application = AdmissionApplication.objects.create(user=create_applicant(), status="submitted")
+        with mock.patch.object(
+            AdmissionApplication, "record_status_change", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                application.approve(self.admin)
+        self.assertEqual(self.counts(), {("submitted", ""): 1})
+
+    def test_reconcile_fixes_drift_from_bulk_inserts(self):
+        bulk_create_applications(4, status="submitted", program_choice="diploma")
+        AdmissionApplication.objects.create(user=create_applicant(), program_choice="diploma")
+        self.assertEqual(self.counts(), {("draft", ""): 1})
+
+        out = io.StringIO()
+        call_command("reconcile_statistics", "--dry-run", stdout=out)
+        self.assertIn("1 bucket(s) differ", out.getvalue())
+        self.assertEqual(ApplicationStatistic.objects.count(), 1)
+
+        call_command("reconcile_statistics", stdout=io.StringIO())
+        self.assertEqual(self.counts(), {("draft", ""): 1, ("submitted", "diploma"): 4})
+        self.assertEqual(reconcile_statistics(), {})
+
+    def test_statistics_page_reads_only_the_rollup(self):
+        year = timezone.localdate().year
+        bulk_create_applications(5, status="submitted", program_choice="diploma")
+        reconcile_statistics()
+
+        summary = intake_summary()
+        self.assertEqual(summary["intake_year"], year)
+        self.assertEqual(summary["total"], 5)
+        self.assertEqual(summary["by_program"], {"diploma": {"submitted": 5}})
+
+        self.client.force_login(self.admin)
+        url = reverse("admin:admissions_admissionapplication_statistics")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {"year": year})
+        self.assertContains(response, f"Intake {year} statistics")
+        self.assertContains(response, "5 applications")
+        self.assertFalse(any(
+            "admissions_admissionapplication" in query["sql"]
+            for query in context.captured_queries
+        ))
+
+
+class OptimisticConcurrencyTests(TestCase):
+    """
+    Tests for versioned compare-and-swap saves and the status state machine.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        )
+        self.application = AdmissionApplication.objects.create(
+            user=create_applicant(), status="submitted", program_choice="diploma"
+        )
+        self.change_url = reverse(
+            "admin:admissions_admissionapplication_change", args=[self.application.pk]
+        )
+
+    def change_form_data(self, **changes):
+        data = {
+            "status": self.application.status,
+            "program_choice": self.application.program_choice,
+            "expected_version": self.application.version,
+            "documents-TOTAL_FORMS": 0,
+            "documents-INITIAL_FORMS": 0,
+            "documents-MIN_NUM_FORMS": 0,
+            "documents-MAX_NUM_FORMS": 1000,
+        }
+        data.update(changes)
+        return data
+
+    def test_stale_transition_raises_instead_of_overwriting(self):
+        first = AdmissionApplication.objects.get(pk=self.application.pk)
+        second = AdmissionApplication.objects.get(pk=self.application.pk)
+
+        first.approve(self.admin, "Strong results")
+        self.assertEqual(first.version, 2)
+        with self.assertRaises(ConcurrentUpdateError):
+            second.reject(self.admin, "Incomplete")
+
+        self.assertEqual(second.status, "submitted")
+        self.assertEqual(second.version, 1)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, "approved")
+        self.assertEqual(self.application.review_notes, "Strong results")
+        self.assertEqual(ApplicationStatusChange.objects.count(), 1)
+
+    def test_transitions_follow_the_state_machine(self):
+        draft = AdmissionApplication.objects.create(user=create_applicant("drafter"))
+        with self.assertRaises(InvalidTransitionError):
+            draft.approve(self.admin)
+        self.assertEqual(draft.status, "draft")
+
+        self.application.reject(self.admin)
+        with self.assertRaises(InvalidTransitionError):
+            self.application.approve(self.admin)
+        self.application.transition("under_review", self.admin, "Appeal")
+        self.application.approve(self.admin)
+        self.assertEqual(self.application.version, 4)
+
+    def test_transition_updates_only_changed_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            self.application.approve(self.admin)
+        update = next(
+            query["sql"] for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "admissions_admissionapplication"')
+        )
+        self.assertIn('"status"', update)
+        self.assertIn('"version" = 1', update)
+        self.assertNotIn('"address"', update)
+        self.assertNotIn('"program_choice"', update)
+
+    def test_bulk_review_bumps_version(self):
+        AdmissionApplication.objects.all().bulk_review("approved", self.admin)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.version, 2)
+
+    def test_admin_rejects_stale_form_and_illegal_status(self):
+        self.client.force_login(self.admin)
+        AdmissionApplication.objects.get(pk=self.application.pk).approve(self.admin)
+
+        response = self.client.post(self.change_url, self.change_form_data(status="rejected"))
+        self.assertContains(response, "changed by someone else")
+
+        self.application.refresh_from_db()
+        response = self.client.post(self.change_url, self.change_form_data(status="draft"))
+        self.assertContains(response, "Cannot change status from Approved to Draft")
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, "approved")
+
+    def test_admin_save_writes_changed_fields_only(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            self.change_url, self.change_form_data(status="under_review", city="Enugu")
+        )
+        self.assertEqual(response.status_code, 302)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, "under_review")
+        self.assertEqual(self.application.city, "Enugu")
+        self.assertEqual(self.application.reviewed_by, self.admin)
+        self.assertEqual(self.application.version, 2)
+
+    def test_admin_save_losing_the_race_reports_conflict(self):
+        self.client.force_login(self.admin)
+        clean = ApplicationAdminForm.clean
+
+        def clean_then_concurrent_change(form):
+            cleaned_data = clean(form)
+            AdmissionApplication.objects.filter(pk=self.application.pk).update(
+                status="rejected", version=F("version") + 1
+            )
+            return cleaned_data
+
+        with mock.patch.object(ApplicationAdminForm, "clean", clean_then_concurrent_change):
+            response = self.client.post(
+                self.change_url, self.change_form_data(status="approved"), follow=True
+            )
+        self.assertContains(response, "was changed by someone else")
+        self.assertRedirects(response, self.change_url)
+        # The simulated concurrent change shares the rolled back transaction here
+        self.application.refresh_from_db()
+        self.assertNotEqual(self.application.status, "approved")
+        self.assertFalse(ApplicationStatusChange.objects.exists())
+
+
+class StepFormConflictTests(MediaRootMixin, TestCase):
+    """
+    Tests for version conflicts on the applicant step forms and uploads.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_applicant()
+        self.application = AdmissionApplication.objects.create(
+            user=self.user, personal_info_completed=True, program_info_completed=True,
+            program_choice="diploma", course_of_study="Biology",
+        )
+        self.client.force_login(self.user)
+        self.program_url = reverse("admissions:program_info")
+
+    def concurrent_change(self):
+        AdmissionApplication.objects.filter(pk=self.application.pk).update(
+            course_of_study="Chemistry", version=F("version") + 1
+        )
+
+    def test_form_posts_the_version_it_was_rendered_from(self):
+        response = self.client.get(self.program_url)
+        self.assertContains(response, 'name="expected_version" value="1"')
+
+        self.concurrent_change()
+        response = self.client.post(self.program_url, {
+            "program_choice": "undergraduate",
+            "course_of_study": "Physics",
+            "expected_version": 1,
+        })
+        self.assertContains(response, "changed elsewhere after this page was opened")
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.course_of_study, "Chemistry")
+
+    def test_change_while_saving_rerenders_the_form(self):
+        clean = ProgramInfoForm.clean_course_of_study
+
+        def clean_then_concurrent_change(form):
+            cleaned = clean(form)
+            self.concurrent_change()
+            return cleaned
+
+        with mock.patch.object(ProgramInfoForm, "clean_course_of_study", clean_then_concurrent_change):
+            response = self.client.post(self.program_url, {
+                "program_choice": "undergraduate",
+                "course_of_study": "Physics",
+                "expected_version": 1,
+            })
+        self.assertContains(response, "changed elsewhere after this page was opened")
+        self.assertNotContains(response, "saved successfully")
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.course_of_study, "Chemistry")
+
+    def test_upload_conflict_releases_the_new_document(self):
+        clean = DocumentUploadForm.clean_olevel_result
+
+        def clean_then_concurrent_change(form):
+            cleaned = clean(form)
+            self.concurrent_change()
+            return cleaned
+
+        with mock.patch.object(DocumentUploadForm, "clean_olevel_result", clean_then_concurrent_change):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse("admissions:document_upload"), {
+                    "olevel_result": SimpleUploadedFile("result.pdf", PDF_BYTES, "application/pdf"),
+                })
+        self.assertContains(response, "changed elsewhere after this page was opened")
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertFalse(BackgroundJob.objects.exists())
+        self.application.refresh_from_db()
+        self.assertFalse(self.application.olevel_result)
+
+    def test_resumable_upload_conflict_is_409_and_can_be_retried(self):
+        response = self.client.post(
+            reverse("admissions:upload_create"),
+            HTTP_UPLOAD_LENGTH=str(len(PDF_BYTES)),
+            HTTP_UPLOAD_METADATA=",".join(
+                f"{key} {base64.b64encode(value.encode()).decode()}"
+                for key, value in {"field": "olevel_result", "filename": "result.pdf"}.items()
+            ),
+        )
+        location = response["Location"]
+
+        def patch(data, offset):
+            # Set directly, as the test client leaves them out for an empty body
+            return self.client.generic(
+                "PATCH", location, data,
+                CONTENT_TYPE="application/offset+octet-stream",
+                CONTENT_LENGTH=str(len(data)),
+                HTTP_UPLOAD_OFFSET=str(offset),
+            )
+
+        conflict = ConcurrentUpdateError("Application was changed by someone else.")
+        with mock.patch.object(AdmissionApplication, "_do_update", side_effect=conflict):
+            response = patch(PDF_BYTES, 0)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Tus-Resumable"], uploads.TUS_VERSION)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = patch(b"", len(PDF_BYTES))
+        self.assertEqual(response.status_code, 204)
+        self.application.refresh_from_db()
+        with self.application.olevel_result.open("rb") as stored:
+            self.assertEqual(stored.read(), PDF_BYTES)
+
+
+class LoadTestHarnessTests(MediaRootMixin, LiveServerTestCase):
+    """
+    Tests for the applicant journey load generator.
+    """
+
+    def test_percentile_uses_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(loadtest.percentile(values, 50), 50)
+        self.assertEqual(loadtest.percentile(values, 99), 99)
+        self.assertEqual(loadtest.percentile([7], 95), 7)
+        self.assertIsNone(loadtest.percentile([], 50))
+
+    def test_journey_runs_against_live_server(self):
+        results_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(results_dir.cleanup)
+        output_dir = results_dir.name
+        out = io.StringIO()
+        call_command(
+            "run_load_test",
+            "--base-url", self.live_server_url,
+            "--stages", "1",
+            "--stage-duration", "2",
+            "--think-time", "0", "0",
+            "--photo-size", "320", "480",
+            "--document-size", "20000",
+            "--output-dir", output_dir,
+            stdout=out,
+        )
+
+        summary_file = next(name for name in os.listdir(output_dir) if name.endswith(".json"))
+        with open(os.path.join(output_dir, summary_file)) as results:
+            stage = json.load(results)["stages"][0]
+        self.assertGreaterEqual(stage["journeys"], 1)
+        self.assertEqual(stage["steps"]["submit"]["errors"], 0)
+        self.assertIsNotNone(stage["steps"]["document_upload"]["p99_ms"])
+        self.assertTrue(
+            AdmissionApplication.objects.filter(
+                status="submitted", user__email__startswith="loadtest-"
+            ).exists()
+        )
+        self.assertIn("document_upload", out.getvalue())
+
+
+class ViewBudgetTests(TestCase):
+    """
+    Tests for the view benchmark suite and its committed budgets.
+    """
+
+    def test_views_stay_within_query_budgets(self):
+        results = {"small": benchmarks.run_dataset(20, iterations=1)}
+        with open(benchmarks.BUDGET_FILE) as budget_file:
+            budgets = json.load(budget_file)
+        self.assertEqual(
+            benchmarks.check_budgets(results, budgets, metrics=("queries",)), []
+        )
+        self.assertFalse(User.objects.filter(username__startswith="seed").exists())
+
+    def test_check_budgets_reports_regressions(self):
+        results = {"large": {"admin.change": {"queries": 9, "wall_ms": 12.5}, "new.view": {}}}
+        budgets = {"admin.change": {"queries": 6, "wall_ms": 100}}
+        self.assertEqual(
+            benchmarks.check_budgets(results, budgets),
+            ["large admin.change: queries 9 > 6", "large new.view: no budget"],
+        )
+
+
+class InstrumentationMiddlewareTests(TestCase):
+    """
+    Tests for sampled request instrumentation.
+    """
+
+    def setUp(self):
+        self.user = create_applicant()
+        AdmissionApplication.objects.create(user=self.user)
+        self.client.force_login(self.user)
+
+    @override_settings(ADMISSIONS_INSTRUMENTATION_SAMPLE_RATE=1.0)
+    def test_sampled_request_gets_server_timing_and_log_line(self):
+        with self.assertLogs("admissions.instrumentation", "INFO") as logs:
+            response = self.client.get(reverse("admissions:dashboard"))
+
+        self.assertRegex(response["Server-Timing"], r'db;dur=[\d.]+;desc="3 queries"')
+        self.assertIn("render;dur=", response["Server-Timing"])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "admissions:dashboard")
+        self.assertEqual(record["queries"], 3)
+        self.assertGreater(record["render_ms"], 0)
+        self.assertNotIn("query_list", record)
+
+    @override_settings(
+        ADMISSIONS_INSTRUMENTATION_SAMPLE_RATE=1.0,
+        ADMISSIONS_SLOW_REQUEST_THRESHOLDS={"default": 1000, "admissions:dashboard": 0},
+    )
+    def test_slow_sampled_request_logs_its_queries(self):
+        with self.assertLogs("admissions.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("admissions:dashboard"))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(len(record["query_list"]), 3)
+        self.assertIn("django_session", record["query_list"][0]["sql"])
+
+    @override_settings(
+        ADMISSIONS_INSTRUMENTATION_SAMPLE_RATE=0.0,
+        ADMISSIONS_SLOW_REQUEST_THRESHOLDS={"default": 0},
+    )
+    def test_unsampled_requests_only_log_when_slow(self):
+        with self.assertLogs("admissions.instrumentation", "WARNING") as logs:
+            response = self.client.get(reverse("admissions:dashboard"))
+        self.assertFalse(response.has_header("Server-Timing"))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertFalse(record["sampled"])
+        self.assertNotIn("queries", record)
+
+        with self.assertNoLogs("admissions.instrumentation"):
+            self.client.get(reverse("accounts:profile_update"))
+
+    def test_repeated_and_duplicate_queries_are_detected(self):
+        profile = RequestProfile()
+        execute = lambda sql, params, many, context: None
+        for pk in [1, 2, 3, 4, 5, 5]:
+            profile(execute, "SELECT * FROM t WHERE id = %s", (pk,), False, {})
+        profile(execute, "SELECT * FROM t WHERE id IN (%s, %s)", (1, 2), False, {})
+
+        self.assertEqual(profile.duplicates, 1)
+        self.assertEqual(
+            profile.repeated(5), [("SELECT * FROM t WHERE id = %s", 6)]
+        )
+        self.assertEqual(
+            fingerprint("SELECT *\n FROM t WHERE id IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id IN (...)",
+        )
+
+
+class MetricsEndpointTests(TestCase):
+    """
+    Tests for request metrics and the /metrics endpoint.
+    """
+
+    def setUp(self):
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        self.metrics_dir = metrics_dir.name
+        settings_override = override_settings(ADMISSIONS_METRICS_DIR=self.metrics_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.applicant = create_applicant()
+        self.application = AdmissionApplication.objects.create(
+            user=self.applicant,
+            personal_info_completed=True,
+            program_info_completed=True,
+            documents_uploaded=True,
+        )
+        self.staff = User.objects.create_superuser(
+            username="staff", email="staff@example.com", password="s3cure-pass-123"
+        )
+
+    def scrape(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode()
+
+    def test_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.client.force_login(self.applicant)
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+    def test_requests_are_counted_by_url_name(self):
+        self.client.force_login(self.applicant)
+        self.client.get(reverse("admissions:dashboard"))
+        self.client.post(
+            reverse("admissions:program_info"),
+            {"program_choice": "diploma", "course_of_study": "Computer Science"},
+        )
+
+        text = self.scrape()
+        self.assertIn(
+            'admissions_http_requests_total{method="GET",status="200",view="admissions:dashboard"} 1.0',
+            text,
+        )
+        self.assertIn(
+            'admissions_http_request_duration_seconds_bucket{view="admissions:dashboard",le="+Inf"} 1.0',
+            text,
+        )
+        self.assertIn('admissions_http_request_db_seconds_count{view="admissions:dashboard"} 1.0', text)
+        self.assertRegex(text, r'admissions_upload_bytes_total\{view="admissions:program_info"\} [1-9]')
+
+    def test_samples_of_all_workers_are_summed(self):
+        self.client.force_login(self.applicant)
+        self.client.get(reverse("admissions:dashboard"))
+        other_worker = metrics.MmapStore(os.path.join(self.metrics_dir, "1.db"))
+        other_worker.add(
+            metrics.sample_key("admissions_http_requests_total", {
+                "view": "admissions:dashboard", "method": "GET", "status": "200",
+            }),
+            2,
+        )
+
+        self.assertIn(
+            'admissions_http_requests_total{method="GET",status="200",view="admissions:dashboard"} 3.0',
+            self.scrape(),
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        store = metrics.MemoryStore()
+        for value in [0.003, 0.2, 20]:
+            metrics.observe(store, "admissions_http_request_duration_seconds", {"view": "v"}, value, (0.1, 1.0))
+        samples = {}
+        for key, value in store.items():
+            name, labels = json.loads(key)
+            samples[name, tuple(tuple(pair) for pair in labels)] = value
+
+        with override_settings(ADMISSIONS_METRICS_BUCKETS=(0.1, 1.0)):
+            text = metrics.render(samples)
+        self.assertIn('admissions_http_request_duration_seconds_bucket{view="v",le="0.1"} 1.0', text)
+        self.assertIn('admissions_http_request_duration_seconds_bucket{view="v",le="1.0"} 2.0', text)
+        self.assertIn('admissions_http_request_duration_seconds_bucket{view="v",le="+Inf"} 3.0', text)
+        self.assertIn('admissions_http_request_duration_seconds_sum{view="v"} 20.203', text)
+
+    def test_transitions_are_counted_when_committed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.application.submit()
+        with self.captureOnCommitCallbacks(execute=True):
+            AdmissionApplication.objects.all().bulk_review("approved", self.staff)
+
+        text = self.scrape()
+        self.assertIn(
+            'admissions_status_transitions_total{from_status="draft",to_status="submitted"} 1.0', text
+        )
+        self.assertIn(
+            'admissions_status_transitions_total{from_status="submitted",to_status="approved"} 1.0', text
+        )
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class RequestProfilerTests(TestCase):
+    """
+    Tests for the on-demand and sampled request profiler.
+    """
+
+    def setUp(self):
+        self.staff = User.objects.create_superuser(
+            username="staff", email="staff@example.com", password="s3cure-pass-123"
+        )
+        self.applicant = create_applicant()
+
+    def test_sampler_records_folded_stacks_below_the_caller(self):
+        sampler = StackSampler(interval=0.001).start()
+        busy_loop(0.05)
+        sampler.stop()
+
+        self.assertGreater(sampler.samples, 0)
+        stacks = parse_folded(sampler.folded())
+        self.assertEqual(sum(count for _, count in stacks), sampler.samples)
+        self.assertTrue(all(stack[0].startswith("busy_loop (admissions/tests.py:") for stack, _ in stacks))
+        self.assertEqual(hot_functions(sampler.folded())[0][0], stacks[0][0][0])
+
+    def test_staff_can_profile_a_request(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("search"), {"query": "admission", "_profile": "1"})
+
+        profile = ProfiledRequest.objects.get()
+        self.assertEqual(
+            response["X-Profile-URL"],
+            reverse("admin:admissions_profiledrequest_change", args=[profile.pk]),
+        )
+        self.assertEqual(profile.view_name, "search")
+        self.assertEqual(profile.path, "/search/?query=admission&_profile=1")
+        self.assertEqual(profile.user, self.staff)
+        self.assertEqual(profile.trigger, "staff")
+        self.assertEqual(profile.status_code, 200)
+
+        self.assertEqual(self.client.get(response["X-Profile-URL"]).status_code, 200)
+        download = self.client.get(
+            reverse("admin:admissions_profiledrequest_folded", args=[profile.pk])
+        )
+        self.assertEqual(download.content.decode(), profile.folded_stacks)
+        self.assertIn('filename="profile-', download["Content-Disposition"])
+
+    def test_other_requests_are_not_profiled(self):
+        self.client.force_login(self.applicant)
+        response = self.client.get(reverse("search"), {"_profile": "1"})
+        self.assertFalse(response.has_header("X-Profile-URL"))
+
+        with mock.patch("admissions.middleware.StackSampler") as sampler:
+            self.client.get(reverse("search"))
+        sampler.assert_not_called()
+        self.assertFalse(ProfiledRequest.objects.exists())
+
+    @override_settings(ADMISSIONS_PROFILER_SAMPLE_RATE=1.0, ADMISSIONS_PROFILER_KEEP=2)
+    def test_sampled_profiles_are_kept_up_to_the_limit(self):
+        for _ in range(3):
+            self.client.get(reverse("search"))
+        self.client.get(reverse("accounts:login"))
+
+        profiles = list(ProfiledRequest.objects.order_by("pk"))
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual({profile.trigger for profile in profiles}, {"sampled"})
+        self.assertTrue(all(profile.view_name == "search" for profile in profiles))
+
+
+class AutosaveTests(TestCase):
+    """
+    Tests for the field-level autosave endpoint.
+    """
+
+    def setUp(self):
+        self.user = create_applicant()
+        self.application = AdmissionApplication.objects.create(user=self.user, city="Enugu")
+        self.client.force_login(self.user)
+
+    def autosave(self, step, fields, **extra):
+        return self.client.patch(
+            reverse("admissions:autosave", args=[step]),
+            json.dumps({"fields": fields, **extra}),
+            content_type="application/json",
+        )
+
+    def test_only_changed_columns_are_written(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.autosave(
+                "personal-info", {"nationality": "Ghanaian", "city": "Enugu"}, version=1
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"saved": ["nationality"], "version": 2, "errors": {}})
+        update = next(query["sql"] for query in context.captured_queries if query["sql"].startswith("UPDATE"))
+        self.assertIn('"nationality"', update)
+        self.assertNotIn('"city"', update)
+
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.nationality, "Ghanaian")
+        self.assertFalse(self.application.personal_info_completed)
+
+    def test_field_errors_come_from_the_form_clean_methods(self):
+        response = self.autosave(
+            "personal-info",
+            {"date_of_birth": timezone.localdate().isoformat(), "state": "Enugu", "colour": "red"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["saved"], ["state"])
+        self.assertEqual(
+            response.json()["errors"],
+            {
+                "date_of_birth": ["Applicant must be at least 15 years old."],
+                "colour": ["Unknown field."],
+            },
+        )
+        self.application.refresh_from_db()
+        self.assertIsNone(self.application.date_of_birth)
+        self.assertEqual(self.application.state, "Enugu")
+
+    def test_stale_version_is_rejected(self):
+        AdmissionApplication.objects.filter(pk=self.application.pk).update(version=F("version") + 1)
+
+        response = self.autosave("personal-info", {"city": "Lagos"}, version=1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["version"], 2)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.city, "Enugu")
+
+    def test_program_step_requires_personal_info(self):
+        response = self.autosave("program-info", {"course_of_study": "Law"})
+        self.assertEqual(response.status_code, 403)
+
+        AdmissionApplication.objects.filter(pk=self.application.pk).update(personal_info_completed=True)
+        response = self.autosave("program-info", {"course_of_study": "  "})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"],
+            {"course_of_study": ["Please specify your desired course of study."]},
+        )
+
+    def test_expired_session_gets_json_401(self):
+        self.client.logout()
+        response = self.autosave("personal-info", {"city": "Lagos"})
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("log in again", response.json()["errors"]["__all__"][0])
+        self.assertEqual(
+            self.client.get(reverse("admissions:autosave", args=["personal-info"])).status_code, 401
+        )
+
+
+class ApplicationApiTests(TestCase):
+    """
+    Tests for the token-authenticated read API.
+    """
+
+    def setUp(self):
+        self.token, self.key = api.create_token("records")
+        self.applications = bulk_create_applications(5, status="submitted", program_choice="diploma")
+        base = timezone.now() - timedelta(days=1)
+        # Two rows share an updated_at, so the page boundary needs the id
+        for application, minutes in zip(self.applications, [3, 1, 2, 2, 4]):
+            AdmissionApplication.objects.filter(pk=application.pk).update(
+                updated_at=base + timedelta(minutes=minutes)
+            )
+        self.url = reverse("admissions:api_applications")
+
+    def get(self, key=None, **params):
+        return self.client.get(
+            self.url, params, HTTP_AUTHORIZATION=f"Token {key or self.key}"
+        )
+
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.get(key="wrong").status_code, 401)
+
+        ApiToken.objects.filter(pk=self.token.pk).update(is_active=False)
+        response = self.get()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"error": "Invalid token."})
+
+    def test_pages_follow_updated_at_and_id(self):
+        expected = list(
+            AdmissionApplication.objects.order_by("updated_at", "id").values_list("id", flat=True)
+        )
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "fields": "id"}
+            if cursor:
+                params["cursor"] = cursor
+            page = self.get(**params).json()
+            seen += [row["id"] for row in page["results"]]
+            cursor = page["next_cursor"]
+            if not page["has_more"]:
+                break
+        self.assertEqual(seen, expected)
+
+        # Nothing new after the last cursor until an application changes
+        self.assertEqual(self.get(cursor=cursor).json()["results"], [])
+        changed = self.applications[0]
+        changed.city = "Owerri"
+        changed.save(update_fields=["city"])
+        settled = timezone.now() + timedelta(seconds=61)
+        with mock.patch("django.utils.timezone.now", return_value=settled):
+            page = self.get(cursor=cursor, fields="id,city").json()
+        self.assertEqual(page["results"], [{"id": changed.pk, "city": "Owerri"}])
+
+    def test_recent_changes_wait_until_they_settle(self):
+        # A row stamped just now may belong to a transaction that commits
+        # after a later one; the cursor must not move past it yet
+        recent = self.applications[1]
+        AdmissionApplication.objects.filter(pk=recent.pk).update(updated_at=timezone.now())
+        page = self.get(fields="id").json()
+        self.assertNotIn({"id": recent.pk}, page["results"])
+        self.assertFalse(page["has_more"])
+
+        settled = timezone.now() + timedelta(seconds=61)
+        with mock.patch("django.utils.timezone.now", return_value=settled):
+            page = self.get(cursor=page["next_cursor"], fields="id").json()
+        self.assertEqual(page["results"], [{"id": recent.pk}])
+
+    def test_pages_select_only_requested_columns_without_offset(self):
+        cursor = self.get(limit=2).json()["next_cursor"]
+        with CaptureQueriesContext(connection) as context:
+            response = self.get(cursor=cursor, limit=2, fields="email,status")
+
+        self.assertEqual(list(response.json()["results"][0]), ["email", "status"])
+        sql = context.captured_queries[-1]["sql"]
+        self.assertIn("LIMIT 3", sql)
+        self.assertNotIn("OFFSET", sql)
+        self.assertNotIn('"address"', sql)
+        self.assertEqual(len(context.captured_queries), 2)
+
+    def test_filters_and_validation(self):
+        AdmissionApplication.objects.filter(pk=self.applications[0].pk).update(status="approved")
+        page = self.get(status="approved", fields="id,status,program_choice").json()
+        self.assertEqual(
+            page["results"],
+            [{"id": self.applications[0].pk, "status": "approved", "program_choice": "diploma"}],
+        )
+        self.assertEqual(self.get(program="postgraduate").json()["results"], [])
+
+        self.assertEqual(self.get(fields="id,password").status_code, 400)
+        self.assertEqual(self.get(status="lost").status_code, 400)
+        response = self.get(program="diploma,astrology")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("program must be one of", response.json()["error"])
+        self.assertEqual(self.get(cursor="not-a-cursor").status_code, 400)
+        self.assertEqual(self.get(limit=5000).status_code, 400)
+
+
+@override_settings(ADMISSIONS_ADMIN_LARGE_TABLE=True, ADMISSIONS_ADMIN_EXACT_COUNT_LIMIT=4)
+class LargeTableChangelistTests(TestCase):
+    """
+    Tests for the keyset-paged changelist with estimated counts.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_superuser(
+            username="reviewer", email="reviewer@example.com", password="s3cure-pass-123"
+        )
+        self.client.force_login(self.admin_user)
+        self.url = reverse("admin:admissions_admissionapplication_changelist")
+        applications = bulk_create_applications(5, status="submitted")
+        base = timezone.now() - timedelta(days=1)
+        # Two rows share created_at, so page boundaries need the id
+        for application, minutes in zip(applications, [1, 2, 2, 3, 4]):
+            AdmissionApplication.objects.filter(pk=application.pk).update(
+                created_at=base + timedelta(minutes=minutes)
+            )
+        model_admin = admin.site._registry[AdmissionApplication]
+        patcher = mock.patch.object(model_admin, "list_per_page", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def page(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        for query in context.captured_queries:
+            self.assertNotIn("OFFSET", query["sql"])
+        return response.context["cl"]
+
+    def test_pages_follow_created_at_and_id(self):
+        expected = list(
+            AdmissionApplication.objects.order_by("-created_at", "-pk").values_list("pk", flat=True)
+        )
+        cl = self.page(self.url)
+        self.assertIsInstance(cl, KeysetChangeList)
+        self.assertIsNone(cl.newer_url)
+        pages = [[obj.pk for obj in cl.result_list]]
+        while cl.older_url:
+            cl = self.page(self.url + cl.older_url)
+            pages.append([obj.pk for obj in cl.result_list])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+        previous = self.page(self.url + cl.newer_url)
+        self.assertEqual([obj.pk for obj in previous.result_list], pages[1])
+        self.assertTrue(previous.has_older)
+
+    def test_counts_are_exact_up_to_the_limit(self):
+        response = self.client.get(self.url)
+        cl = response.context["cl"]
+        self.assertEqual((cl.result_count, cl.count_qualifier), (4, "more than"))
+        self.assertContains(response, "More than 4")
+
+        AdmissionApplication.objects.filter(user__username="bulk1").update(status="approved")
+        response = self.client.get(self.url, {"status__exact": "approved"})
+        self.assertEqual(response.context["cl"].result_count, 1)
+        self.assertEqual(response.context["cl"].count_qualifier, "")
+
+    def test_facet_counts_are_cached(self):
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(self.url, {"_facets": "1"})
+        self.assertContains(response, "Submitted (5)")
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get(self.url, {"_facets": "1"})
+        self.assertContains(response, "Submitted (5)")
+        self.assertLess(len(second.captured_queries), len(first.captured_queries))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {"after": "nonsense"})
+        self.assertRedirects(response, self.url + "?e=1", fetch_redirect_response=False)
+
+    def test_auto_mode_switches_on_the_estimated_size(self):
+        with override_settings(ADMISSIONS_ADMIN_LARGE_TABLE="auto", ADMISSIONS_ADMIN_LARGE_TABLE_ROWS=1000):
+            self.assertNotIsInstance(self.client.get(self.url).context["cl"], KeysetChangeList)
+        with override_settings(ADMISSIONS_ADMIN_LARGE_TABLE="auto", ADMISSIONS_ADMIN_LARGE_TABLE_ROWS=5):
+            self.assertIsInstance(self.client.get(self.url).context["cl"], KeysetChangeList)
@@ -0,0 +1,69 @@
+"""
+Upload handler enforcing the admissions document rules while the request
+body is still arriving, instead of after Django has buffered the files.
+"""
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+from .documents import ALLOWED_CONTENT_TYPES, accepted_content_type
+from .files import MAX_DOCUMENT_SIZE, SNIFF_LENGTH
+
+
+class DocumentUploadHandler(FileUploadHandler):
+    """
+    Watch multipart parts named after an application document field.
+
+    Each file is limited to MAX_DOCUMENT_SIZE and its leading bytes must
+    identify a type allowed for the field that matches the file name's
+    extension. The first violation stops parsing and drops the connection
+    without reading the rest of the body; the reason is left in
+    ``request.upload_errors`` for the form to report. Other parts pass
+    through untouched to the next handler.
+
+    Only DocumentUploadView installs it, since no other form reads
+    ``request.upload_errors``; the admin, with the same field names,
+    parses its uploads normally.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.active = False
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.active = field_name in ALLOWED_CONTENT_TYPES
+        self.received = 0
+        self.header = b''
+        self.sniffed = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+
+        self.received += len(raw_data)
+        if self.received > MAX_DOCUMENT_SIZE:
+            self.reject("must be less than 5MB")
+
+        if not self.sniffed:
+            self.header += raw_data[:SNIFF_LENGTH - len(self.header)]
+            if len(self.header) >= SNIFF_LENGTH:
+                self.check_type()
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.active and not self.sniffed:
+            self.check_type()
+        self.active = False
+        return None
+
+    def check_type(self):
+        self.sniffed = True
+        if accepted_content_type(self.field_name, self.file_name, self.header) is None:
+            self.reject("is not a valid file of an accepted type")
+
+    def reject(self, reason):
+        label = self.field_name.replace('_', ' ').capitalize()
+        if self.request is not None:
+            if not hasattr(self.request, 'upload_errors'):
+                self.request.upload_errors = {}
+            self.request.upload_errors[self.field_name] = f"{label} {reason}."
+        raise StopUpload(connection_reset=True)
@@ -0,0 +1,286 @@
+"""
+Resumable document uploads (tus 1.0 core protocol).
+
+A client creates an UploadSession for one document field, then PATCHes
+the file in as many pieces as its connection allows. Each piece is
+streamed straight to a partial file on disk and the session offset only
+moves once the bytes are written, so after a dropped connection a HEAD
+request tells the client where to carry on. When the last byte arrives
+the file is verified and attached to the application.
+"""
+import base64
+import binascii
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File, locks
+from django.db import transaction
+from django.utils import timezone
+
+from .documents import ALLOWED_CONTENT_TYPES, accepted_content_type, enqueue_document_processing
+from .files import MAX_DOCUMENT_SIZE, SNIFF_LENGTH, extension_content_type
+from .storage import discard_rolled_back
+
+
+TUS_VERSION = '1.0.0'
+TUS_EXTENSIONS = ['creation', 'expiration', 'checksum', 'termination']
+CHECKSUM_ALGORITHMS = {'sha1', 'sha256'}
+
+# Bytes read from the request per write
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_EXPIRY = 24 * 60 * 60
+
+
+class UploadError(Exception):
+    """
+    A rejected upload request, with the HTTP status to answer with.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_metadata(header):
+    """
+    Decode an Upload-Metadata header: comma separated ``key base64value``
+    pairs, where the value may be omitted.
+    """
+    metadata = {}
+    for pair in filter(None, (part.strip() for part in (header or '').split(','))):
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            raise UploadError(f"Invalid Upload-Metadata value for '{key}'.")
+    return metadata
+
+
+def parse_checksum(header):
+    """
+    Split an ``<algorithm> <base64 digest>`` checksum into its parts.
+    """
+    algorithm, _, digest = (header or '').strip().partition(' ')
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise UploadError("Unsupported checksum algorithm.")
+    try:
+        return algorithm, base64.b64decode(digest, validate=True)
+    except binascii.Error:
+        raise UploadError("Invalid checksum digest.")
+
+
+def get_upload_dir():
+    return (
+        getattr(settings, 'ADMISSIONS_UPLOAD_TEMP_DIR', None)
+        or os.path.join(settings.MEDIA_ROOT, 'partial')
+    )
+
+
+def partial_path(session):
+    return os.path.join(get_upload_dir(), f'{session.pk.hex}.part')
+
+
+def create_session(application, field_name, filename, length, checksum=''):
+    """
+    Validate and start a resumable upload for one document field.
+    Unfinished uploads of the same field are replaced.
+    """
+    from .models import AdmissionApplication, UploadSession
+
+    if field_name not in ALLOWED_CONTENT_TYPES:
+        raise UploadError("Unknown document field.")
+    if not filename:
+        raise UploadError("A filename is required.")
+    if length > MAX_DOCUMENT_SIZE:
+        raise UploadError("Documents must be less than 5MB.", status=413)
+
+    field = AdmissionApplication._meta.get_field(field_name)
+    allowed_extensions = set()
+    for validator in field.validators:
+        allowed_extensions.update(getattr(validator, 'allowed_extensions', None) or [])
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if ext not in allowed_extensions or extension_content_type(filename) is None:
+        raise UploadError(
+            f"{field.verbose_name.capitalize()} must be one of: "
+            f"{', '.join(sorted(allowed_extensions))}.",
+            status=415,
+        )
+    if checksum:
+        parse_checksum(checksum)
+
+    for stale in UploadSession.objects.filter(
+        application=application, field_name=field_name, completed_at__isnull=True
+    ):
+        discard_session(stale)
+
+    expiry = getattr(settings, 'ADMISSIONS_UPLOAD_EXPIRY', DEFAULT_EXPIRY)
+    session = UploadSession.objects.create(
+        user_id=application.user_id,
+        application=application,
+        field_name=field_name,
+        filename=os.path.basename(filename),
+        length=length,
+        checksum=checksum,
+        expires_at=timezone.now() + timedelta(seconds=expiry),
+    )
+    os.makedirs(get_upload_dir(), exist_ok=True)
+    open(partial_path(session), 'wb').close()
+    return session
+
+
+def write_chunk(session, stream, offset, content_length, checksum=None):
+    """
+    Append up to ``content_length`` bytes from ``stream`` at ``offset``.
+    Returns the new offset. If the client disconnects mid-chunk, the bytes
+    already received are kept and acknowledged on the next HEAD.
+    """
+    from .models import UploadSession
+
+    if session.is_complete:
+        if offset == session.length and not content_length:
+            return session.offset
+        raise UploadError("Upload already completed.", status=409)
+    if content_length is None:
+        raise UploadError("Content-Length is required.", status=411)
+    if offset + content_length > session.length:
+        raise UploadError("Chunk exceeds Upload-Length.", status=413)
+    if checksum:
+        algorithm, expected = parse_checksum(checksum)
+        digest = hashlib.new(algorithm)
+    else:
+        digest = None
+
+    try:
+        partial = open(partial_path(session), 'r+b')
+    except FileNotFoundError:
+        raise UploadError("Upload not found.", status=404)
+
+    with partial:
+        # One writer per upload; a second PATCH while one is running is a
+        # client error rather than something to queue behind
+        if not locks.lock(partial, locks.LOCK_EX | locks.LOCK_NB):
+            raise UploadError("Another request is writing to this upload.", status=409)
+        try:
+            # The offset may have moved while the lock was held elsewhere
+            try:
+                session.refresh_from_db(fields=['offset', 'completed_at'])
+            except UploadSession.DoesNotExist:
+                raise UploadError("Upload not found.", status=404)
+            if offset != session.offset:
+                raise UploadError("Upload-Offset does not match.", status=409)
+
+            # Drop any bytes past the acknowledged offset from an earlier
+            # request that died before recording its progress
+            partial.seek(offset)
+            partial.truncate()
+
+            written = 0
+            try:
+                while written < content_length:
+                    data = stream.read(min(CHUNK_SIZE, content_length - written))
+                    if not data:
+                        break
+                    partial.write(data)
+                    written += len(data)
+                    if digest is not None:
+                        digest.update(data)
+            except OSError:
+                # Client went away; keep what arrived unless it must be verified
+                pass
+            partial.flush()
+            os.fsync(partial.fileno())
+
+            if digest is not None and (written != content_length or digest.digest() != expected):
+                partial.truncate(offset)
+                raise UploadError("Checksum mismatch.", status=460)
+
+            session.offset = offset + written
+            UploadSession.objects.filter(pk=session.pk).update(
+                offset=session.offset, updated_at=timezone.now()
+            )
+            if session.offset == session.length:
+                partial.seek(0)
+                complete_upload(session, partial)
+        finally:
+            locks.unlock(partial)
+
+    if session.is_complete:
+        os.remove(partial.name)
+    return session.offset
+
+
+def complete_upload(session, partial):
+    """
+    Verify the assembled file and attach it to the application.
+    A file that fails verification discards the session.
+    """
+    header = partial.read(SNIFF_LENGTH)
+    partial.seek(0)
+    # The same rule DocumentUploadHandler applies to form uploads
+    if accepted_content_type(session.field_name, session.filename, header) is None:
+        discard_session(session)
+        raise UploadError("File content does not match an allowed document type.", status=415)
+
+    if session.checksum:
+        algorithm, expected = parse_checksum(session.checksum)
+        digest = hashlib.new(algorithm)
+        for data in iter(lambda: partial.read(CHUNK_SIZE), b''):
+            digest.update(data)
+        partial.seek(0)
+        if digest.digest() != expected:
+            discard_session(session)
+            raise UploadError("Checksum mismatch.", status=460)
+
+    from .models import AdmissionApplication
+
+    field = session.field_name
+    stored = None
+    try:
+        with transaction.atomic():
+            # Locked, so a concurrent save cannot make the versioned save fail
+            application = AdmissionApplication.objects.select_for_update().get(
+                pk=session.application_id
+            )
+            upload = getattr(application, field)
+            upload.save(session.filename, File(partial), save=False)
+            stored = upload.name
+            if application.passport_photo and application.olevel_result and application.birth_certificate:
+                application.documents_uploaded = True
+            application.save(update_fields=[field, 'documents_uploaded', 'updated_at'])
+
+            session.completed_at = timezone.now()
+            session.save(update_fields=['completed_at', 'updated_at'])
+            transaction.on_commit(lambda: enqueue_document_processing(application, [field]))
+    except BaseException:
+        # The rollback dropped the stored file's reference; the partial
+        # file is kept so the client can finish the upload again
+        if stored is not None:
+            discard_rolled_back(upload.storage, stored)
+        raise
+
+
+def discard_session(session):
+    """
+    Delete an upload session and its partial file.
+    """
+    try:
+        os.remove(partial_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def purge_expired_uploads(limit=100):
+    """
+    Discard up to ``limit`` unfinished uploads past their expiry.
+    """
+    from .models import UploadSession
+
+    expired = UploadSession.objects.filter(
+        completed_at__isnull=True, expires_at__lt=timezone.now()
+    )[:limit]
+    for session in expired:
+        discard_session(session)
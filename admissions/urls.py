@@ -9,6 +9,12 @@ from .views import (
     DocumentUploadView,
     ApplicationDetailView,
     SubmitApplicationView,
+    ApplicationAutosaveView,
+    ApplicationListApiView,
+    ResumableUploadCreateView,
+    ResumableUploadView,
+    PassportPhotoRenditionView,
+    ProtectedDocumentView,
 )
 
 app_name = 'admissions'
@@ -20,4 +26,14 @@ urlpatterns = [
     path('upload-documents/', DocumentUploadView.as_view(), name='document_upload'),
     path('application-detail/', ApplicationDetailView.as_view(), name='application_detail'),
     path('submit/', SubmitApplicationView.as_view(), name='submit_application'),
+    path('autosave/<slug:step>/', ApplicationAutosaveView.as_view(), name='autosave'),
+    path('uploads/', ResumableUploadCreateView.as_view(), name='upload_create'),
+    path('uploads/<uuid:pk>/', ResumableUploadView.as_view(), name='upload_detail'),
+    path(
+        'photos/<int:pk>/<slug:spec>.<slug:file_format>',
+        PassportPhotoRenditionView.as_view(),
+        name='photo_rendition',
+    ),
+    path('files/<path:name>', ProtectedDocumentView.as_view(), name='protected_document'),
+    path('api/applications/', ApplicationListApiView.as_view(), name='api_applications'),
 ]
\ No newline at end of file
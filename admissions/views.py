@@ -2,19 +2,100 @@
 Class-based views for admission application management.
 Implements step-by-step application process and dashboard.
 """
-from django.contrib.auth.mixins import LoginRequiredMixin
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.messages import get_messages
 from django.contrib.messages.views import SuccessMessageMixin
-from django.shortcuts import redirect, get_object_or_404
-from django.urls import reverse_lazy
+from django.forms import modelform_factory
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date
+from django.views import View
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition
 from django.views.generic import TemplateView, UpdateView, DetailView
 from django.contrib import messages
-from django.utils import timezone
+from django.db import transaction
 
-from .models import AdmissionApplication
+from . import api, metrics, uploads
+from .documents import enqueue_document_processing
+from .files import MAX_DOCUMENT_SIZE
+from .media import is_protected_name, serve_document
+from .middleware import get_application
+from .models import AdmissionApplication, ConcurrentUpdateError, UploadSession
+from .renditions import RENDITION_FORMATS, RENDITION_SPECS, ensure_rendition
+from .storage import document_storage
+from .uploadhandlers import DocumentUploadHandler
 from .forms import PersonalInfoForm, ProgramInfoForm, DocumentUploadForm
 
 
-class DashboardView(LoginRequiredMixin, TemplateView):
+def get_page_version(request):
+    """
+    Version of what the applicant pages show: the application and the
+    user's profile. Changes whenever either row is saved.
+    """
+    return '{}:{}:{}'.format(
+        getattr(settings, 'ADMISSIONS_PAGE_CACHE_VERSION', 1),
+        request.application.updated_at.timestamp(),
+        request.user.updated_at.timestamp(),
+    )
+
+
+def application_etag(request, *args, **kwargs):
+    # Pending flash messages are part of the page, so never answer 304 then
+    if len(get_messages(request)):
+        return None
+    return hashlib.sha1(get_page_version(request).encode()).hexdigest()
+
+
+def application_last_modified(request, *args, **kwargs):
+    if len(get_messages(request)):
+        return None
+    return max(request.application.updated_at, request.user.updated_at)
+
+
+class DraftApplicationMixin:
+    """
+    Start the applicant's draft application on the first visit to a step
+    view. Other views answer 404 until it exists.
+    """
+    
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        request.application = SimpleLazyObject(lambda: get_application(request, create=True))
+
+
+class ApplicationPageCacheMixin:
+    """
+    Answer unchanged repeat visits with 304 Not Modified, and give
+    templates ``page_version`` and ``fragment_timeout`` for caching
+    fragments that depend only on the application and user.
+    """
+    
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(
+        etag_func=application_etag,
+        last_modified_func=application_last_modified,
+    ))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_version'] = get_page_version(self.request)
+        context['fragment_timeout'] = getattr(settings, 'ADMISSIONS_FRAGMENT_CACHE_TIMEOUT', 3600)
+        return context
+
+
+class DashboardView(LoginRequiredMixin, DraftApplicationMixin, ApplicationPageCacheMixin, TemplateView):
     """
     Main dashboard view showing application status and progress.
     """
@@ -23,10 +104,8 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get or create application for current user
-        application, created = AdmissionApplication.objects.get_or_create(
-            user=self.request.user
-        )
+        # Application is loaded once per request by ApplicationMiddleware
+        application = self.request.application
         
         context['application'] = application
         context['completion_percentage'] = application.get_completion_percentage()
@@ -36,7 +115,21 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class PersonalInfoView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
+class ApplicationStepMixin:
+    """
+    Re-render a step form with an error instead of saving over changes
+    made to the application while the request was being handled.
+    """
+    
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except ConcurrentUpdateError:
+            form.add_error(None, form.conflict_message)
+            return self.form_invalid(form)
+
+
+class PersonalInfoView(LoginRequiredMixin, DraftApplicationMixin, ApplicationStepMixin, SuccessMessageMixin, UpdateView):
     """
     Step 1: Personal Information Form
     """
@@ -48,19 +141,15 @@ class PersonalInfoView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
     
     def get_object(self, queryset=None):
         """
-        Get or create application for current user.
+        Return the request-scoped application for current user.
         """
-        application, created = AdmissionApplication.objects.get_or_create(
-            user=self.request.user
-        )
-        return application
+        return self.request.application
     
     def form_valid(self, form):
         """
         Mark personal info as completed.
         """
         form.instance.personal_info_completed = True
-        messages.success(self.request, self.success_message)
         return super().form_valid(form)
     
     def get_context_data(self, **kwargs):
@@ -70,7 +159,7 @@ class PersonalInfoView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
         return context
 
 
-class ProgramInfoView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
+class ProgramInfoView(LoginRequiredMixin, DraftApplicationMixin, ApplicationStepMixin, SuccessMessageMixin, UpdateView):
     """
     Step 2: Program Information Form
     """
@@ -82,18 +171,18 @@ class ProgramInfoView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
     
     def get_object(self, queryset=None):
         """
-        Get or create application for current user.
+        Return the request-scoped application for current user.
         """
-        application, created = AdmissionApplication.objects.get_or_create(
-            user=self.request.user
-        )
-        return application
+        return self.request.application
     
     def dispatch(self, request, *args, **kwargs):
         """
         Ensure personal info is completed first.
         """
-        application = self.get_object()
+        if not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        
+        application = request.application
         if not application.personal_info_completed:
             messages.warning(request, "Please complete personal information first.")
             return redirect('admissions:personal_info')
@@ -104,7 +193,6 @@ class ProgramInfoView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
         Mark program info as completed.
         """
         form.instance.program_info_completed = True
-        messages.success(self.request, self.success_message)
         return super().form_valid(form)
     
     def get_context_data(self, **kwargs):
@@ -114,9 +202,15 @@ class ProgramInfoView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
         return context
 
 
-class DocumentUploadView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
+@method_decorator(csrf_exempt, name='dispatch')
+class DocumentUploadView(LoginRequiredMixin, DraftApplicationMixin, ApplicationStepMixin, SuccessMessageMixin, UpdateView):
     """
     Step 3: Document Upload Form
+    
+    Files are size- and type-checked by DocumentUploadHandler while they
+    stream in. The handler has to be installed before anything reads
+    request.POST, so CSRF is checked in post() instead of by the
+    middleware.
     """
     model = AdmissionApplication
     form_class = DocumentUploadForm
@@ -126,18 +220,18 @@ class DocumentUploadView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
     
     def get_object(self, queryset=None):
         """
-        Get or create application for current user.
+        Return the request-scoped application for current user.
         """
-        application, created = AdmissionApplication.objects.get_or_create(
-            user=self.request.user
-        )
-        return application
+        return self.request.application
     
     def dispatch(self, request, *args, **kwargs):
         """
         Ensure previous steps are completed.
         """
-        application = self.get_object()
+        if not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        
+        application = request.application
         
         if not application.personal_info_completed:
             messages.warning(request, "Please complete personal information first.")
@@ -149,9 +243,24 @@ class DocumentUploadView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
         
         return super().dispatch(request, *args, **kwargs)
     
+    def post(self, request, *args, **kwargs):
+        request.upload_handlers.insert(0, DocumentUploadHandler(request))
+        return self.protected_post(request, *args, **kwargs)
+    
+    @method_decorator(csrf_protect)
+    def protected_post(self, request, *args, **kwargs):
+        # The CSRF check reads request.POST, so it runs after the handler is in place
+        return super().post(request, *args, **kwargs)
+    
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_errors'] = getattr(self.request, 'upload_errors', None)
+        return kwargs
+    
     def form_valid(self, form):
         """
-        Mark documents as uploaded if required files are present.
+        Mark documents as uploaded if required files are present,
+        then queue background processing of the new files.
         """
         application = form.instance
         
@@ -159,8 +268,16 @@ class DocumentUploadView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
         if application.passport_photo and application.olevel_result and application.birth_certificate:
             application.documents_uploaded = True
         
-        messages.success(self.request, self.success_message)
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if form.errors:
+            return response
+        
+        uploaded = [field for field in form.changed_data if getattr(application, field)]
+        if uploaded:
+            transaction.on_commit(
+                lambda: enqueue_document_processing(application, uploaded)
+            )
+        return response
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -169,7 +286,7 @@ class DocumentUploadView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
         return context
 
 
-class ApplicationDetailView(LoginRequiredMixin, DetailView):
+class ApplicationDetailView(LoginRequiredMixin, ApplicationPageCacheMixin, DetailView):
     """
     View to display complete application details.
     """
@@ -179,9 +296,9 @@ class ApplicationDetailView(LoginRequiredMixin, DetailView):
     
     def get_object(self, queryset=None):
         """
-        Get application for current user.
+        Return the request-scoped application for current user.
         """
-        return get_object_or_404(AdmissionApplication, user=self.request.user)
+        return self.request.application
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -197,7 +314,7 @@ class SubmitApplicationView(LoginRequiredMixin, TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        application = get_object_or_404(AdmissionApplication, user=self.request.user)
+        application = self.request.application
         context['application'] = application
         context['title'] = 'Submit Application'
         return context
@@ -206,10 +323,14 @@ class SubmitApplicationView(LoginRequiredMixin, TemplateView):
         """
         Handle application submission.
         """
-        application = get_object_or_404(AdmissionApplication, user=request.user)
+        application = request.application
         
         if application.can_submit():
-            application.submit()
+            try:
+                application.submit()
+            except ConcurrentUpdateError as exc:
+                messages.error(request, str(exc))
+                return redirect('admissions:dashboard')
             messages.success(
                 request,
                 f"Application {application.registration_number} submitted successfully! "
@@ -221,4 +342,286 @@ class SubmitApplicationView(LoginRequiredMixin, TemplateView):
                 request,
                 "Cannot submit application. Please ensure all steps are completed."
             )
-            return redirect('admissions:dashboard')
\ No newline at end of file
+            return redirect('admissions:dashboard')
+
+
+# Step forms that can be saved field by field
+AUTOSAVE_FORMS = {
+    'personal-info': PersonalInfoForm,
+    'program-info': ProgramInfoForm,
+}
+
+
+def autosave_error(message, status, **extra):
+    return JsonResponse({'errors': {'__all__': [message]}, **extra}, status=status)
+
+
+def autosave_conflict(application):
+    return autosave_error(
+        "This application was changed elsewhere. Reload the page to see the changes.",
+        409,
+        version=AdmissionApplication.objects.values_list('version', flat=True).get(
+            pk=application.pk
+        ),
+    )
+
+
+class ApplicationAutosaveView(LoginRequiredMixin, View):
+    """
+    PATCH: save some fields of a step form.
+    
+    The body is ``{"fields": {name: value}, "version": n}``. Only the sent
+    fields are validated, with the step form's clean methods, and only
+    the valid ones that changed are written. The response lists the saved
+    fields, the new version and errors by field (400 if there are any).
+    A ``version`` older than the application's gets 409. Autosaving does
+    not complete a step; the form's Save & Continue still does that.
+    """
+    http_method_names = ['patch']
+    
+    def handle_no_permission(self):
+        # Let the page keep its unsaved values and ask for a new login
+        return autosave_error("Your session has expired. Please log in again.", 401)
+    
+    def patch(self, request, step):
+        form_class = AUTOSAVE_FORMS.get(step)
+        if form_class is None:
+            raise Http404("No such step.")
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return autosave_error("The request body must be JSON.", 400)
+        if not isinstance(data, dict) or not isinstance(data.get('fields'), dict):
+            return autosave_error('Expected {"fields": {...}}.', 400)
+        
+        application = request.application
+        if form_class is ProgramInfoForm and not application.personal_info_completed:
+            return autosave_error("Please complete personal information first.", 403)
+        if data.get('version') not in (None, application.version):
+            return autosave_conflict(application)
+        
+        fields = data['fields']
+        names = [name for name in form_class._meta.fields if name in fields]
+        form = modelform_factory(AdmissionApplication, form=form_class, fields=names)(
+            data={name: '' if fields[name] is None else fields[name] for name in names},
+            instance=application,
+        )
+        form.is_valid()
+        errors = {name: list(messages) for name, messages in form.errors.items()}
+        for name in fields.keys() - set(names):
+            errors[name] = ["Unknown field."]
+        
+        saved = [name for name in form.changed_data if name not in errors]
+        if saved:
+            try:
+                application.save(update_fields=saved)
+            except ConcurrentUpdateError:
+                return autosave_conflict(application)
+        
+        return JsonResponse(
+            {'saved': saved, 'version': application.version, 'errors': errors},
+            status=400 if errors else 200,
+        )
+
+
+class ResumableUploadMixin(LoginRequiredMixin):
+    """
+    Shared handling for the tus upload endpoints.
+    """
+    raise_exception = True
+    
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except uploads.UploadError as exc:
+            response = HttpResponse(str(exc), status=exc.status, content_type='text/plain')
+        except ConcurrentUpdateError as exc:
+            # The bytes are kept; an empty PATCH at the final offset retries
+            response = HttpResponse(str(exc), status=409, content_type='text/plain')
+        response['Tus-Resumable'] = uploads.TUS_VERSION
+        response['Cache-Control'] = 'no-store'
+        return response
+    
+    def get_int_header(self, name):
+        value = self.request.headers.get(name)
+        if value is None or not value.isdigit():
+            raise uploads.UploadError(f"A valid {name} header is required.")
+        return int(value)
+
+
+class ResumableUploadCreateView(ResumableUploadMixin, View):
+    """
+    POST: start a resumable document upload.
+    Expects Upload-Length and Upload-Metadata with ``field`` and
+    ``filename`` (and optionally a whole-file ``checksum``).
+    """
+    
+    def options(self, request, *args, **kwargs):
+        response = HttpResponse(status=204)
+        response['Tus-Version'] = uploads.TUS_VERSION
+        response['Tus-Extension'] = ','.join(uploads.TUS_EXTENSIONS)
+        response['Tus-Max-Size'] = MAX_DOCUMENT_SIZE
+        response['Tus-Checksum-Algorithm'] = ','.join(sorted(uploads.CHECKSUM_ALGORITHMS))
+        return response
+    
+    def post(self, request, *args, **kwargs):
+        application = request.application
+        if not (application.personal_info_completed and application.program_info_completed):
+            raise uploads.UploadError("Please complete the previous steps first.", status=403)
+        
+        length = self.get_int_header('Upload-Length')
+        metadata = uploads.parse_metadata(request.headers.get('Upload-Metadata'))
+        uploads.purge_expired_uploads()
+        session = uploads.create_session(
+            application,
+            field_name=metadata.get('field', ''),
+            filename=metadata.get('filename', ''),
+            length=length,
+            checksum=metadata.get('checksum', ''),
+        )
+        
+        response = HttpResponse(status=201)
+        response['Location'] = request.build_absolute_uri(
+            reverse('admissions:upload_detail', args=[session.pk])
+        )
+        response['Upload-Expires'] = http_date(session.expires_at.timestamp())
+        return response
+
+
+class ResumableUploadView(ResumableUploadMixin, View):
+    """
+    HEAD: report the acknowledged offset to resume from.
+    PATCH: append bytes at Upload-Offset.
+    DELETE: abandon the upload.
+    """
+    
+    def get_session(self):
+        session = get_object_or_404(
+            UploadSession.objects.select_related('application__user'),
+            pk=self.kwargs['pk'],
+            user=self.request.user,
+        )
+        if not session.is_complete and session.expires_at < timezone.now():
+            uploads.discard_session(session)
+            raise uploads.UploadError("Upload expired.", status=410)
+        return session
+    
+    def head(self, request, *args, **kwargs):
+        session = self.get_session()
+        response = HttpResponse(status=200)
+        response['Upload-Offset'] = session.offset
+        response['Upload-Length'] = session.length
+        if not session.is_complete:
+            response['Upload-Expires'] = http_date(session.expires_at.timestamp())
+        return response
+    
+    def patch(self, request, *args, **kwargs):
+        if request.content_type != 'application/offset+octet-stream':
+            raise uploads.UploadError(
+                "Content-Type must be application/offset+octet-stream.", status=415
+            )
+        session = self.get_session()
+        offset = uploads.write_chunk(
+            session,
+            request,
+            offset=self.get_int_header('Upload-Offset'),
+            content_length=self.get_int_header('Content-Length'),
+            checksum=request.headers.get('Upload-Checksum'),
+        )
+        response = HttpResponse(status=204)
+        response['Upload-Offset'] = offset
+        return response
+    
+    def delete(self, request, *args, **kwargs):
+        session = self.get_session()
+        if session.is_complete:
+            raise uploads.UploadError("Upload already completed.", status=409)
+        uploads.discard_session(session)
+        return HttpResponse(status=204)
+
+
+def can_view_any_document(user):
+    """
+    Reviewers may open every applicant's documents; everyone else only
+    their own.
+    """
+    return user.has_perm('admissions.view_admissionapplication')
+
+
+class PassportPhotoRenditionView(LoginRequiredMixin, View):
+    """
+    Render a passport photo rendition on first request and send it like
+    any other protected document. Open to the applicant and to reviewers.
+    """
+    
+    def get(self, request, pk, spec, file_format):
+        if spec not in RENDITION_SPECS or file_format not in RENDITION_FORMATS:
+            raise Http404("Unknown rendition.")
+        
+        application = get_object_or_404(AdmissionApplication, pk=pk)
+        # Owners are checked first, so they do not load permissions
+        if application.user_id != request.user.pk and not can_view_any_document(request.user):
+            raise Http404("No such application.")
+        if not application.passport_photo:
+            raise Http404("No passport photo uploaded.")
+        
+        rendition = ensure_rendition(application, spec, file_format)
+        try:
+            return serve_document(request, document_storage(), rendition['name'])
+        except FileNotFoundError:
+            raise Http404("Rendition not found.")
+
+
+class ProtectedDocumentView(LoginRequiredMixin, View):
+    """
+    Serve an applicant document to its owner or to reviewers.
+    The transfer itself is handed to the front proxy, see admissions.media.
+    """
+    
+    def get(self, request, name):
+        if not is_protected_name(name):
+            raise Http404("Not a document.")
+        
+        if not can_view_any_document(request.user):
+            application = request.application
+            if name not in application.get_document_names():
+                raise Http404("Not a document.")
+        
+        try:
+            return serve_document(request, document_storage(), name)
+        except FileNotFoundError:
+            raise Http404("Document not found.")
+
+
+@method_decorator(never_cache, name='dispatch')
+class MetricsView(UserPassesTestMixin, View):
+    """
+    Request and transition metrics of all workers in the Prometheus
+    text format, for staff only.
+    """
+    
+    raise_exception = True
+    
+    def test_func(self):
+        return self.request.user.is_active and self.request.user.is_staff
+    
+    def get(self, request):
+        return HttpResponse(
+            metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
+@method_decorator(never_cache, name='dispatch')
+class ApplicationListApiView(View):
+    """
+    GET: a page of applications for a downstream system, authenticated
+    with an ApiToken. See admissions.api for the parameters.
+    """
+    
+    def get(self, request):
+        try:
+            api.authenticate(request)
+            page = api.list_applications(request.GET)
+        except api.ApiError as exc:
+            return JsonResponse({'error': str(exc)}, status=exc.status)
+        return JsonResponse(page, json_dumps_params={'separators': (',', ':')})
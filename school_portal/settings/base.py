@@ -52,11 +52,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "admissions.middleware.MetricsMiddleware",
+    "admissions.middleware.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "admissions.middleware.ProfilingMiddleware",
+    "admissions.middleware.ApplicationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "wagtail.contrib.redirects.middleware.RedirectMiddleware",
@@ -68,6 +72,7 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [
+            os.path.join(BASE_DIR, "templates"),
             os.path.join(PROJECT_DIR, "templates"),
         ],
         "APP_DIRS": True,
@@ -154,11 +159,20 @@ STORAGES = {
     "staticfiles": {
         "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
     },
+    # Applicant documents, stored once per distinct content under MEDIA_ROOT/blobs
+    # and only reachable through the access-checked admissions:protected_document view
+    "documents": {
+        "BACKEND": "admissions.storage.ContentAddressedStorage",
+        "OPTIONS": {
+            "base_url": "/admissions/files/",
+        },
+    },
 }
 
 # Django sets a maximum of 1000 fields per form by default, but particularly complex page models
 # can exceed this limit within Wagtail's page editor.
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10_000
+
 AUTH_USER_MODEL = 'accounts.User'
 
 # Wagtail settings
@@ -196,3 +210,71 @@ WAGTAILDOCS_EXTENSIONS = [
     # "xlsx",
     # "zip",
 ]
+
+# Admissions
+# Rows per UPDATE statement for bulk approve/reject
+ADMISSIONS_BULK_REVIEW_CHUNK_SIZE = 500
+# Larger admin selections are queued as a BulkReviewJob for process_jobs
+ADMISSIONS_BULK_REVIEW_SYNC_LIMIT = 1000
+# Registration numbers: {year}, {sequence} and a Luhn {check} digit
+ADMISSIONS_REGISTRATION_NUMBER_FORMAT = '{year}-{sequence:06d}-{check}'
+# Sequence values leased from the database at a time, per worker
+ADMISSIONS_REGISTRATION_BLOCK_SIZE = 100
+# Background jobs (manage.py process_jobs)
+ADMISSIONS_JOB_POLL_INTERVAL = 1.0
+# Running jobs not finished after this many seconds are picked up again
+ADMISSIONS_JOB_TIMEOUT = 300
+# Retry delay in seconds, multiplied by the attempt number
+ADMISSIONS_JOB_RETRY_DELAY = 30
+# Unfinished resumable uploads are discarded after this many seconds.
+# Partial files live in MEDIA_ROOT/partial unless ADMISSIONS_UPLOAD_TEMP_DIR is set.
+ADMISSIONS_UPLOAD_EXPIRY = 24 * 60 * 60
+# Hand protected document transfers to the front proxy: None, 'nginx' or 'sendfile'
+ADMISSIONS_PROTECTED_MEDIA_SERVER = None
+# nginx location (marked internal) that aliases MEDIA_ROOT
+ADMISSIONS_PROTECTED_MEDIA_PREFIX = '/protected-media/'
+# Applicant dashboard/detail fragments are cached for this many seconds;
+# bump ADMISSIONS_PAGE_CACHE_VERSION when those templates change
+ADMISSIONS_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+ADMISSIONS_PAGE_CACHE_VERSION = 1
+# Request instrumentation (admissions.middleware.InstrumentationMiddleware):
+# share of requests profiled, URL prefixes covered, slow-request thresholds
+# in ms by URL name, and how often one statement may run before it is
+# reported as a likely N+1 query
+ADMISSIONS_INSTRUMENTATION_SAMPLE_RATE = 0.01
+ADMISSIONS_INSTRUMENTATION_PATHS = ['/admissions/', '/django-admin/']
+ADMISSIONS_SLOW_REQUEST_THRESHOLDS = {
+    'default': 1000,
+    'admissions:dashboard': 300,
+    'admissions:application_detail': 300,
+    'admin:admissions_admissionapplication_changelist': 1000,
+}
+ADMISSIONS_REPEATED_QUERY_THRESHOLD = 5
+# Request metrics served on /metrics. Each worker writes a memory-mapped file
+# in this directory (clear it on restart); None keeps per-process counts only.
+ADMISSIONS_METRICS_DIR = None
+# Latency histogram buckets in seconds
+ADMISSIONS_METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Request profiler (admissions.middleware.ProfilingMiddleware): staff add
+# ?_profile=1 to a URL; a share of requests under the paths is profiled at
+# random. Stacks are sampled every interval seconds; older profiles beyond
+# ADMISSIONS_PROFILER_KEEP are deleted.
+ADMISSIONS_PROFILER_PARAM = '_profile'
+ADMISSIONS_PROFILER_SAMPLE_RATE = 0.0
+ADMISSIONS_PROFILER_PATHS = ['/django-admin/', '/search/', '/admissions/']
+ADMISSIONS_PROFILER_INTERVAL = 0.005
+ADMISSIONS_PROFILER_KEEP = 500
+# Read API (admissions/api/applications/): rows per page by default and at most
+ADMISSIONS_API_PAGE_SIZE = 100
+ADMISSIONS_API_MAX_PAGE_SIZE = 1000
+# Pages stop at rows older than this many seconds, so a write transaction that
+# commits late is not skipped by a cursor already past its updated_at. Keep it
+# above the longest transaction that saves applications.
+ADMISSIONS_API_SETTLE_SECONDS = 60
+# Large-table mode of the application changelist (admissions.changelist):
+# 'auto' switches it on from the estimated row count; True or False forces it.
+# Counts are exact up to the limit, then planner estimates; facet counts are cached.
+ADMISSIONS_ADMIN_LARGE_TABLE = 'auto'
+ADMISSIONS_ADMIN_LARGE_TABLE_ROWS = 100_000
+ADMISSIONS_ADMIN_EXACT_COUNT_LIMIT = 10_000
+ADMISSIONS_ADMIN_FACET_CACHE_TIMEOUT = 300
@@ -0,0 +1,63 @@
+// Save step form fields as the applicant edits them.
+// Forms opt in with data-autosave-url and data-version attributes; see
+// admissions.views.ApplicationAutosaveView for the JSON API.
+(function () {
+    'use strict';
+
+    function showErrors(form, errors) {
+        form.querySelectorAll('.autosave-error').forEach(function (element) {
+            element.remove();
+        });
+        Object.keys(errors).forEach(function (name) {
+            var field = form.elements[name];
+            var message = document.createElement('div');
+            message.className = 'invalid-feedback d-block autosave-error';
+            message.textContent = errors[name].join(' ');
+            if (field && field.parentNode) {
+                field.parentNode.appendChild(message);
+            } else {
+                form.prepend(message);
+            }
+        });
+    }
+
+    function autosave(form, field) {
+        var fields = {};
+        fields[field.name] = field.value;
+        return fetch(form.dataset.autosaveUrl, {
+            method: 'PATCH',
+            credentials: 'same-origin',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': form.elements.csrfmiddlewaretoken.value
+            },
+            body: JSON.stringify({fields: fields, version: Number(form.dataset.version)})
+        }).then(function (response) {
+            return response.json().then(function (data) {
+                if (data.version) {
+                    form.dataset.version = data.version;
+                }
+                if (data.version && response.status !== 409) {
+                    // Save & Continue posts the version these fields were saved at
+                    form.elements.expected_version.value = data.version;
+                }
+                showErrors(form, data.errors || {});
+            });
+        }).catch(function () {
+            // Offline: the values stay in the form for Save & Continue
+        });
+    }
+
+    document.querySelectorAll('form[data-autosave-url]').forEach(function (form) {
+        // One request at a time, so each one sends the version the last returned
+        var queue = Promise.resolve();
+        form.addEventListener('change', function (event) {
+            var field = event.target;
+            if (field.name && field.name !== 'csrfmiddlewaretoken') {
+                queue = queue.then(function () {
+                    return autosave(form, field);
+                });
+            }
+        });
+    });
+})();
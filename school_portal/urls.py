@@ -6,6 +6,7 @@ from wagtail.admin import urls as wagtailadmin_urls
 from wagtail import urls as wagtail_urls
 from wagtail.documents import urls as wagtaildocs_urls
 
+from admissions.views import MetricsView
 from search import views as search_views
 
 urlpatterns = [
@@ -13,6 +14,9 @@ urlpatterns = [
     path("admin/", include(wagtailadmin_urls)),
     path("documents/", include(wagtaildocs_urls)),
     path("search/", search_views.search, name="search"),
+    path('accounts/', include('accounts.urls')),
+    path('admissions/', include('admissions.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
 
 
@@ -20,18 +24,20 @@ if settings.DEBUG:
     from django.conf.urls.static import static
     from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 
-    # Serve static and media files from development server
+    from admissions.media import serve_public_media
+
+    # Serve static and media files from development server; applicant
+    # documents stay behind admissions:protected_document
     urlpatterns += staticfiles_urlpatterns()
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(
+        settings.MEDIA_URL, view=serve_public_media, document_root=settings.MEDIA_ROOT
+    )
 
 urlpatterns = urlpatterns + [
     # For anything not caught by a more specific rule above, hand over to
     # Wagtail's page serving mechanism. This should be the last pattern in
     # the list:
     path("", include(wagtail_urls)),
-    path('accounts/', include('accounts.urls')),
-    path('admissions/', include('admissions.urls')),
-      # Customize admin site
 
 
     # Alternatively, if you want Wagtail pages to be served from a subpath